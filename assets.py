@@ -0,0 +1,237 @@
+"""Local image asset staging for x_make_markdown_x.
+
+Images referenced by local path are hashed, deduplicated by content, and
+staged beside the markdown output so wkhtmltopdf loads each unique image
+once instead of once per reference.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import os as _os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol, Self, cast
+from urllib.parse import unquote, urlparse
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_REMOTE_SCHEMES = frozenset({"http", "https", "ftp", "data", "mailto"})
+
+
+class _PilImage(Protocol):
+    size: tuple[int, int]
+    format: str | None
+
+    def thumbnail(self, size: tuple[int, int]) -> None: ...
+
+    def save(self, fp: str, format: str | None = None) -> None: ...
+
+    def __enter__(self) -> Self: ...
+
+    def __exit__(self, *exc_info: object) -> None: ...
+
+
+class _PilImageModule(Protocol):
+    def open(self, fp: str) -> _PilImage: ...
+
+
+def _load_pil_image() -> _PilImageModule | None:
+    """Import Pillow's Image module when installed; downscaling is optional."""
+
+    try:
+        return cast("_PilImageModule", importlib.import_module("PIL.Image"))
+    except ModuleNotFoundError:
+        return None
+
+
+def local_image_path(url: str, *, base_dir: Path | None = None) -> Path | None:
+    """Return the filesystem path for a local image reference, if it is one."""
+
+    if not url:
+        return None
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    if scheme == "file":
+        candidate = Path(unquote(parsed.path))
+    elif scheme in _REMOTE_SCHEMES or (scheme and len(scheme) > 1):
+        # Single-letter schemes are Windows drive letters, not URL schemes.
+        return None
+    else:
+        candidate = Path(url)
+    if not candidate.is_absolute() and base_dir is not None:
+        candidate = base_dir / candidate
+    return candidate if candidate.is_file() else None
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class StagedAsset:
+    """A unique image placed in the asset directory."""
+
+    digest: str
+    source: Path
+    staged_path: Path
+    bytes: int
+    method: str
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "digest": self.digest,
+            "source": str(self.source),
+            "staged_path": str(self.staged_path),
+            "bytes": self.bytes,
+            "method": self.method,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class StagingReport:
+    """Outcome of one staging pass."""
+
+    staged: dict[Path, StagedAsset]
+    references: int
+    unique: int
+    cache_hits: int
+
+    def merge(self, other: StagingReport) -> StagingReport:
+        """Combine the reports of two passes over the same document."""
+
+        staged = {**self.staged, **other.staged}
+        return StagingReport(
+            staged=staged,
+            references=self.references + other.references,
+            unique=len({asset.digest for asset in staged.values()}),
+            cache_hits=self.cache_hits + other.cache_hits,
+        )
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "references": self.references,
+            "unique": self.unique,
+            "cache_hits": self.cache_hits,
+            "bytes": sum(
+                asset.bytes
+                for asset in {a.digest: a for a in self.staged.values()}.values()
+            ),
+        }
+
+
+class ImageAssetStager:
+    """Hash, deduplicate, and stage local images into a single directory."""
+
+    def __init__(
+        self,
+        asset_dir: Path,
+        *,
+        max_workers: int | None = None,
+        max_dimension: int | None = None,
+    ) -> None:
+        if max_dimension is not None and max_dimension < 1:
+            message = "max_dimension must be a positive integer"
+            raise ValueError(message)
+        self.asset_dir = asset_dir
+        self.max_workers = max_workers
+        self.max_dimension = max_dimension
+        self._by_digest: dict[str, StagedAsset] = {}
+        self._by_source: dict[Path, StagedAsset] = {}
+
+    def stage(self, sources: Iterable[Path]) -> StagingReport:
+        """Stage every source, reusing earlier results for repeated content."""
+
+        references = 0
+        placed = 0
+        requested: dict[Path, None] = {}
+        for source in sources:
+            references += 1
+            requested.setdefault(source.resolve())
+        pending = [path for path in requested if path not in self._by_source]
+
+        if pending:
+            self.asset_dir.mkdir(parents=True, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                digests = list(pool.map(_hash_file, pending))
+                placements: list[tuple[Path, str]] = []
+                for source, digest in zip(pending, digests, strict=True):
+                    existing = self._by_digest.get(digest)
+                    if existing is not None:
+                        self._by_source[source] = existing
+                        continue
+                    # Reserve the digest so identical files in this batch share it.
+                    self._by_digest[digest] = StagedAsset(
+                        digest, source, self._target_for(source, digest), 0, "pending"
+                    )
+                    placements.append((source, digest))
+                staged = list(pool.map(self._place, placements))
+            placed = len(staged)
+            for asset in staged:
+                self._by_digest[asset.digest] = asset
+            for source, digest in zip(pending, digests, strict=True):
+                self._by_source[source] = self._by_digest[digest]
+
+        mapping = {path: self._by_source[path] for path in requested}
+        unique = len({asset.digest for asset in mapping.values()})
+        return StagingReport(
+            staged=mapping,
+            references=references,
+            unique=unique,
+            cache_hits=references - placed,
+        )
+
+    def _target_for(self, source: Path, digest: str) -> Path:
+        return self.asset_dir / f"{digest[:16]}{source.suffix.lower()}"
+
+    def _place(self, placement: tuple[Path, str]) -> StagedAsset:
+        source, digest = placement
+        target = self._target_for(source, digest)
+        if target.exists():
+            return StagedAsset(
+                digest, source, target, target.stat().st_size, "existing"
+            )
+        if self.max_dimension is not None and self._downscale(source, target):
+            return StagedAsset(
+                digest, source, target, target.stat().st_size, "downscaled"
+            )
+        try:
+            _os.link(source, target)
+            method = "hardlink"
+        except OSError:
+            shutil.copy2(source, target)
+            method = "copy"
+        return StagedAsset(digest, source, target, target.stat().st_size, method)
+
+    def _downscale(self, source: Path, target: Path) -> bool:
+        image_module = _load_pil_image()
+        if image_module is None or self.max_dimension is None:
+            return False
+        try:
+            with image_module.open(str(source)) as image:
+                if max(image.size) <= self.max_dimension:
+                    return False
+                image_format = image.format
+                image.thumbnail((self.max_dimension, self.max_dimension))
+                image.save(str(target), format=image_format)
+        except (OSError, ValueError):
+            target.unlink(missing_ok=True)
+            return False
+        return True
+
+
+__all__ = [
+    "ImageAssetStager",
+    "StagedAsset",
+    "StagingReport",
+    "local_image_path",
+]
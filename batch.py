@@ -0,0 +1,436 @@
+"""Sharded batch rendering for x_make_markdown_x.
+
+`--batch PATH...` renders every payload found in the given files, directories
+(their `*.json` payloads), and `.jsonl` manifests (one payload per line).
+With `--shard-index/--shard-count`, a node renders only the payloads whose
+`output_markdown` hashes to its shard, so a document always lands on the same
+node and no scheduler is needed. With `--coalesce-pdf`, the shard's PDFs are
+rendered by one wkhtmltopdf run instead of one per document.
+`python -m x_make_markdown_x.batch` merges the per-shard reports into one
+aggregate run report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import posixpath
+import sys as _sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+from x_make_common_x.run_reports import isoformat_timestamp
+from x_make_markdown_x.coalesce import CoalescedDocument, export_coalesced_pdf
+from x_make_markdown_x.jsonio import dumps_bytes, loads, write_stream
+from x_make_markdown_x.watch import collect_payload_files
+from x_make_markdown_x.x_cls_make_markdown_x import (
+    export_budget,
+    failure_payload,
+    load_json_payload,
+    main_json,
+    markdown_stem,
+    markdown_to_html,
+    open_markdown,
+    resolve_wkhtmltopdf_path,
+)
+
+if TYPE_CHECKING:
+    from x_make_common_x.exporters import CommandRunner
+
+BATCH_SCHEMA_VERSION = "x_make_markdown_x.batch/1.0"
+MANIFEST_SUFFIX = ".jsonl"
+
+Render = Callable[[Mapping[str, object]], dict[str, object]]
+
+
+def shard_for(key: str, shard_count: int) -> int:
+    """Return the shard owning the path `key`; stable across machines.
+
+    The path is normalized first (separators, `.` and `..` segments), so
+    `out/a.md`, `./out/a.md` and `out\\a.md` land on the same shard.
+    """
+
+    normalized = posixpath.normpath(key.replace("\\", "/"))
+    digest = hashlib.sha256(normalized.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+@dataclass(frozen=True, slots=True)
+class ShardSpec:
+    """This node's slice of a batch: shard `index` of `count`."""
+
+    index: int = 0
+    count: int = 1
+
+    def __post_init__(self) -> None:
+        if self.count < 1:
+            message = "shard count must be at least 1"
+            raise ValueError(message)
+        if not 0 <= self.index < self.count:
+            message = f"shard index must be between 0 and {self.count - 1}"
+            raise ValueError(message)
+
+    def owns(self, key: str) -> bool:
+        return self.count == 1 or shard_for(key, self.count) == self.index
+
+    def to_metadata(self) -> dict[str, object]:
+        return {"index": self.index, "count": self.count}
+
+
+@dataclass(frozen=True, slots=True)
+class BatchItem:
+    """One payload of a batch, or the reason it could not be loaded."""
+
+    source: str
+    payload: Mapping[str, object] | None
+    error: str | None = None
+
+    @property
+    def output_markdown(self) -> str | None:
+        if self.payload is None:
+            return None
+        parameters = self.payload.get("parameters")
+        if not isinstance(parameters, Mapping):
+            return None
+        output = cast("Mapping[str, object]", parameters).get("output_markdown")
+        return output if isinstance(output, str) and output else None
+
+    @property
+    def shard_key(self) -> str:
+        """`output_markdown`, or the source for payloads that lack one."""
+
+        return self.output_markdown or self.source
+
+
+def _manifest_items(path: Path) -> Iterator[BatchItem]:
+    with path.open("rb") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            source = f"{path}:{line_number}"
+            try:
+                payload_obj = loads(line)
+            except ValueError as exc:
+                yield BatchItem(source, None, str(exc))
+                continue
+            if isinstance(payload_obj, Mapping):
+                yield BatchItem(source, cast("Mapping[str, object]", payload_obj))
+            else:
+                yield BatchItem(source, None, "JSON payload must be a mapping")
+
+
+def iter_batch_items(paths: Iterable[Path]) -> Iterator[BatchItem]:
+    """Yield the payloads of `paths` in a stable order."""
+
+    for path in collect_payload_files(paths):
+        if path.suffix == MANIFEST_SUFFIX:
+            yield from _manifest_items(path)
+            continue
+        try:
+            payload = load_json_payload(str(path))
+        except (OSError, TypeError, ValueError) as exc:
+            yield BatchItem(str(path), None, str(exc))
+        else:
+            yield BatchItem(str(path), payload)
+
+
+def _summarize(documents: Sequence[Mapping[str, object]]) -> dict[str, int]:
+    succeeded = 0
+    markdown_bytes = 0
+    for document in documents:
+        result = cast("Mapping[str, object]", document["result"])
+        if result.get("status") != "success":
+            continue
+        succeeded += 1
+        markdown = result.get("markdown")
+        if isinstance(markdown, Mapping):
+            size = cast("Mapping[str, object]", markdown).get("bytes")
+            markdown_bytes += size if isinstance(size, int) else 0
+    return {
+        "documents": len(documents),
+        "succeeded": succeeded,
+        "failed": len(documents) - succeeded,
+        "markdown_bytes": markdown_bytes,
+    }
+
+
+def _parameters(payload: Mapping[str, object]) -> Mapping[str, object]:
+    parameters = payload.get("parameters")
+    if not isinstance(parameters, Mapping):
+        return {}
+    return cast("Mapping[str, object]", parameters)
+
+
+def _deferred_pdf(payload: Mapping[str, object]) -> str | None:
+    """Return the wkhtmltopdf binary a payload would export with, if any."""
+
+    parameters = _parameters(payload)
+    if not parameters.get("export_pdf"):
+        return None
+    return resolve_wkhtmltopdf_path(parameters.get("wkhtmltopdf_path"))
+
+
+def _group_budget(budgets: Sequence[float | None]) -> float | None:
+    """Bound a coalesced run by its documents' export budgets combined."""
+
+    if not budgets or any(budget is None for budget in budgets):
+        return None
+    return sum(cast("list[float]", budgets))
+
+
+def _without_pdf_export(payload: Mapping[str, object]) -> dict[str, object]:
+    parameters = cast("Mapping[str, object]", payload["parameters"])
+    return {**payload, "parameters": {**parameters, "export_pdf": False}}
+
+
+def _coalesced_document(result: Mapping[str, object]) -> CoalescedDocument:
+    markdown = cast("Mapping[str, object]", result["markdown"])
+    path = Path(cast("str", markdown["path"]))
+    compression = cast("str | None", markdown.get("compression"))
+    with open_markdown(path, "r", compression) as handle:
+        text = handle.read()
+    stem = markdown_stem(path)
+    return CoalescedDocument(
+        stem,
+        markdown_to_html(text),
+        split_path=path.parent / f"{stem}.pdf",
+        base_dir=path.parent,
+    )
+
+
+def _coalesced_output(base: Path, group: int) -> Path:
+    return base if group == 0 else base.with_name(f"{base.stem}-{group}{base.suffix}")
+
+
+def _export_coalesced(
+    deferred: Mapping[str, list[tuple[dict[str, object], float | None]]],
+    *,
+    output_pdf: Path,
+    split: bool,
+    runner: CommandRunner | None,
+) -> list[dict[str, object]]:
+    """Export each wkhtmltopdf binary's documents in one run; patch results."""
+
+    exports: list[dict[str, object]] = []
+    for group, (binary, entries) in enumerate(deferred.items()):
+        results = [result for result, _ in entries]
+        export = export_coalesced_pdf(
+            [_coalesced_document(result) for result in results],
+            output_pdf=_coalesced_output(output_pdf, group),
+            wkhtmltopdf_path=binary,
+            runner=runner,
+            timeout=_group_budget([budget for _, budget in entries]),
+            split=split,
+        )
+        for position, result in enumerate(results):
+            markdown = cast("dict[str, object]", result["markdown"])
+            markdown["pdf"] = export.document_metadata(position)
+            if export.page_ranges is not None:
+                markdown["pdf_pages"] = export.page_ranges[position].to_metadata()
+            if export.detail:
+                messages = cast("list[str]", result.setdefault("messages", []))
+                messages.append(export.detail)
+        exports.append(export.to_metadata())
+    return exports
+
+
+def run_batch(
+    paths: Iterable[Path],
+    *,
+    shard: ShardSpec | None = None,
+    render: Render = main_json,
+    coalesce_pdf: Path | None = None,
+    split_pdf: bool = False,
+    runner: CommandRunner | None = None,
+) -> dict[str, object]:
+    """Render this shard's payloads from `paths` and return the shard report.
+
+    With `coalesce_pdf`, payloads that ask for a PDF are rendered without
+    one and then exported together, one wkhtmltopdf run per binary, into
+    `coalesce_pdf`; `split_pdf` also cuts each document's pages back out.
+    Each run may take as long as its documents' export budgets combined.
+    """
+
+    spec = shard or ShardSpec()
+    started = time.perf_counter()
+    documents: list[dict[str, object]] = []
+    deferred: dict[str, list[tuple[dict[str, object], float | None]]] = {}
+    other_shards = 0
+    for item in iter_batch_items(paths):
+        if not spec.owns(item.shard_key):
+            other_shards += 1
+            continue
+        if item.payload is None:
+            result = failure_payload(
+                "payload could not be loaded",
+                details={"path": item.source, "error": item.error or ""},
+            )
+        elif coalesce_pdf is not None and (binary := _deferred_pdf(item.payload)):
+            result = render(_without_pdf_export(item.payload))
+            if result.get("status") == "success":
+                budget = export_budget(_parameters(item.payload))
+                deferred.setdefault(binary, []).append((result, budget))
+        else:
+            result = render(item.payload)
+        documents.append(
+            {
+                "source": item.source,
+                "output_markdown": item.output_markdown,
+                "result": result,
+            }
+        )
+    report: dict[str, object] = {
+        "schema_version": BATCH_SCHEMA_VERSION,
+        "generated_at": isoformat_timestamp(),
+        "shard": spec.to_metadata(),
+    }
+    if coalesce_pdf is not None and deferred:
+        report["pdf_exports"] = _export_coalesced(
+            deferred, output_pdf=coalesce_pdf, split=split_pdf, runner=runner
+        )
+    report["summary"] = {
+        **_summarize(documents),
+        "inputs": len(documents) + other_shards,
+        "elapsed_seconds": round(time.perf_counter() - started, 6),
+    }
+    report["documents"] = documents
+    return report
+
+
+def _report_parts(
+    report: Mapping[str, object],
+) -> tuple[Mapping[str, int], Mapping[str, object], list[dict[str, object]]]:
+    """Return a shard report's shard, summary and documents, or raise ValueError."""
+
+    if report.get("schema_version") != BATCH_SCHEMA_VERSION:
+        message = f"not a batch report: {report.get('schema_version')!r}"
+        raise ValueError(message)
+    shard = report.get("shard")
+    summary = report.get("summary")
+    documents = report.get("documents")
+    if not (
+        isinstance(shard, Mapping)
+        and all(isinstance(shard.get(key), int) for key in ("index", "count"))
+        and isinstance(summary, Mapping)
+        and isinstance(summary.get("inputs"), int)
+        and isinstance(summary.get("elapsed_seconds"), (int, float))
+        and isinstance(documents, list)
+    ):
+        message = "malformed batch report: needs shard, summary and documents"
+        raise ValueError(message)
+    return (
+        cast("Mapping[str, int]", shard),
+        cast("Mapping[str, object]", summary),
+        cast("list[dict[str, object]]", documents),
+    )
+
+
+def merge_reports(reports: Iterable[Mapping[str, object]]) -> dict[str, object]:
+    """Combine per-shard reports into one aggregate run report.
+
+    Raises `ValueError` when the reports disagree on the shard count or the
+    same shard appears twice; missing shards are listed, not fatal.
+    """
+
+    shard_count: int | None = None
+    seen: set[int] = set()
+    documents: list[dict[str, object]] = []
+    pdf_exports: list[object] = []
+    inputs: set[int] = set()
+    elapsed: list[float] = []
+    for report in reports:
+        shard, summary, report_documents = _report_parts(report)
+        if shard_count is None:
+            shard_count = shard["count"]
+        elif shard["count"] != shard_count:
+            message = "batch reports were produced with different shard counts"
+            raise ValueError(message)
+        if shard["index"] in seen:
+            message = f"shard {shard['index']} appears in more than one report"
+            raise ValueError(message)
+        seen.add(shard["index"])
+        inputs.add(cast("int", summary["inputs"]))
+        elapsed.append(cast("float", summary["elapsed_seconds"]))
+        documents.extend(report_documents)
+        pdf_exports.extend(cast("list[object]", report.get("pdf_exports", [])))
+    if shard_count is None:
+        message = "no batch reports to merge"
+        raise ValueError(message)
+
+    missing = sorted(set(range(shard_count)) - seen)
+    messages: list[str] = []
+    if missing:
+        messages.append(f"missing shard(s): {', '.join(map(str, missing))}")
+    if len(inputs) > 1:
+        messages.append("shards saw different inputs; the batch paths differ")
+    documents.sort(key=lambda document: str(document["source"]))
+    return {
+        "schema_version": BATCH_SCHEMA_VERSION,
+        "generated_at": isoformat_timestamp(),
+        "shards": {"count": shard_count, "merged": sorted(seen), "missing": missing},
+        "summary": {
+            **_summarize(documents),
+            "elapsed_seconds": max(elapsed),
+            "shard_seconds": round(sum(elapsed), 6),
+        },
+        "messages": messages,
+        "pdf_exports": pdf_exports,
+        "documents": documents,
+    }
+
+
+def load_report(path: Path) -> Mapping[str, object]:
+    """Read a shard report written by `--batch`."""
+
+    report = loads(path.read_bytes())
+    if not isinstance(report, Mapping):
+        message = f"{path} is not a batch report"
+        raise TypeError(message)
+    return cast("Mapping[str, object]", report)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Merge x_make_markdown_x per-shard batch reports"
+    )
+    parser.add_argument("reports", nargs="+", type=Path, help="Shard report files")
+    parser.add_argument(
+        "--output", type=Path, help="Write the merged report here instead of stdout"
+    )
+    parser.add_argument("--compact", action="store_true", help="Single-line JSON")
+    parsed = parser.parse_args(argv)
+    parsed_map = cast("dict[str, object]", vars(parsed))
+
+    try:
+        merged = merge_reports(
+            load_report(path) for path in cast("list[Path]", parsed_map["reports"])
+        )
+    except (OSError, TypeError, ValueError) as exc:
+        parser.error(str(exc))
+    encoded = dumps_bytes(merged, compact=bool(parsed_map["compact"])) + b"\n"
+    output = cast("Path | None", parsed_map.get("output"))
+    if output is None:
+        write_stream(_sys.stdout, encoded)
+    else:
+        output.write_bytes(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+
+__all__ = [
+    "BATCH_SCHEMA_VERSION",
+    "MANIFEST_SUFFIX",
+    "BatchItem",
+    "ShardSpec",
+    "iter_batch_items",
+    "load_report",
+    "merge_reports",
+    "run_batch",
+    "shard_for",
+]
@@ -0,0 +1,366 @@
+"""Coalesced PDF export: many small documents, one wkhtmltopdf run.
+
+Starting wkhtmltopdf and its rendering engine costs far more than laying out
+a one- or two-page document. `export_coalesced_pdf()` passes every
+document's HTML to a single wkhtmltopdf invocation as separate page objects,
+which yields one combined PDF with a bookmark per document. The outline
+wkhtmltopdf dumps alongside gives each document's page range, and when pypdf
+is installed the combined PDF can be split back into per-document files.
+"""
+
+from __future__ import annotations
+
+import html
+import importlib
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import TYPE_CHECKING, Protocol, cast
+from xml.etree import ElementTree
+
+from x_make_markdown_x.runners import CancellableRunner
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from x_make_common_x.exporters import CommandRunner
+
+EXPORTER_NAME = "wkhtmltopdf"
+
+# Zero-height heading: invisible on the page, but wkhtmltopdf turns it into
+# the document's bookmark and records its page in the dumped outline.
+_MARKER_STYLE = "font-size:0;line-height:0;height:0;margin:0;padding:0"
+# Return code recorded when the binary could not be launched at all.
+_NOT_STARTED = 127
+
+
+class _PdfReader(Protocol):
+    pages: Sequence[object]
+
+
+class _PdfWriter(Protocol):
+    def add_page(self, page: object) -> object: ...
+
+    def write(self, stream: str) -> object: ...
+
+
+class _PypdfModule(Protocol):
+    def PdfReader(self, stream: str) -> _PdfReader: ...
+
+    def PdfWriter(self) -> _PdfWriter: ...
+
+
+def _load_pypdf() -> _PypdfModule | None:
+    """Import pypdf when installed; page counts and splitting are optional."""
+
+    try:
+        return cast("_PypdfModule", importlib.import_module("pypdf"))
+    except ModuleNotFoundError:
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class CoalescedDocument:
+    """One document of a coalesced export; `split_path` receives its pages.
+
+    Relative links and image sources in `html` resolve against `base_dir`,
+    normally the directory of the document's markdown.
+    """
+
+    title: str
+    html: str
+    split_path: Path | None = None
+    base_dir: Path | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PageRange:
+    """1-based, inclusive pages of the combined PDF; `last` None means the end."""
+
+    first: int
+    last: int | None
+
+    def to_metadata(self) -> dict[str, object]:
+        return {"first": self.first, "last": self.last}
+
+
+@dataclass(frozen=True, slots=True)
+class CoalescedExport:
+    """Outcome of one coalesced wkhtmltopdf run."""
+
+    succeeded: bool
+    output_path: Path | None
+    command: tuple[str, ...]
+    stdout: str
+    stderr: str
+    binary_path: Path
+    html_paths: tuple[Path | None, ...]
+    page_ranges: tuple[PageRange, ...] | None
+    split_paths: tuple[Path | None, ...]
+    detail: str | None = None
+
+    def document_metadata(self, position: int) -> dict[str, object]:
+        """Export metadata for one document, shaped like `ExportResult`'s."""
+
+        split_path = self.split_paths[position]
+        html_path = self.html_paths[position]
+        return {
+            "exporter": EXPORTER_NAME,
+            "succeeded": self.succeeded,
+            "output_path": (
+                str(split_path or self.output_path) if self.succeeded else None
+            ),
+            "command": list(self.command),
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+            "inputs": {} if html_path is None else {"html": str(html_path)},
+            "binary_path": str(self.binary_path),
+            "detail": self.detail,
+        }
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "succeeded": self.succeeded,
+            "output_path": str(self.output_path) if self.output_path else None,
+            "documents": len(self.html_paths),
+            "page_ranges": (
+                None
+                if self.page_ranges is None
+                else [page_range.to_metadata() for page_range in self.page_ranges]
+            ),
+            "split": sum(path is not None for path in self.split_paths),
+            "detail": self.detail,
+        }
+
+
+def marker_title(position: int, title: str) -> str:
+    """Return the bookmark title of the document at `position`.
+
+    The position prefix keeps markers unique, so a body heading that repeats
+    a document title cannot be mistaken for that document's start.
+    """
+
+    return f"{position + 1:05d} {title}"
+
+
+def _page_document(marker: str, body: str, base_dir: Path | None = None) -> str:
+    escaped = html.escape(marker)
+    # The page is written to a scratch directory; point relative URLs home.
+    base = (
+        ""
+        if base_dir is None
+        else f'<base href="{html.escape(base_dir.resolve().as_uri())}/">'
+    )
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f"{base}<title>{escaped}</title></head><body>\n"
+        f'<h1 style="{_MARKER_STYLE}">{escaped}</h1>\n{body}\n</body></html>\n'
+    )
+
+
+def outline_start_pages(outline_xml: Path, titles: Sequence[str]) -> list[int] | None:
+    """Return each document's first page from a `--dump-outline` file.
+
+    Outline items appear in document order and each document opens with its
+    marker heading, so markers are matched to `titles` (see `marker_title`)
+    in sequence. None when the outline does not contain every marker.
+    """
+
+    # The outline is written by our own wkhtmltopdf run, not untrusted input.
+    tree = ElementTree.parse(outline_xml)
+    starts: list[int] = []
+    for element in tree.getroot().iter():
+        if len(starts) == len(titles):
+            break
+        if not element.tag.endswith("item"):
+            continue
+        if element.get("title") == titles[len(starts)]:
+            starts.append(int(element.get("page", "0")))
+    return starts if len(starts) == len(titles) else None
+
+
+def _page_ranges(starts: Sequence[int], total_pages: int | None) -> list[PageRange]:
+    ends = [start - 1 for start in starts[1:]]
+    return [
+        PageRange(start, end)
+        for start, end in zip(starts, [*ends, total_pages], strict=True)
+    ]
+
+
+def _split_pdf(
+    pypdf: _PypdfModule,
+    combined: Path,
+    documents: Sequence[CoalescedDocument],
+    ranges: Sequence[PageRange],
+) -> list[Path | None]:
+    reader = pypdf.PdfReader(str(combined))
+    written: list[Path | None] = []
+    for document, page_range in zip(documents, ranges, strict=True):
+        if document.split_path is None:
+            written.append(None)
+            continue
+        writer = pypdf.PdfWriter()
+        last = page_range.last if page_range.last is not None else len(reader.pages)
+        for page in reader.pages[page_range.first - 1 : last]:
+            writer.add_page(page)
+        document.split_path.parent.mkdir(parents=True, exist_ok=True)
+        writer.write(str(document.split_path))
+        written.append(document.split_path)
+    return written
+
+
+def _post_processing_errors(
+    pypdf: _PypdfModule | None,
+) -> tuple[type[Exception], ...]:
+    """Errors from reading the outline or the combined PDF, pypdf's included."""
+
+    errors: tuple[type[Exception], ...] = (ElementTree.ParseError, OSError, ValueError)
+    if pypdf is None:
+        return errors
+    pypdf_error = getattr(importlib.import_module("pypdf.errors"), "PyPdfError", None)
+    if isinstance(pypdf_error, type) and issubclass(pypdf_error, Exception):
+        return (*errors, pypdf_error)
+    return errors
+
+
+def _lay_out_pages(
+    pypdf: _PypdfModule | None,
+    outline_path: Path,
+    markers: Sequence[str],
+    output_pdf: Path,
+    split_documents: Sequence[CoalescedDocument] | None,
+) -> tuple[list[PageRange] | None, list[Path | None], str | None]:
+    """Return page ranges, split PDFs and a detail for a successful run."""
+
+    split_paths: list[Path | None] = [None] * len(markers)
+    starts = (
+        outline_start_pages(outline_path, markers) if outline_path.is_file() else None
+    )
+    if starts is None:
+        detail = "page ranges unavailable: outline did not list every document"
+        return None, split_paths, detail
+    total = None if pypdf is None else len(pypdf.PdfReader(str(output_pdf)).pages)
+    ranges = _page_ranges(starts, total)
+    if split_documents is None:
+        return ranges, split_paths, None
+    if pypdf is None:
+        return ranges, split_paths, "per-document PDFs skipped: pypdf is not installed"
+    return ranges, _split_pdf(pypdf, output_pdf, split_documents, ranges), None
+
+
+def _command_runner(
+    runner: CommandRunner | None, timeout: float | None
+) -> CommandRunner:
+    if runner is None:
+        return CancellableRunner(timeout=timeout)
+    if isinstance(runner, CancellableRunner) and timeout is not None:
+        return runner.with_timeout(timeout)
+    return runner
+
+
+def _run(runner: CommandRunner, command: Sequence[str]) -> CompletedProcess[str]:
+    try:
+        return runner(command)
+    except OSError as exc:
+        return CompletedProcess(list(command), _NOT_STARTED, "", str(exc))
+
+
+def _failure_detail(runner: CommandRunner, completed: CompletedProcess[str]) -> str:
+    if isinstance(runner, CancellableRunner) and runner.timed_out:
+        budget = runner.timeout or 0.0
+        return f"wkhtmltopdf exceeded its {budget:.3g}s budget and was killed"
+    if completed.returncode == _NOT_STARTED:
+        return f"wkhtmltopdf could not be started: {completed.stderr}"
+    return "wkhtmltopdf execution failed"
+
+
+def export_coalesced_pdf(
+    documents: Sequence[CoalescedDocument],
+    *,
+    output_pdf: Path,
+    wkhtmltopdf_path: str | Path,
+    runner: CommandRunner | None = None,
+    timeout: float | None = None,
+    split: bool = False,
+    keep_html: bool = False,
+) -> CoalescedExport:
+    """Render `documents` into `output_pdf` with one wkhtmltopdf invocation.
+
+    `timeout` bounds the run in seconds, like a single export's budget; an
+    overrunning run is killed and reported as failed. With `split`,
+    documents that name a `split_path` get their own PDF cut from the
+    combined one; that needs pypdf and the dumped outline.
+    """
+
+    binary = Path(wkhtmltopdf_path)
+    output_pdf.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix=".coalesce-", dir=output_pdf.parent))
+    html_paths = tuple(
+        work_dir / f"{position:05d}.html" for position in range(len(documents))
+    )
+    markers = [
+        marker_title(position, document.title)
+        for position, document in enumerate(documents)
+    ]
+    for document, marker, html_path in zip(documents, markers, html_paths, strict=True):
+        html_path.write_text(
+            _page_document(marker, document.html, document.base_dir),
+            encoding="utf-8",
+        )
+    outline_path = work_dir / "outline.xml"
+    command = (
+        str(binary),
+        "--outline",
+        "--dump-outline",
+        str(outline_path),
+        *map(str, html_paths),
+        str(output_pdf),
+    )
+    active_runner = _command_runner(runner, timeout)
+    try:
+        completed = _run(active_runner, command)
+        succeeded = completed.returncode == 0 and output_pdf.is_file()
+        ranges: list[PageRange] | None = None
+        split_paths: list[Path | None] = [None] * len(documents)
+        detail = None if succeeded else _failure_detail(active_runner, completed)
+        if succeeded:
+            pypdf = _load_pypdf()
+            try:
+                ranges, split_paths, detail = _lay_out_pages(
+                    pypdf,
+                    outline_path,
+                    markers,
+                    output_pdf,
+                    documents if split else None,
+                )
+            except _post_processing_errors(pypdf) as exc:
+                succeeded = False
+                detail = f"coalesced PDF post-processing failed: {exc}"
+    finally:
+        if not keep_html:
+            for path in (*html_paths, outline_path):
+                path.unlink(missing_ok=True)
+            work_dir.rmdir()
+    return CoalescedExport(
+        succeeded=succeeded,
+        output_path=output_pdf if succeeded else None,
+        command=command,
+        stdout=completed.stdout or "",
+        stderr=completed.stderr or "",
+        binary_path=binary,
+        html_paths=html_paths if keep_html else (None,) * len(html_paths),
+        page_ranges=None if ranges is None else tuple(ranges),
+        split_paths=tuple(split_paths),
+        detail=detail,
+    )
+
+
+__all__ = [
+    "CoalescedDocument",
+    "CoalescedExport",
+    "PageRange",
+    "export_coalesced_pdf",
+    "marker_title",
+    "outline_start_pages",
+]
@@ -0,0 +1,211 @@
+"""Typed documents for in-process callers of x_make_markdown_x.
+
+Each block kind of the JSON contract has a frozen, slotted dataclass here.
+The constraints `INPUT_SCHEMA` enforces per call are checked once, when a
+block is constructed, so `render_document()` can hand trusted blocks to the
+builder without schema validation, dict copies, or per-field coercion.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, ClassVar, Protocol
+
+from x_make_markdown_x.json_contracts import MAX_HEADER_LEVEL
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from pathlib import Path
+
+    from x_make_markdown_x.x_cls_make_markdown_x import XClsMakeMarkdownX
+
+
+def _require(condition: object, message: str) -> None:
+    if not condition:
+        raise ValueError(message)
+
+
+def _strings(values: tuple[str, ...], what: str, *, non_empty: bool = False) -> None:
+    for value in values:
+        _require(isinstance(value, str), f"{what} must be strings")
+        if non_empty:
+            _require(bool(value), f"{what} must not be empty")
+
+
+class Block(Protocol):
+    """A block that renders itself onto a builder."""
+
+    kind: ClassVar[str]
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None: ...
+
+
+@dataclass(frozen=True, slots=True)
+class Header:
+    """A numbered header; `level` is 1-6."""
+
+    kind: ClassVar[str] = "header"
+
+    text: str
+    level: int = 1
+
+    def __post_init__(self) -> None:
+        _require(isinstance(self.text, str), "header text must be a string")
+        _require(bool(self.text), "header text must not be empty")
+        _require(
+            isinstance(self.level, int) and 1 <= self.level <= MAX_HEADER_LEVEL,
+            f"header level must be between 1 and {MAX_HEADER_LEVEL}",
+        )
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_header(self.text, level=self.level)
+
+
+@dataclass(frozen=True, slots=True)
+class Paragraph:
+    """A paragraph of markdown text."""
+
+    kind: ClassVar[str] = "paragraph"
+
+    text: str
+
+    def __post_init__(self) -> None:
+        _require(isinstance(self.text, str), "paragraph text must be a string")
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_paragraph(self.text)
+
+
+@dataclass(frozen=True, slots=True)
+class Table:
+    """An inline table; rows are tuples of cell strings."""
+
+    kind: ClassVar[str] = "table"
+
+    headers: tuple[str, ...]
+    rows: tuple[tuple[str, ...], ...] = ()
+
+    def __post_init__(self) -> None:
+        _require(bool(self.headers), "table needs at least one header")
+        _strings(self.headers, "table headers", non_empty=True)
+        for row in self.rows:
+            _require(bool(row), "table rows must not be empty")
+            _strings(row, "table cells")
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_table(self.headers, self.rows)
+
+
+@dataclass(frozen=True, slots=True)
+class Image:
+    """An image reference with required alt text."""
+
+    kind: ClassVar[str] = "image"
+
+    alt_text: str
+    url: str
+
+    def __post_init__(self) -> None:
+        _strings((self.alt_text, self.url), "image alt text and url", non_empty=True)
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_image(self.alt_text, self.url)
+
+
+@dataclass(frozen=True, slots=True)
+class ListBlock:
+    """A bulleted or numbered list."""
+
+    kind: ClassVar[str] = "list"
+
+    items: tuple[str, ...]
+    ordered: bool = False
+
+    def __post_init__(self) -> None:
+        _require(bool(self.items), "list needs at least one item")
+        _strings(self.items, "list items")
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_list(self.items, ordered=self.ordered)
+
+
+@dataclass(frozen=True, slots=True)
+class Raw:
+    """Pre-rendered markdown emitted verbatim."""
+
+    kind: ClassVar[str] = "raw"
+
+    text: str
+
+    def __post_init__(self) -> None:
+        _require(isinstance(self.text, str), "raw text must be a string")
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_raw(self.text)
+
+
+@dataclass(frozen=True, slots=True)
+class CsvTable:
+    """A table streamed from a local CSV/TSV file."""
+
+    kind: ClassVar[str] = "csv_table"
+
+    path: str | Path
+    delimiter: str | None = None
+    columns: tuple[str | int, ...] | None = None
+    limit: int | None = None
+    header: bool = True
+    headers: tuple[str, ...] | None = None
+
+    def __post_init__(self) -> None:
+        _require(
+            self.delimiter is None or len(self.delimiter) == 1,
+            "csv delimiter must be a single character",
+        )
+        _require(
+            self.columns is None or bool(self.columns),
+            "csv columns must not be empty",
+        )
+        _require(self.limit is None or self.limit >= 0, "csv limit must be >= 0")
+        if self.headers is not None:
+            _require(bool(self.headers), "csv headers must not be empty")
+            _strings(self.headers, "csv headers", non_empty=True)
+
+    def apply(self, builder: XClsMakeMarkdownX) -> None:
+        builder.add_csv_table(
+            self.path,
+            delimiter=self.delimiter,
+            columns=self.columns,
+            limit=self.limit,
+            header=self.header,
+            headers=self.headers,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Document:
+    """An ordered tuple of blocks plus document-level options."""
+
+    blocks: tuple[Block, ...]
+    include_toc: bool = False
+    metadata: Mapping[str, object] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for block in self.blocks:
+            _require(
+                callable(getattr(block, "apply", None)),
+                f"{type(block).__name__} is not a document block",
+            )
+
+
+__all__ = [
+    "Block",
+    "CsvTable",
+    "Document",
+    "Header",
+    "Image",
+    "ListBlock",
+    "Paragraph",
+    "Raw",
+    "Table",
+]
@@ -0,0 +1,186 @@
+"""Buffered JSON-lines event log for x_make_markdown_x.
+
+An `EventSink` replaces the per-message `print` of verbose mode. `emit()`
+only checks the level and appends a record to an in-memory buffer; a
+background thread encodes the buffered records and writes them to stderr or
+a file in one call per flush, so verbose output can stay on in production
+and never interleaves with JSON results on stdout.
+"""
+
+from __future__ import annotations
+
+import sys as _sys
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import IO, BinaryIO, Self
+
+from x_make_markdown_x.jsonio import dumps_bytes, write_stream
+
+LEVELS: dict[str, int] = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+DEFAULT_FLUSH_SECONDS = 0.5
+DEFAULT_MAX_BUFFERED = 1024
+
+
+def _encode(record: dict[str, object]) -> bytes:
+    try:
+        return dumps_bytes(record, compact=True)
+    except (TypeError, ValueError):
+        plain = {
+            key: value if isinstance(value, (str, int, float, bool)) else str(value)
+            for key, value in record.items()
+        }
+        return dumps_bytes(plain, compact=True)
+
+
+class EventSink:
+    """Level-filtered, buffered JSON-lines writer with a background flush.
+
+    `target` is a text stream (such as `sys.stderr`) or a path to append to.
+    Records are flushed every `flush_seconds`, as soon as `max_buffered`
+    records are waiting, and on `close()`. The first write error is reported
+    once on stderr and kept in `error`; later records are dropped rather
+    than buffered without bound.
+    """
+
+    def __init__(
+        self,
+        target: IO[str] | str | Path,
+        *,
+        level: str = "info",
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+    ) -> None:
+        if level not in LEVELS:
+            message = f"unknown event level {level!r}; expected one of {list(LEVELS)}"
+            raise ValueError(message)
+        self._threshold = LEVELS[level]
+        self._max_buffered = max_buffered
+        self._stream: IO[str] | None = None
+        self._file: BinaryIO | None = None
+        if isinstance(target, (str, Path)):
+            path = Path(target)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = path.open("ab")
+        else:
+            self._stream = target
+        self._buffer: list[dict[str, object]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.error: Exception | None = None
+        self._flush_seconds = flush_seconds
+        self._thread = threading.Thread(
+            target=self._run, name="x_make_markdown_x-events", daemon=True
+        )
+        self._thread.start()
+
+    def enabled(self, level: str) -> bool:
+        return LEVELS.get(level, 0) >= self._threshold
+
+    def emit(self, event: str, level: str = "info", /, **fields: object) -> None:
+        """Queue one record; cheap enough to call on the render path."""
+
+        if (
+            self._closed
+            or self.error is not None
+            or LEVELS.get(level, 0) < self._threshold
+        ):
+            return
+        record: dict[str, object] = {
+            "ts": time.time(),
+            "level": level,
+            "event": event,
+            **fields,
+        }
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self._max_buffered
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Encode and write everything buffered so far."""
+
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+        if not pending:
+            return
+        data = b"".join(_encode(record) + b"\n" for record in pending)
+        with self._write_lock:
+            if self.error is not None:
+                return
+            try:
+                if self._file is not None:
+                    self._file.write(data)
+                    self._file.flush()
+                elif self._stream is not None:
+                    write_stream(self._stream, data)
+            except (OSError, ValueError) as exc:
+                self._fail(exc)
+
+    def _fail(self, exc: Exception) -> None:
+        self.error = exc
+        with self._lock:
+            self._buffer = []
+        # The sink itself may be stderr; then there is nowhere left to report.
+        with suppress(OSError, ValueError):
+            _sys.stderr.write(f"[x_make_markdown_x] event log disabled: {exc}\n")
+
+    def close(self) -> None:
+        """Stop the flush thread and write the remaining records."""
+
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+
+_active: EventSink | None = None
+
+
+def configure_events(sink: EventSink | None) -> EventSink | None:
+    """Install `sink` as the process-wide event sink; return the previous one."""
+
+    global _active
+    previous, _active = _active, sink
+    return previous
+
+
+def active_sink() -> EventSink | None:
+    return _active
+
+
+def open_sink(target: str, *, level: str = "info") -> EventSink:
+    """Open a sink for a CLI `--event-log` value; `-` means stderr."""
+
+    if target == "-":
+        return EventSink(_sys.stderr, level=level)
+    return EventSink(target, level=level)
+
+
+__all__ = [
+    "LEVELS",
+    "EventSink",
+    "active_sink",
+    "configure_events",
+    "open_sink",
+]
@@ -5,6 +5,8 @@ from __future__ import annotations
 import sys as _sys
 from typing import TYPE_CHECKING
 
+MAX_HEADER_LEVEL = 6
+
 _JSON_VALUE_TYPES: list[str] = [
     "object",
     "array",
@@ -19,7 +21,7 @@ _HEADER_BLOCK: dict[str, object] = {
     "properties": {
         "kind": {"const": "header"},
         "text": {"type": "string", "minLength": 1},
-        "level": {"type": "integer", "minimum": 1, "maximum": 6},
+        "level": {"type": "integer", "minimum": 1, "maximum": MAX_HEADER_LEVEL},
     },
     "required": ["kind", "text", "level"],
     "additionalProperties": False,
@@ -93,6 +95,29 @@ _RAW_BLOCK: dict[str, object] = {
     "additionalProperties": False,
 }
 
+_CSV_TABLE_BLOCK: dict[str, object] = {
+    "type": "object",
+    "properties": {
+        "kind": {"const": "csv_table"},
+        "path": {"type": "string", "minLength": 1},
+        "delimiter": {"type": "string", "minLength": 1, "maxLength": 1},
+        "columns": {
+            "type": "array",
+            "items": {"type": ["string", "integer"], "minLength": 1, "minimum": 0},
+            "minItems": 1,
+        },
+        "limit": {"type": "integer", "minimum": 0},
+        "header": {"type": "boolean"},
+        "headers": {
+            "type": "array",
+            "items": {"type": "string", "minLength": 1},
+            "minItems": 1,
+        },
+    },
+    "required": ["kind", "path"],
+    "additionalProperties": False,
+}
+
 _BLOCK_SCHEMA: dict[str, object] = {
     "oneOf": [
         _HEADER_BLOCK,
@@ -101,6 +126,7 @@ _BLOCK_SCHEMA: dict[str, object] = {
         _IMAGE_BLOCK,
         _LIST_BLOCK,
         _RAW_BLOCK,
+        _CSV_TABLE_BLOCK,
     ]
 }
 
@@ -121,6 +147,16 @@ _DOCUMENT_SCHEMA: dict[str, object] = {
     "additionalProperties": False,
 }
 
+_LINT_OPTIONS_SCHEMA: dict[str, object] = {
+    "type": "object",
+    "properties": {
+        "enabled": {"type": "boolean"},
+        "max_line_length": {"type": "integer", "minimum": 1},
+        "fail_on": {"enum": ["info", "warning", "error"]},
+    },
+    "additionalProperties": False,
+}
+
 _PDF_METADATA_SCHEMA: dict[str, object] = {
     "type": "object",
     "properties": {
@@ -158,7 +194,19 @@ _MARKDOWN_ARTIFACT_SCHEMA: dict[str, object] = {
     "properties": {
         "path": {"type": "string", "minLength": 1},
         "bytes": {"type": "integer", "minimum": 0},
+        "uncompressed_bytes": {"type": "integer", "minimum": 0},
+        "compression": {"enum": ["gzip", "xz"]},
+        "section_index": {"type": "string", "minLength": 1},
         "pdf": _PDF_METADATA_SCHEMA,
+        "pdf_pages": {
+            "type": "object",
+            "properties": {
+                "first": {"type": "integer", "minimum": 1},
+                "last": {"type": ["integer", "null"], "minimum": 1},
+            },
+            "required": ["first", "last"],
+            "additionalProperties": False,
+        },
     },
     "required": ["path", "bytes"],
     "additionalProperties": True,
@@ -176,6 +224,17 @@ INPUT_SCHEMA: dict[str, object] = {
                 "output_markdown": {"type": "string", "minLength": 1},
                 "wkhtmltopdf_path": {"type": ["string", "null"], "minLength": 1},
                 "export_pdf": {"type": "boolean"},
+                "stage_images": {"type": "boolean"},
+                "asset_workers": {"type": "integer", "minimum": 1},
+                "image_max_dimension": {"type": "integer", "minimum": 1},
+                "memory_budget_bytes": {"type": "integer", "minimum": 1},
+                "lint": _LINT_OPTIONS_SCHEMA,
+                "compression": {"enum": ["none", "gzip", "xz"]},
+                "html_workers": {"type": "integer", "minimum": 1},
+                "export_timeout_seconds": {"type": "number", "exclusiveMinimum": 0},
+                "deadline_seconds": {"type": "number", "exclusiveMinimum": 0},
+                "section_index": {"type": "boolean"},
+                "append": {"type": "boolean"},
                 "document": _DOCUMENT_SCHEMA,
                 "metadata": {
                     "type": "object",
@@ -232,4 +291,4 @@ ERROR_SCHEMA: dict[str, object] = {
 if not TYPE_CHECKING:
     _sys.modules.setdefault("json_contracts", _sys.modules[__name__])
 
-__all__ = ["ERROR_SCHEMA", "INPUT_SCHEMA", "OUTPUT_SCHEMA"]
+__all__ = ["ERROR_SCHEMA", "INPUT_SCHEMA", "MAX_HEADER_LEVEL", "OUTPUT_SCHEMA"]
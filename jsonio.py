@@ -0,0 +1,221 @@
+"""JSON encoding and decoding for payloads and results.
+
+Uses orjson or msgspec when one is installed and falls back to the stdlib
+`json` module otherwise. Set `X_MARKDOWN_JSON_BACKEND` to `orjson`,
+`msgspec`, or `json` to pin a backend. Anything a fast backend rejects
+(NaN literals, integers wider than 64 bits, non-string keys) is retried
+with the stdlib, so every backend accepts the same documents and decodes
+them to equal values. Values holding non-finite floats, which the fast
+backends would write as `null`, are encoded by the stdlib as `NaN` and
+`Infinity`. Output differs only in spelling: fast backends write non-ASCII
+text as UTF-8 rather than `\\u` escapes.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import math
+import os as _os
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Protocol, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+JSON_BACKEND_ENV_VAR = "X_MARKDOWN_JSON_BACKEND"
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class _OrjsonModule(Protocol):
+    OPT_INDENT_2: int
+    JSONDecodeError: type[Exception]
+    JSONEncodeError: type[Exception]
+
+    def loads(self, data: bytes) -> object: ...
+
+    def dumps(self, obj: object, option: int | None = None) -> bytes: ...
+
+
+class _MsgspecJson(Protocol):
+    def decode(self, data: bytes) -> object: ...
+
+    def encode(self, obj: object) -> bytes: ...
+
+    def format(self, data: bytes, *, indent: int = 2) -> bytes: ...
+
+
+class _MsgspecModule(Protocol):
+    json: _MsgspecJson
+    MsgspecError: type[Exception]
+
+
+@dataclass(frozen=True, slots=True)
+class JsonBackend:
+    """One JSON implementation: a decoder, two encoders, and its errors."""
+
+    name: str
+    decode: Callable[[bytes], object]
+    encode_compact: Callable[[object], bytes]
+    encode_indented: Callable[[object], bytes]
+    errors: tuple[type[Exception], ...] = ()
+
+
+def _stdlib_compact(obj: object) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _stdlib_indented(obj: object) -> bytes:
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+_STDLIB = JsonBackend("json", json.loads, _stdlib_compact, _stdlib_indented)
+
+
+def _orjson_backend() -> JsonBackend:
+    module = cast("_OrjsonModule", importlib.import_module("orjson"))
+    indent = module.OPT_INDENT_2
+    return JsonBackend(
+        "orjson",
+        module.loads,
+        module.dumps,
+        lambda obj: module.dumps(obj, option=indent),
+        (module.JSONDecodeError, module.JSONEncodeError),
+    )
+
+
+def _msgspec_backend() -> JsonBackend:
+    module = cast("_MsgspecModule", importlib.import_module("msgspec"))
+    codec = module.json
+    return JsonBackend(
+        "msgspec",
+        codec.decode,
+        codec.encode,
+        lambda obj: codec.format(codec.encode(obj), indent=2),
+        (module.MsgspecError,),
+    )
+
+
+_LOADERS: dict[str, Callable[[], JsonBackend]] = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": lambda: _STDLIB,
+}
+
+
+def load_backend(name: str | None = None) -> JsonBackend:
+    """Return the named backend, or the fastest one installed.
+
+    A named backend that is not installed raises `ModuleNotFoundError`.
+    """
+
+    if name:
+        try:
+            loader = _LOADERS[name]
+        except KeyError:
+            message = f"unknown JSON backend {name!r}; expected one of {BACKENDS}"
+            raise ValueError(message) from None
+        return loader()
+    for candidate in BACKENDS:
+        try:
+            return _LOADERS[candidate]()
+        except ModuleNotFoundError:
+            continue
+    return _STDLIB
+
+
+_backend: JsonBackend | None = None
+
+
+def active_backend() -> JsonBackend:
+    """Return the process-wide backend, chosen on first use."""
+
+    global _backend
+    if _backend is None:
+        _backend = load_backend(_os.environ.get(JSON_BACKEND_ENV_VAR) or None)
+    return _backend
+
+
+def loads(data: bytes | str, *, backend: JsonBackend | None = None) -> object:
+    """Decode one JSON document."""
+
+    chosen = backend or active_backend()
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    if chosen.errors:
+        try:
+            return chosen.decode(raw)
+        except chosen.errors:
+            pass
+    return json.loads(raw)
+
+
+def _has_non_finite(obj: object) -> bool:
+    """Return whether `obj` holds a NaN or infinite float at any depth."""
+
+    pending = [obj]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            pending.extend(cast("dict[object, object]", value).values())
+        elif isinstance(value, list | tuple):
+            pending.extend(cast("list[object] | tuple[object, ...]", value))
+    return False
+
+
+def dumps_bytes(
+    obj: object, *, compact: bool = False, backend: JsonBackend | None = None
+) -> bytes:
+    """Encode `obj` as UTF-8 JSON, indented by two spaces unless `compact`."""
+
+    chosen = backend or active_backend()
+    encode = chosen.encode_compact if compact else chosen.encode_indented
+    if chosen.errors and not _has_non_finite(obj):
+        try:
+            return encode(obj)
+        except chosen.errors:
+            pass
+    return (_STDLIB.encode_compact if compact else _STDLIB.encode_indented)(obj)
+
+
+def dumps(
+    obj: object, *, compact: bool = False, backend: JsonBackend | None = None
+) -> str:
+    """Encode `obj` as a JSON string; see `dumps_bytes`."""
+
+    return dumps_bytes(obj, compact=compact, backend=backend).decode("utf-8")
+
+
+def read_stream(stream: IO[str]) -> object:
+    """Decode a JSON document from a text stream, reading its bytes if it has any."""
+
+    buffer = cast("IO[bytes] | None", getattr(stream, "buffer", None))
+    return loads(stream.read() if buffer is None else buffer.read())
+
+
+def write_stream(stream: IO[str], data: bytes) -> None:
+    """Write encoded JSON to a text stream, bypassing its codec when possible."""
+
+    buffer = cast("IO[bytes] | None", getattr(stream, "buffer", None))
+    if buffer is None:
+        stream.write(data.decode("utf-8"))
+        return
+    stream.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+__all__ = [
+    "BACKENDS",
+    "JSON_BACKEND_ENV_VAR",
+    "JsonBackend",
+    "active_backend",
+    "dumps",
+    "dumps_bytes",
+    "load_backend",
+    "loads",
+    "read_stream",
+    "write_stream",
+]
@@ -0,0 +1,194 @@
+"""Accessibility and structure lint for x_make_markdown_x.
+
+The builder calls into `MarkdownLinter` as each block is added, so the
+checks reuse what the builder already knows (header levels, anchors, table
+shapes) instead of re-reading and re-parsing the generated file.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+SEVERITIES: tuple[str, ...] = ("info", "warning", "error")
+DEFAULT_MAX_LINE_LENGTH = 120
+DEFAULT_REPORTED_FINDINGS = 100
+
+PLACEHOLDER_ALT_TEXT = frozenset(
+    {
+        "alt",
+        "alt text",
+        "graphic",
+        "image",
+        "img",
+        "photo",
+        "picture",
+        "placeholder",
+        "screenshot",
+        "tbd",
+        "todo",
+        "untitled",
+    }
+)
+
+
+def severity_rank(severity: str) -> int:
+    """Return the ordinal of `severity`; unknown names raise ValueError."""
+
+    try:
+        return SEVERITIES.index(severity)
+    except ValueError:
+        message = f"severity must be one of {', '.join(SEVERITIES)}"
+        raise ValueError(message) from None
+
+
+@dataclass(frozen=True, slots=True)
+class LintFinding:
+    """One lint result tied to the 1-based block that produced it."""
+
+    rule: str
+    severity: str
+    message: str
+    block: int
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "rule": self.rule,
+            "severity": self.severity,
+            "message": self.message,
+            "block": self.block,
+        }
+
+
+class MarkdownLinter:
+    """Collect findings while blocks are rendered."""
+
+    def __init__(
+        self, *, max_line_length: int | None = DEFAULT_MAX_LINE_LENGTH
+    ) -> None:
+        self.max_line_length = max_line_length
+        self.findings: list[LintFinding] = []
+        self._block = 0
+        self._last_level = 0
+        self._anchors: set[str] = set()
+
+    def _next_block(self) -> int:
+        self._block += 1
+        return self._block
+
+    def _report(self, rule: str, severity: str, message: str, block: int) -> None:
+        self.findings.append(LintFinding(rule, severity, message, block))
+
+    def check_header(self, text: str, level: int, anchor: str) -> None:
+        block = self._next_block()
+        if level > self._last_level + 1:
+            self._report(
+                "header-level-jump",
+                "warning",
+                f"header {text!r} jumps from level {self._last_level} to {level}",
+                block,
+            )
+        self._last_level = level
+        if anchor in self._anchors:
+            self._report(
+                "duplicate-anchor",
+                "error",
+                f"anchor #{anchor} is already used by an earlier header",
+                block,
+            )
+        self._anchors.add(anchor)
+        self._check_lines(text, block)
+
+    def check_image(self, alt_text: str, url: str) -> None:
+        block = self._next_block()
+        normalized = alt_text.strip().lower()
+        if not normalized:
+            self._report(
+                "image-alt-missing", "error", f"image {url!r} has no alt text", block
+            )
+            return
+        file_name = PurePosixPath(urlparse(url).path).name.lower()
+        if normalized in PLACEHOLDER_ALT_TEXT or normalized in {
+            file_name,
+            PurePosixPath(file_name).stem,
+        }:
+            self._report(
+                "image-alt-placeholder",
+                "warning",
+                f"image {url!r} has placeholder alt text {alt_text!r}",
+                block,
+            )
+
+    def check_table(
+        self, headers: Sequence[str], rows: Sequence[Sequence[str]]
+    ) -> None:
+        width = len(headers)
+        self.check_table_shape(
+            width,
+            [index for index, row in enumerate(rows, start=1) if len(row) != width],
+        )
+
+    def check_table_shape(self, width: int, mismatched: Sequence[int]) -> None:
+        """Report the 1-based data rows of a streamed table that had wrong width."""
+
+        block = self._next_block()
+        if mismatched:
+            self._report(
+                "table-row-width",
+                "error",
+                f"{len(mismatched)} row(s) do not have {width} cells "
+                f"(first: row {mismatched[0]})",
+                block,
+            )
+
+    def check_text(self, text: str) -> None:
+        self._check_lines(text, self._next_block())
+
+    def _check_lines(self, text: str, block: int) -> None:
+        limit = self.max_line_length
+        if limit is None or len(text) <= limit:
+            return
+        longest = max(len(line) for line in text.splitlines() or [""])
+        if longest > limit:
+            self._report(
+                "line-length",
+                "info",
+                f"line of {longest} characters exceeds {limit}",
+                block,
+            )
+
+    def counts(self) -> dict[str, int]:
+        counter = Counter(finding.severity for finding in self.findings)
+        return {severity: counter.get(severity, 0) for severity in SEVERITIES}
+
+    def exceeds(self, fail_on: str) -> bool:
+        """Return True when any finding is at or above `fail_on` severity."""
+
+        threshold = severity_rank(fail_on)
+        return any(
+            severity_rank(finding.severity) >= threshold for finding in self.findings
+        )
+
+    def to_metadata(self, limit: int = DEFAULT_REPORTED_FINDINGS) -> dict[str, object]:
+        report: dict[str, object] = {
+            "counts": self.counts(),
+            "findings": [finding.to_metadata() for finding in self.findings[:limit]],
+        }
+        if len(self.findings) > limit:
+            report["truncated"] = len(self.findings) - limit
+        return report
+
+
+__all__ = [
+    "PLACEHOLDER_ALT_TEXT",
+    "SEVERITIES",
+    "LintFinding",
+    "MarkdownLinter",
+    "severity_rank",
+]
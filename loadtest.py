@@ -0,0 +1,423 @@
+"""Load driver for x_make_markdown_x.
+
+Replays a corpus of synthetic or recorded payloads against `main_json`
+in-process (or against the JSON CLI in subprocesses) at a fixed concurrency
+or arrival rate, and reports throughput, latency percentiles and peak RSS.
+PDF exports go to a fake wkhtmltopdf that writes a placeholder file, so the
+numbers describe this tool rather than the renderer and the driver runs
+anywhere.
+
+Usage:
+    python -m x_make_markdown_x.loadtest --requests 500 --concurrency 8
+    python -m x_make_markdown_x.loadtest --payload recorded/ --rate 20 --mode cli
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys as _sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import cast
+
+from x_make_markdown_x.run_history import percentile_of
+from x_make_markdown_x.watch import collect_payload_files
+from x_make_markdown_x.x_cls_make_markdown_x import load_json_payload, main_json
+
+MODES: tuple[str, ...] = ("inprocess", "cli")
+DEFAULT_PERCENTILES: tuple[int, ...] = (50, 95, 99)
+# (name, paragraphs, table rows, export_pdf) for the synthetic corpus.
+SYNTHETIC_PROFILES: tuple[tuple[str, int, int, bool], ...] = (
+    ("small", 4, 5, False),
+    ("small-pdf", 4, 5, True),
+    ("large", 400, 2000, False),
+    ("large-pdf", 400, 2000, True),
+)
+
+_FAKE_WKHTMLTOPDF = """\
+#!{python}
+import sys
+from pathlib import Path
+
+Path(sys.argv[-1]).write_bytes(b"%PDF-1.4\\n%%EOF\\n")
+"""
+
+Render = Callable[[Mapping[str, object]], Mapping[str, object]]
+
+
+class FakeWkhtmltopdfRunner:
+    """`CommandRunner` that writes a placeholder PDF instead of running a binary."""
+
+    def __init__(self, *, latency: float = 0.0) -> None:
+        self.latency = latency
+
+    def __call__(self, command: Sequence[str]) -> CompletedProcess[str]:
+        argv = list(command)
+        if self.latency:
+            time.sleep(self.latency)
+        Path(argv[-1]).write_bytes(b"%PDF-1.4\n%%EOF\n")
+        return CompletedProcess(argv, 0, stdout="", stderr="")
+
+
+def write_fake_wkhtmltopdf(directory: Path) -> Path:
+    """Write a wkhtmltopdf stand-in script that CLI-mode payloads can point at."""
+
+    directory.mkdir(parents=True, exist_ok=True)
+    script = directory / "fake_wkhtmltopdf.py"
+    script.write_text(
+        _FAKE_WKHTMLTOPDF.format(python=_sys.executable), encoding="utf-8"
+    )
+    script.chmod(0o755)
+    return script
+
+
+def _synthetic_blocks(paragraphs: int, table_rows: int) -> list[dict[str, object]]:
+    blocks: list[dict[str, object]] = [
+        {"kind": "header", "text": "Load Test", "level": 1}
+    ]
+    for index in range(paragraphs):
+        if index % 20 == 0:
+            blocks.append({"kind": "header", "text": f"Part {index}", "level": 2})
+        blocks.append(
+            {
+                "kind": "paragraph",
+                "text": f"Paragraph {index} of synthetic filler text for sizing.",
+            }
+        )
+    blocks.append(
+        {
+            "kind": "table",
+            "headers": ["row", "value"],
+            "rows": [[str(row), f"{row * 1.5:.2f}"] for row in range(table_rows)],
+        }
+    )
+    return blocks
+
+
+def synthetic_payloads(
+    profiles: Iterable[tuple[str, int, int, bool]] = SYNTHETIC_PROFILES,
+) -> list[dict[str, object]]:
+    """Build one payload per profile; output paths are assigned at replay time."""
+
+    return [
+        {
+            "command": "x_make_markdown_x",
+            "parameters": {
+                "output_markdown": f"{name}.md",
+                "export_pdf": export_pdf,
+                "document": {"blocks": _synthetic_blocks(paragraphs, table_rows)},
+                "metadata": {"document_class": name},
+            },
+        }
+        for name, paragraphs, table_rows, export_pdf in profiles
+    ]
+
+
+def load_payloads(paths: Iterable[Path]) -> list[dict[str, object]]:
+    """Load recorded payloads from files or directories of `*.json` files."""
+
+    return [dict(load_json_payload(str(path))) for path in collect_payload_files(paths)]
+
+
+def prepare_payload(
+    payload: Mapping[str, object],
+    *,
+    output_dir: Path,
+    index: int,
+    wkhtmltopdf_path: Path,
+) -> dict[str, object]:
+    """Give one request its own output path and the fake wkhtmltopdf binary."""
+
+    parameters_obj = payload.get("parameters")
+    parameters = (
+        dict(cast("Mapping[str, object]", parameters_obj))
+        if isinstance(parameters_obj, Mapping)
+        else {}
+    )
+    stem = Path(str(parameters.get("output_markdown") or "document.md")).name
+    parameters["output_markdown"] = str(output_dir / f"{index:06d}-{stem}")
+    if parameters.get("export_pdf"):
+        parameters["wkhtmltopdf_path"] = str(wkhtmltopdf_path)
+    return {**payload, "parameters": parameters}
+
+
+def peak_rss_bytes(*, include_children: bool = False) -> int | None:
+    """Return the peak resident set size, or None where `resource` is missing."""
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    scale = 1 if _sys.platform == "darwin" else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if include_children:
+        peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return int(peak) * scale
+
+
+@dataclass(frozen=True, slots=True)
+class LoadReport:
+    """Aggregate results of one load run."""
+
+    mode: str
+    requests: int
+    failures: int
+    concurrency: int
+    rate: float | None
+    elapsed_seconds: float
+    latencies: tuple[float, ...]
+    peak_rss_bytes: int | None
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def latency_percentiles(
+        self, percentiles: Sequence[int] = DEFAULT_PERCENTILES
+    ) -> dict[str, float]:
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {}
+        return {f"p{p}": percentile_of(ordered, p) for p in percentiles}
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "failures": self.failures,
+            "concurrency": self.concurrency,
+            "rate": self.rate,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+            "throughput_per_second": round(self.throughput, 3),
+            "latency_seconds": {
+                name: round(value, 6)
+                for name, value in self.latency_percentiles().items()
+            },
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+
+
+def _cli_render(payload_dir: Path) -> Render:
+    counter = iter(range(1 << 62))
+    lock = threading.Lock()
+
+    def _render(payload: Mapping[str, object]) -> Mapping[str, object]:
+        with lock:
+            payload_path = payload_dir / f"payload-{next(counter):06d}.json"
+        payload_path.write_text(json.dumps(payload), encoding="utf-8")
+        completed = subprocess.run(
+            [
+                _sys.executable,
+                "-m",
+                "x_make_markdown_x.x_cls_make_markdown_x",
+                "--json-file",
+                str(payload_path),
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        try:
+            result_obj: object = json.loads(completed.stdout)
+        except ValueError:
+            return {"status": "failure", "message": completed.stderr.strip()}
+        if not isinstance(result_obj, Mapping):
+            return {"status": "failure", "message": "CLI did not return an object"}
+        return cast("Mapping[str, object]", result_obj)
+
+    return _render
+
+
+def _default_render(mode: str, output_dir: Path, runner_latency: float) -> Render:
+    if mode == "cli":
+        return _cli_render(output_dir)
+    runner = FakeWkhtmltopdfRunner(latency=runner_latency)
+
+    def _render(payload: Mapping[str, object]) -> Mapping[str, object]:
+        return main_json(payload, runner=runner)
+
+    return _render
+
+
+def run_load(
+    payloads: Sequence[Mapping[str, object]],
+    *,
+    requests: int,
+    concurrency: int = 1,
+    rate: float | None = None,
+    mode: str = "inprocess",
+    output_dir: Path,
+    runner_latency: float = 0.0,
+    render: Render | None = None,
+) -> LoadReport:
+    """Replay `payloads` round-robin until `requests` calls have completed.
+
+    Without `rate` the driver is closed-loop: `concurrency` callers issue the
+    next request as soon as their previous one returns. With `rate` requests
+    arrive on a fixed schedule and latency is measured from the scheduled
+    start, so time spent queueing behind busy callers is included.
+    """
+
+    if not payloads:
+        message = "load run needs at least one payload"
+        raise ValueError(message)
+    if mode not in MODES:
+        message = f"mode must be one of {', '.join(MODES)}"
+        raise ValueError(message)
+    if rate is not None and not rate > 0:
+        message = "rate must be a positive number of arrivals per second"
+        raise ValueError(message)
+    if requests < 1:
+        message = f"requests must be a positive integer, got {requests}"
+        raise ValueError(message)
+    if concurrency < 1:
+        message = f"concurrency must be a positive integer, got {concurrency}"
+        raise ValueError(message)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fake_binary = write_fake_wkhtmltopdf(output_dir)
+    call = render or _default_render(mode, output_dir, runner_latency)
+    prepared = [
+        prepare_payload(
+            payloads[index % len(payloads)],
+            output_dir=output_dir,
+            index=index,
+            wkhtmltopdf_path=fake_binary,
+        )
+        for index in range(requests)
+    ]
+    latencies: list[float] = [0.0] * requests
+    failed: list[bool] = [False] * requests
+
+    def _issue(index: int, scheduled: float | None) -> None:
+        begin = time.perf_counter() if scheduled is None else scheduled
+        result = call(prepared[index])
+        latencies[index] = time.perf_counter() - begin
+        failed[index] = result.get("status") != "success"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="x_make_markdown_x-load"
+    ) as pool:
+        futures = []
+        for index in range(requests):
+            scheduled: float | None = None
+            if rate is not None:
+                scheduled = started + index / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(_issue, index, scheduled))
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+    return LoadReport(
+        mode=mode,
+        requests=requests,
+        failures=sum(failed),
+        concurrency=concurrency,
+        rate=rate,
+        elapsed_seconds=elapsed,
+        latencies=tuple(latencies),
+        peak_rss_bytes=peak_rss_bytes(include_children=mode == "cli"),
+    )
+
+
+def _positive_rate(value: str) -> float:
+    rate = float(value)
+    if not rate > 0:
+        message = f"rate must be positive, got {value}"
+        raise argparse.ArgumentTypeError(message)
+    return rate
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        message = f"must be a positive integer, got {value}"
+        raise argparse.ArgumentTypeError(message)
+    return number
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="x_make_markdown_x load driver")
+    parser.add_argument(
+        "--payload",
+        action="append",
+        type=Path,
+        default=[],
+        help="Recorded payload file or directory (repeatable; default synthetic)",
+    )
+    parser.add_argument("--requests", type=_positive_int, default=100)
+    parser.add_argument(
+        "--concurrency", type=_positive_int, default=os.cpu_count() or 1
+    )
+    parser.add_argument(
+        "--rate",
+        type=_positive_rate,
+        default=None,
+        help="Arrivals per second (open loop)",
+    )
+    parser.add_argument("--mode", choices=MODES, default="inprocess")
+    parser.add_argument(
+        "--runner-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the fake wkhtmltopdf sleeps per export",
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, default=None, help="Keep outputs here"
+    )
+    parsed = parser.parse_args(argv)
+    parsed_map = cast("dict[str, object]", vars(parsed))
+
+    payload_paths = cast("list[Path]", parsed_map["payload"])
+    payloads = load_payloads(payload_paths) if payload_paths else synthetic_payloads()
+    rate_obj = parsed_map["rate"]
+
+    def _run(output_dir: Path) -> LoadReport:
+        return run_load(
+            payloads,
+            requests=cast("int", parsed_map["requests"]),
+            concurrency=cast("int", parsed_map["concurrency"]),
+            rate=rate_obj if isinstance(rate_obj, float) else None,
+            mode=str(parsed_map["mode"]),
+            output_dir=output_dir,
+            runner_latency=cast("float", parsed_map["runner_latency"]),
+        )
+
+    output_obj = parsed_map.get("output_dir")
+    if isinstance(output_obj, Path):
+        report = _run(output_obj)
+    else:
+        with tempfile.TemporaryDirectory(prefix="x_make_markdown_x-load-") as scratch:
+            report = _run(Path(scratch))
+    _sys.stdout.write(json.dumps(report.to_metadata(), indent=2))
+    _sys.stdout.write("\n")
+    return 0 if report.failures == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+
+__all__ = [
+    "DEFAULT_PERCENTILES",
+    "MODES",
+    "SYNTHETIC_PROFILES",
+    "FakeWkhtmltopdfRunner",
+    "LoadReport",
+    "load_payloads",
+    "run_load",
+    "synthetic_payloads",
+    "write_fake_wkhtmltopdf",
+]
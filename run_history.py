@@ -0,0 +1,349 @@
+"""Append-only run history for x_make_markdown_x.
+
+Every recorded `main_json` call becomes one row in a local SQLite database
+so throughput regressions can be spotted across releases with a query
+instead of a sweep over loose report files.
+
+Usage:
+    python -m x_make_markdown_x.run_history --db runs.sqlite3 percentiles
+    python -m x_make_markdown_x.run_history --db runs.sqlite3 trend --bucket release
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sqlite3
+import sys as _sys
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from contextlib import closing
+from dataclasses import dataclass, field
+from importlib import metadata as _metadata
+from pathlib import Path
+from typing import cast
+
+from x_make_common_x.run_reports import isoformat_timestamp
+
+RUN_HISTORY_ENV_VAR = "X_MARKDOWN_RUN_HISTORY"
+DEFAULT_DOCUMENT_CLASS = "default"
+DEFAULT_PERCENTILES: tuple[int, ...] = (50, 95, 99)
+
+# Numeric columns that can be aggregated from the CLI.
+METRICS: tuple[str, ...] = (
+    "total_seconds",
+    "render_seconds",
+    "write_seconds",
+    "export_seconds",
+    "bytes",
+    "blocks",
+    "headers",
+    "words",
+    "cache_hits",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    tool_version TEXT NOT NULL,
+    document_class TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_path TEXT,
+    bytes INTEGER,
+    blocks INTEGER,
+    headers INTEGER,
+    words INTEGER,
+    cache_hits INTEGER,
+    total_seconds REAL,
+    render_seconds REAL,
+    write_seconds REAL,
+    export_seconds REAL,
+    timings TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_class ON runs (document_class, recorded_at);
+CREATE TRIGGER IF NOT EXISTS runs_no_update BEFORE UPDATE ON runs
+BEGIN SELECT RAISE(ABORT, 'run history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS runs_no_delete BEFORE DELETE ON runs
+BEGIN SELECT RAISE(ABORT, 'run history is append-only'); END;
+"""
+
+
+def tool_version() -> str:
+    """Return the installed distribution version, or "unknown" from a checkout."""
+
+    try:
+        return _metadata.version("x_make_markdown_x")
+    except _metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _optional_int(value: object) -> int | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value)
+
+
+def _optional_float(value: object) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+@dataclass(frozen=True, slots=True)
+class RunRecord:
+    """Performance facts about one `main_json` call."""
+
+    document_class: str
+    status: str
+    output_path: str | None = None
+    bytes: int | None = None
+    blocks: int | None = None
+    headers: int | None = None
+    words: int | None = None
+    cache_hits: int | None = None
+    timings: Mapping[str, float] = field(default_factory=dict)
+    recorded_at: str = field(default_factory=isoformat_timestamp)
+    tool_version: str = field(default_factory=tool_version)
+
+    @classmethod
+    def from_result(
+        cls,
+        result: Mapping[str, object],
+        *,
+        document_class: str,
+        timings: Mapping[str, float],
+    ) -> RunRecord:
+        """Build a record from a `main_json` result payload."""
+
+        markdown_obj = result.get("markdown")
+        markdown = (
+            cast("Mapping[str, object]", markdown_obj)
+            if isinstance(markdown_obj, Mapping)
+            else {}
+        )
+        summary_obj = result.get("summary")
+        summary = (
+            cast("Mapping[str, object]", summary_obj)
+            if isinstance(summary_obj, Mapping)
+            else {}
+        )
+        assets_obj = summary.get("assets")
+        assets = (
+            cast("Mapping[str, object]", assets_obj)
+            if isinstance(assets_obj, Mapping)
+            else {}
+        )
+        path_obj = markdown.get("path")
+        return cls(
+            document_class=document_class,
+            status=str(result.get("status", "unknown")),
+            output_path=path_obj if isinstance(path_obj, str) else None,
+            bytes=_optional_int(markdown.get("bytes")),
+            blocks=_optional_int(summary.get("blocks")),
+            headers=_optional_int(summary.get("headers")),
+            words=_optional_int(summary.get("words")),
+            cache_hits=_optional_int(assets.get("cache_hits")),
+            timings=dict(timings),
+        )
+
+    def to_row(self) -> dict[str, object]:
+        return {
+            "recorded_at": self.recorded_at,
+            "tool_version": self.tool_version,
+            "document_class": self.document_class,
+            "status": self.status,
+            "output_path": self.output_path,
+            "bytes": self.bytes,
+            "blocks": self.blocks,
+            "headers": self.headers,
+            "words": self.words,
+            "cache_hits": self.cache_hits,
+            "total_seconds": self.timings.get("total"),
+            "render_seconds": self.timings.get("render"),
+            "write_seconds": self.timings.get("write"),
+            "export_seconds": self.timings.get("export"),
+            "timings": json.dumps(dict(self.timings), sort_keys=True),
+        }
+
+
+def percentile_of(sorted_values: Sequence[float], percentile: int) -> float:
+    """Nearest-rank percentile of an ascending, non-empty sequence."""
+
+    if not 0 <= percentile <= 100:
+        message = f"percentile must be between 0 and 100, got {percentile}"
+        raise ValueError(message)
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RunHistoryStore:
+    """SQLite-backed, append-only store of run records."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def record(self, record: RunRecord) -> int:
+        """Append one record and return its row id."""
+
+        row = record.to_row()
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{name}" for name in row)
+        with closing(self._connect()) as connection, connection:
+            # Column names come from RunRecord; values are bound parameters.
+            cursor = connection.execute(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})",
+                row,
+            )
+            return int(cursor.lastrowid or 0)
+
+    def _metric_values(
+        self,
+        metric: str,
+        *,
+        document_class: str | None,
+        group_by: str,
+    ) -> dict[tuple[str, str], list[float]]:
+        if metric not in METRICS:
+            message = f"unknown metric {metric!r}; choose from {', '.join(METRICS)}"
+            raise ValueError(message)
+        # `metric` is checked above; callers pass `group_by` from a fixed set.
+        query = (
+            f"SELECT document_class, {group_by}, {metric} FROM runs "
+            f"WHERE status = 'success' AND {metric} IS NOT NULL"
+        )
+        arguments: list[object] = []
+        if document_class is not None:
+            query += " AND document_class = ?"
+            arguments.append(document_class)
+        query += " ORDER BY id"
+        grouped: dict[tuple[str, str], list[float]] = defaultdict(list)
+        with closing(self._connect()) as connection:
+            for doc_class, bucket, value in connection.execute(query, arguments):
+                grouped[(str(doc_class), str(bucket))].append(float(value))
+        return grouped
+
+    def percentiles(
+        self,
+        metric: str = "total_seconds",
+        *,
+        document_class: str | None = None,
+        percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+    ) -> dict[str, dict[str, float]]:
+        """Return count and percentiles of `metric` per document class."""
+
+        grouped = self._metric_values(
+            metric, document_class=document_class, group_by="'all'"
+        )
+        report: dict[str, dict[str, float]] = {}
+        for (doc_class, _), values in sorted(grouped.items()):
+            ordered = sorted(values)
+            stats: dict[str, float] = {"count": float(len(ordered))}
+            for percentile in percentiles:
+                stats[f"p{percentile}"] = percentile_of(ordered, percentile)
+            report[doc_class] = stats
+        return report
+
+    def trend(
+        self,
+        metric: str = "total_seconds",
+        *,
+        document_class: str | None = None,
+        bucket: str = "day",
+    ) -> list[dict[str, object]]:
+        """Return the median of `metric` per document class and bucket."""
+
+        group_by = {
+            "day": "substr(recorded_at, 1, 10)",
+            "release": "tool_version",
+        }.get(bucket)
+        if group_by is None:
+            message = "bucket must be 'day' or 'release'"
+            raise ValueError(message)
+        grouped = self._metric_values(
+            metric, document_class=document_class, group_by=group_by
+        )
+        return [
+            {
+                "document_class": doc_class,
+                "bucket": bucket_value,
+                "count": len(values),
+                "p50": percentile_of(sorted(values), 50),
+            }
+            for (doc_class, bucket_value), values in sorted(grouped.items())
+        ]
+
+
+def _percentile(value: str) -> int:
+    percentile = int(value)
+    if not 0 <= percentile <= 100:
+        message = f"percentile must be between 0 and 100, got {value}"
+        raise argparse.ArgumentTypeError(message)
+    return percentile
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="x_make_markdown_x run history")
+    parser.add_argument("--db", required=True, help="Path to the run history DB")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in ("percentiles", "trend"):
+        subparser = subparsers.add_parser(name)
+        subparser.add_argument("--metric", choices=METRICS, default="total_seconds")
+        subparser.add_argument("--document-class", default=None)
+    percentiles_parser = subparsers.choices["percentiles"]
+    percentiles_parser.add_argument(
+        "--percentile",
+        type=_percentile,
+        action="append",
+        help="Percentile to report (repeatable; default 50, 95, 99)",
+    )
+    subparsers.choices["trend"].add_argument(
+        "--bucket", choices=("day", "release"), default="day"
+    )
+    parsed = parser.parse_args(argv)
+    parsed_map = cast("dict[str, object]", vars(parsed))
+
+    store = RunHistoryStore(str(parsed_map["db"]))
+    metric = str(parsed_map["metric"])
+    class_obj = parsed_map.get("document_class")
+    document_class = class_obj if isinstance(class_obj, str) else None
+    report: object
+    if parsed_map["command"] == "percentiles":
+        requested = cast("list[int] | None", parsed_map.get("percentile"))
+        report = store.percentiles(
+            metric,
+            document_class=document_class,
+            percentiles=tuple(requested or DEFAULT_PERCENTILES),
+        )
+    else:
+        report = store.trend(
+            metric,
+            document_class=document_class,
+            bucket=str(parsed_map["bucket"]),
+        )
+    _sys.stdout.write(json.dumps(report, indent=2))
+    _sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+
+__all__ = [
+    "DEFAULT_DOCUMENT_CLASS",
+    "METRICS",
+    "RUN_HISTORY_ENV_VAR",
+    "RunHistoryStore",
+    "RunRecord",
+    "percentile_of",
+    "tool_version",
+]
@@ -0,0 +1,129 @@
+"""Command runners for the shared exporter pipeline.
+
+The exporters in x_make_common_x accept any `CommandRunner`; the runner here
+adds cooperative cancellation and an optional timeout so a long-running or
+wedged wkhtmltopdf process is killed when its output is no longer wanted.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import suppress
+from subprocess import CompletedProcess
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_POLL_SECONDS = 0.05
+# How long to wait for the pipes to drain once the process group is killed.
+_KILL_GRACE_SECONDS = 1.0
+
+
+def _group_options() -> dict[str, Any]:
+    """Popen options that start the command in its own process group."""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _kill_group(process: subprocess.Popen[str]) -> None:
+    """Kill `process` and, where supported, every process it started."""
+    if sys.platform == "win32":
+        process.kill()
+        return
+    # A wrapper script's children share the group and hold the pipes open.
+    with suppress(ProcessLookupError):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def _drain(process: subprocess.Popen[str]) -> str:
+    """Return what is left on stdout, giving up after a short grace period."""
+    try:
+        stdout, _ = process.communicate(timeout=_KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        for pipe in (process.stdout, process.stderr):
+            if pipe is not None:
+                pipe.close()
+        process.wait()
+        return ""
+    return stdout
+
+
+class CancellableRunner:
+    """Run commands in a subprocess that `cancel()` or `timeout` kills promptly.
+
+    `timeout` bounds each command in seconds; a command that overruns it is
+    killed together with any processes it started, and `timed_out` becomes
+    True.
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_seconds: float = _POLL_SECONDS,
+        timeout: float | None = None,
+        cancelled: threading.Event | None = None,
+    ) -> None:
+        self._cancelled = cancelled or threading.Event()
+        self._poll_seconds = poll_seconds
+        self.timeout = timeout
+        self._timed_out = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def timed_out(self) -> bool:
+        return self._timed_out
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def with_timeout(self, timeout: float | None) -> CancellableRunner:
+        """Return a runner with its own `timeout` that shares this cancellation."""
+        return CancellableRunner(
+            poll_seconds=self._poll_seconds, timeout=timeout, cancelled=self._cancelled
+        )
+
+    def __call__(self, command: Sequence[str]) -> CompletedProcess[str]:
+        argv = list(command)
+        if self.cancelled:
+            return CompletedProcess(argv, -1, stdout="", stderr="cancelled")
+        if self.timeout is not None and self.timeout <= 0:
+            self._timed_out = True
+            return CompletedProcess(argv, -1, stdout="", stderr="timed out")
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        process = subprocess.Popen(
+            argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            **_group_options(),
+        )
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=self._poll_seconds)
+            except subprocess.TimeoutExpired:
+                expired = deadline is not None and time.monotonic() >= deadline
+                if not (self.cancelled or expired):
+                    continue
+                _kill_group(process)
+                stdout = _drain(process)
+                self._timed_out = expired and not self.cancelled
+                return CompletedProcess(
+                    argv,
+                    process.returncode,
+                    stdout=stdout,
+                    stderr="timed out" if self._timed_out else "cancelled",
+                )
+            return CompletedProcess(argv, process.returncode, stdout, stderr)
+
+
+__all__ = ["CancellableRunner"]
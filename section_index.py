@@ -0,0 +1,190 @@
+"""Byte-offset section index for generated markdown.
+
+The builder can write a `<output>.idx.json` sidecar next to an uncompressed
+markdown file. It maps every header's section number and anchor to the byte
+offset and length of that section (the header plus its subsections), so a
+reader can seek straight to one section instead of scanning the document.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 1
+
+
+def index_path(markdown_path: str | Path) -> Path:
+    """Return the sidecar path for `markdown_path`."""
+
+    path = Path(markdown_path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+@dataclass(frozen=True, slots=True)
+class SectionEntry:
+    """Location of one numbered section in the markdown file."""
+
+    number: str
+    anchor: str
+    title: str
+    level: int
+    offset: int
+    length: int
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "number": self.number,
+            "anchor": self.anchor,
+            "title": self.title,
+            "level": self.level,
+            "offset": self.offset,
+            "length": self.length,
+        }
+
+    @classmethod
+    def from_metadata(cls, metadata: Mapping[str, object]) -> SectionEntry:
+        return cls(
+            number=str(metadata["number"]),
+            anchor=str(metadata["anchor"]),
+            title=str(metadata["title"]),
+            level=int(cast("int", metadata["level"])),
+            offset=int(cast("int", metadata["offset"])),
+            length=int(cast("int", metadata["length"])),
+        )
+
+
+def build_entries(
+    headers: Iterable[tuple[str, str, str, int, int]], total_bytes: int
+) -> list[SectionEntry]:
+    """Turn (number, anchor, title, level, offset) tuples into entries.
+
+    A section runs until the next header at the same or a higher level, or
+    to the end of the document.
+    """
+
+    ordered = list(headers)
+    ends = [total_bytes] * len(ordered)
+    open_sections: list[int] = []
+    for position, (_, _, _, level, offset) in enumerate(ordered):
+        while open_sections and ordered[open_sections[-1]][3] >= level:
+            ends[open_sections.pop()] = offset
+        open_sections.append(position)
+    return [
+        SectionEntry(number, anchor, title, level, offset, end - offset)
+        for (number, anchor, title, level, offset), end in zip(
+            ordered, ends, strict=True
+        )
+    ]
+
+
+class SectionIndex:
+    """In-memory view of a sidecar index with constant-time lookups."""
+
+    def __init__(
+        self,
+        markdown_path: str | Path,
+        sections: Iterable[SectionEntry],
+        *,
+        total_bytes: int,
+        toc: tuple[int, int] | None = None,
+    ) -> None:
+        self.markdown_path = Path(markdown_path)
+        self.sections = tuple(sections)
+        self.total_bytes = total_bytes
+        self.toc = toc
+        self._lookup: dict[str, SectionEntry] = {}
+        for entry in self.sections:
+            self._lookup.setdefault(entry.number, entry)
+            self._lookup.setdefault(entry.anchor, entry)
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "version": INDEX_VERSION,
+            "markdown": self.markdown_path.name,
+            "bytes": self.total_bytes,
+            "toc": (
+                None
+                if self.toc is None
+                else {"offset": self.toc[0], "length": self.toc[1]}
+            ),
+            "sections": [entry.to_metadata() for entry in self.sections],
+        }
+
+    def write(self) -> Path:
+        """Write the sidecar next to the markdown file and return its path."""
+
+        destination = index_path(self.markdown_path)
+        destination.write_text(
+            json.dumps(self.to_metadata(), separators=(",", ":")), encoding="utf-8"
+        )
+        return destination
+
+    @classmethod
+    def load(cls, markdown_path: str | Path) -> SectionIndex:
+        """Read the sidecar for `markdown_path`."""
+
+        path = Path(markdown_path)
+        with index_path(path).open("r", encoding="utf-8") as handle:
+            metadata = cast("dict[str, object]", json.load(handle))
+        if metadata.get("version") != INDEX_VERSION:
+            message = f"unsupported section index version {metadata.get('version')!r}"
+            raise ValueError(message)
+        toc_obj = metadata.get("toc")
+        toc: tuple[int, int] | None = None
+        if isinstance(toc_obj, Mapping):
+            toc_map = cast("Mapping[str, object]", toc_obj)
+            toc = (
+                int(cast("int", toc_map["offset"])),
+                int(cast("int", toc_map["length"])),
+            )
+        return cls(
+            path,
+            (
+                SectionEntry.from_metadata(entry)
+                for entry in cast("list[Mapping[str, object]]", metadata["sections"])
+            ),
+            total_bytes=int(cast("int", metadata["bytes"])),
+            toc=toc,
+        )
+
+    def find(self, key: str) -> SectionEntry:
+        """Look up a section by number ("2.1") or anchor ("21-details")."""
+
+        try:
+            return self._lookup[key.removeprefix("#")]
+        except KeyError:
+            message = f"no section {key!r} in {self.markdown_path.name}"
+            raise KeyError(message) from None
+
+    def read(self, key: str) -> str:
+        """Return the markdown of one section by seeking to its offset."""
+
+        entry = self.find(key)
+        with self.markdown_path.open("rb") as handle:
+            size = handle.seek(0, 2)
+            if size != self.total_bytes:
+                message = f"{self.markdown_path.name} changed since it was indexed"
+                raise ValueError(message)
+            handle.seek(entry.offset)
+            return handle.read(entry.length).decode("utf-8")
+
+
+def read_section(markdown_path: str | Path, key: str) -> str:
+    """Return one section of `markdown_path` using its sidecar index."""
+
+    return SectionIndex.load(markdown_path).read(key)
+
+
+__all__ = [
+    "INDEX_SUFFIX",
+    "SectionEntry",
+    "SectionIndex",
+    "build_entries",
+    "index_path",
+    "read_section",
+]
@@ -0,0 +1,168 @@
+"""Tests for sharded batch rendering and report merging."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from x_make_markdown_x.batch import (
+    ShardSpec,
+    main,
+    merge_reports,
+    run_batch,
+    shard_for,
+)
+from x_make_markdown_x.x_cls_make_markdown_x import _run_json_cli
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+
+def _payload(output: Path, text: str) -> dict[str, object]:
+    return {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(output),
+            "export_pdf": False,
+            "document": {"blocks": [{"kind": "paragraph", "text": text}]},
+        },
+    }
+
+
+def _write_batch(tmp_path: Path, count: int) -> list[Path]:
+    payload_dir = tmp_path / "payloads"
+    payload_dir.mkdir()
+    out_dir = tmp_path / "out"
+    for number in range(count):
+        payload = _payload(out_dir / f"doc{number:02d}.md", f"document {number}")
+        (payload_dir / f"doc{number:02d}.json").write_text(
+            json.dumps(payload), encoding="utf-8"
+        )
+    manifest = tmp_path / "extra.jsonl"
+    lines = [
+        json.dumps(_payload(out_dir / f"extra{number}.md", f"extra {number}"))
+        for number in range(3)
+    ]
+    manifest.write_text("\n".join([*lines, "", "[1, 2]"]) + "\n", encoding="utf-8")
+    return [payload_dir, manifest]
+
+
+def _recording_render(
+    seen: list[str],
+) -> Callable[[Mapping[str, object]], dict[str, object]]:
+    def _render(payload: Mapping[str, object]) -> dict[str, object]:
+        parameters = cast("Mapping[str, object]", payload["parameters"])
+        seen.append(str(parameters["output_markdown"]))
+        return {"status": "success", "markdown": {"path": "x", "bytes": 10}}
+
+    return _render
+
+
+def test_shard_for_is_a_stable_sha256_bucket() -> None:
+    key = "reports/daily.md"
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+
+    assert shard_for(key, 7) == int.from_bytes(digest[:8], "big") % 7
+    for spelling in ("./reports/daily.md", "reports//daily.md", "reports\\daily.md"):
+        assert shard_for(spelling, 7) == shard_for(key, 7)
+    with pytest.raises(ValueError, match="between 0 and 2"):
+        ShardSpec(3, 3)
+
+
+def test_shards_partition_the_batch_and_merge(tmp_path: Path) -> None:
+    paths = _write_batch(tmp_path, 20)
+    reports: list[dict[str, object]] = []
+    rendered: list[list[str]] = []
+    for index in range(3):
+        seen: list[str] = []
+        reports.append(
+            run_batch(
+                paths,
+                shard=ShardSpec(index, 3),
+                render=_recording_render(seen),
+            )
+        )
+        rendered.append(seen)
+
+    again: list[str] = []
+    run_batch(paths, shard=ShardSpec(1, 3), render=_recording_render(again))
+    assert again == rendered[1]
+    all_outputs = [output for shard in rendered for output in shard]
+    assert len(all_outputs) == len(set(all_outputs)) == 23
+    assert all(rendered)
+
+    merged = merge_reports(reversed(reports))
+    summary = cast("dict[str, object]", merged["summary"])
+    # The non-object manifest line lands on one shard as a load failure.
+    assert summary["documents"] == 24
+    assert summary["succeeded"] == 23
+    assert summary["failed"] == 1
+    assert summary["markdown_bytes"] == 230
+    assert merged["shards"] == {"count": 3, "merged": [0, 1, 2], "missing": []}
+    assert merged["messages"] == []
+    sources = [
+        str(doc["source"])
+        for doc in cast("list[dict[str, object]]", merged["documents"])
+    ]
+    assert sources == sorted(sources)
+
+    partial = merge_reports(reports[:2])
+    assert cast("dict[str, object]", partial["shards"])["missing"] == [2]
+    with pytest.raises(ValueError, match="more than one report"):
+        merge_reports([reports[0], reports[0]])
+    truncated = {key: value for key, value in reports[0].items() if key != "summary"}
+    with pytest.raises(ValueError, match="malformed batch report"):
+        merge_reports([truncated])
+
+
+def test_cli_batch_shards_and_merge(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    paths = _write_batch(tmp_path, 4)
+    report_files: list[Path] = []
+    for index in range(2):
+        _run_json_cli(
+            [
+                "--batch",
+                *map(str, paths),
+                "--shard-index",
+                str(index),
+                "--shard-count",
+                "2",
+                "--compact",
+            ]
+        )
+        report_file = tmp_path / f"shard{index}.json"
+        report_file.write_text(capsys.readouterr().out, encoding="utf-8")
+        report_files.append(report_file)
+
+    merged_file = tmp_path / "merged.json"
+    assert main([*map(str, report_files), "--output", str(merged_file)]) == 0
+
+    merged = json.loads(merged_file.read_text(encoding="utf-8"))
+    assert merged["summary"]["documents"] == 8
+    assert merged["summary"]["succeeded"] == 7
+    written = sorted(path.name for path in (tmp_path / "out").glob("*.md"))
+    assert written == [
+        *(f"doc{number:02d}.md" for number in range(4)),
+        *(f"extra{number}.md" for number in range(3)),
+    ]
+
+
+def test_cli_batch_profiles_each_document(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    paths = _write_batch(tmp_path, 2)
+    _run_json_cli(["--batch", *map(str, paths), "--profile", "--compact"])
+    capsys.readouterr()
+
+    out_dir = tmp_path / "out"
+    profiled = sorted(path.name for path in out_dir.glob("*.prof"))
+    assert profiled == [
+        "doc00.prof",
+        "doc01.prof",
+        *(f"extra{n}.prof" for n in range(3)),
+    ]
@@ -0,0 +1,286 @@
+"""Tests for coalesced multi-document PDF export."""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import TYPE_CHECKING, cast
+from urllib.parse import urljoin
+from xml.sax.saxutils import quoteattr
+
+import pytest
+from x_make_common_x.json_contracts import validate_payload
+from x_make_markdown_x import coalesce
+from x_make_markdown_x.batch import run_batch
+from x_make_markdown_x.coalesce import (
+    CoalescedDocument,
+    PageRange,
+    export_coalesced_pdf,
+    marker_title,
+)
+from x_make_markdown_x.json_contracts import OUTPUT_SCHEMA
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_TITLE = re.compile(r"<title>(.*?)</title>")
+
+
+class _FakeWkhtmltopdf:
+    """Writes a placeholder PDF and an outline giving each input two pages."""
+
+    def __init__(
+        self, *, drop_outline_item: bool = False, body_heading: str = "1 Body"
+    ) -> None:
+        self.calls: list[list[str]] = []
+        self.drop_outline_item = drop_outline_item
+        self.body_heading = body_heading
+
+    def __call__(self, command: Sequence[str]) -> CompletedProcess[str]:
+        argv = list(command)
+        self.calls.append(argv)
+        outline = Path(argv[argv.index("--dump-outline") + 1])
+        inputs = [Path(arg) for arg in argv if arg.endswith(".html")]
+        items = []
+        for position, html_path in enumerate(inputs):
+            match = _TITLE.search(html_path.read_text(encoding="utf-8"))
+            title = match.group(1) if match else ""
+            page = 2 * position + 1
+            if not (self.drop_outline_item and position == 1):
+                items.append(f"<item title={quoteattr(title)} page='{page}'/>")
+            items.append(f"<item title={quoteattr(self.body_heading)} page='{page}'/>")
+        outline.write_text(
+            "<outline xmlns='http://wkhtmltopdf.org/outline'>"
+            f"<item title='' page='0'>{''.join(items)}</item></outline>",
+            encoding="utf-8",
+        )
+        Path(argv[-1]).write_bytes(b"%PDF-1.4 combined\n")
+        return CompletedProcess(argv, 0, "", "")
+
+
+@pytest.fixture(autouse=True)
+def _no_pypdf(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The fake PDF is not parseable; page totals and splits need a real one.
+    monkeypatch.setattr(coalesce, "_load_pypdf", lambda: None)
+
+
+def test_documents_render_in_one_invocation_with_page_ranges(tmp_path: Path) -> None:
+    runner = _FakeWkhtmltopdf()
+    documents = [
+        CoalescedDocument(f"dossier-{number}", f"<p>{number}</p>", None)
+        for number in range(3)
+    ]
+
+    export = export_coalesced_pdf(
+        documents,
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "wkhtmltopdf",
+        runner=runner,
+    )
+
+    assert len(runner.calls) == 1
+    assert export.succeeded
+    assert export.page_ranges == (
+        PageRange(1, 2),
+        PageRange(3, 4),
+        PageRange(5, None),
+    )
+    assert export.detail is None
+    metadata = export.document_metadata(1)
+    assert metadata["output_path"] == str(tmp_path / "combined.pdf")
+    assert metadata["inputs"] == {}
+    assert not any(path.name.startswith(".coalesce-") for path in tmp_path.iterdir())
+
+
+def test_missing_outline_items_and_pypdf_are_reported(tmp_path: Path) -> None:
+    documents = [CoalescedDocument(f"d{number}", "", None) for number in range(2)]
+    export = export_coalesced_pdf(
+        documents,
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "wkhtmltopdf",
+        runner=_FakeWkhtmltopdf(drop_outline_item=True),
+    )
+    assert export.page_ranges is None
+    assert export.detail is not None
+    assert "page ranges unavailable" in export.detail
+
+    split = export_coalesced_pdf(
+        [CoalescedDocument("only", "", tmp_path / "only.pdf")],
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "wkhtmltopdf",
+        runner=_FakeWkhtmltopdf(),
+        split=True,
+    )
+    assert split.detail == "per-document PDFs skipped: pypdf is not installed"
+    assert split.split_paths == (None,)
+
+
+def test_body_heading_repeating_a_title_does_not_shift_ranges(
+    tmp_path: Path,
+) -> None:
+    export = export_coalesced_pdf(
+        [CoalescedDocument(title, "", None) for title in ("intro", "summary")],
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "wkhtmltopdf",
+        runner=_FakeWkhtmltopdf(body_heading="summary"),
+        keep_html=True,
+    )
+
+    assert export.page_ranges == (PageRange(1, 2), PageRange(3, None))
+    html_path = Path(
+        cast(
+            "str",
+            cast("dict[str, object]", export.document_metadata(0)["inputs"])["html"],
+        )
+    )
+    assert marker_title(0, "intro") in html_path.read_text(encoding="utf-8")
+
+
+def test_relative_images_resolve_against_the_markdown_directory(
+    tmp_path: Path,
+) -> None:
+    docs = tmp_path / "docs"
+    (docs / "d0_assets").mkdir(parents=True)
+    (docs / "d0_assets" / "figure.png").write_bytes(b"png")
+    export = export_coalesced_pdf(
+        [
+            CoalescedDocument(
+                "d0", '<img src="d0_assets/figure.png">', None, base_dir=docs
+            )
+        ],
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "wkhtmltopdf",
+        runner=_FakeWkhtmltopdf(),
+        keep_html=True,
+    )
+
+    inputs = cast("dict[str, str]", export.document_metadata(0)["inputs"])
+    page = Path(inputs["html"]).read_text(encoding="utf-8")
+    base = re.search(r'<base href="([^"]+)">', page)
+    assert base is not None
+    resolved = urljoin(base.group(1), "d0_assets/figure.png")
+    assert resolved == (docs / "d0_assets" / "figure.png").resolve().as_uri()
+
+
+def test_malformed_outline_fails_the_export(tmp_path: Path) -> None:
+    def _runner(command: Sequence[str]) -> CompletedProcess[str]:
+        argv = list(command)
+        outline = Path(argv[argv.index("--dump-outline") + 1])
+        outline.write_text("<outline><item", encoding="utf-8")
+        Path(argv[-1]).write_bytes(b"%PDF-1.4\n")
+        return CompletedProcess(argv, 0, "", "")
+
+    export = export_coalesced_pdf(
+        [CoalescedDocument("only", "", None)],
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "wkhtmltopdf",
+        runner=_runner,
+    )
+
+    assert not export.succeeded
+    assert export.detail is not None
+    assert export.detail.startswith("coalesced PDF post-processing failed")
+
+
+def test_launch_failures_and_timeouts_fail_the_export(tmp_path: Path) -> None:
+    documents = [CoalescedDocument("only", "", None)]
+    missing = export_coalesced_pdf(
+        documents,
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=tmp_path / "missing" / "wkhtmltopdf",
+    )
+    assert not missing.succeeded
+    assert missing.detail is not None
+    assert missing.detail.startswith("wkhtmltopdf could not be started")
+    assert missing.document_metadata(0)["output_path"] is None
+
+    if sys.platform == "win32":
+        return
+    binary = tmp_path / "wkhtmltopdf"
+    binary.write_text("#!/bin/sh\nexec sleep 30\n", encoding="utf-8")
+    binary.chmod(0o755)
+    slow = export_coalesced_pdf(
+        documents,
+        output_pdf=tmp_path / "combined.pdf",
+        wkhtmltopdf_path=binary,
+        timeout=0.2,
+    )
+    assert not slow.succeeded
+    assert slow.detail == "wkhtmltopdf exceeded its 0.2s budget and was killed"
+
+
+def test_batch_coalesces_requested_pdfs(tmp_path: Path) -> None:
+    binary = tmp_path / "wkhtmltopdf"
+    binary.write_text("", encoding="utf-8")
+    payload_dir = tmp_path / "payloads"
+    payload_dir.mkdir()
+    for number in range(3):
+        payload = {
+            "command": "x_make_markdown_x",
+            "parameters": {
+                "output_markdown": str(tmp_path / "out" / f"dossier{number}.md"),
+                "export_pdf": number != 2,
+                "wkhtmltopdf_path": str(binary),
+                "document": {
+                    "blocks": [{"kind": "paragraph", "text": f"dossier {number}"}]
+                },
+            },
+        }
+        (payload_dir / f"dossier{number}.json").write_text(
+            json.dumps(payload), encoding="utf-8"
+        )
+    runner = _FakeWkhtmltopdf()
+
+    report = run_batch(
+        [payload_dir],
+        coalesce_pdf=tmp_path / "combined.pdf",
+        runner=runner,
+    )
+
+    assert len(runner.calls) == 1
+    assert (tmp_path / "combined.pdf").is_file()
+    exports = cast("list[dict[str, object]]", report["pdf_exports"])
+    assert exports[0]["documents"] == 2
+    results = [
+        cast("dict[str, object]", document["result"])
+        for document in cast("list[dict[str, object]]", report["documents"])
+    ]
+    for result in results:
+        validate_payload(result, OUTPUT_SCHEMA)
+    artifacts = [cast("dict[str, object]", result["markdown"]) for result in results]
+    assert artifacts[0]["pdf_pages"] == {"first": 1, "last": 2}
+    assert artifacts[1]["pdf_pages"] == {"first": 3, "last": None}
+    pdf = cast("dict[str, object]", artifacts[1]["pdf"])
+    assert pdf["output_path"] == str(tmp_path / "combined.pdf")
+    assert "pdf" not in artifacts[2]
+
+
+def test_batch_finds_wkhtmltopdf_through_the_environment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    binary = tmp_path / "wkhtmltopdf"
+    binary.write_text("", encoding="utf-8")
+    monkeypatch.setenv("X_WKHTMLTOPDF_PATH", str(binary))
+    payload = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(tmp_path / "out" / "env.md"),
+            "export_pdf": True,
+            "document": {"blocks": [{"kind": "paragraph", "text": "env"}]},
+        },
+    }
+    payload_file = tmp_path / "env.json"
+    payload_file.write_text(json.dumps(payload), encoding="utf-8")
+    runner = _FakeWkhtmltopdf()
+
+    report = run_batch(
+        [payload_file], coalesce_pdf=tmp_path / "combined.pdf", runner=runner
+    )
+
+    assert len(runner.calls) == 1
+    assert runner.calls[0][0] == str(binary)
+    exports = cast("list[dict[str, object]]", report["pdf_exports"])
+    assert exports[0]["succeeded"] is True
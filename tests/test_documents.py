@@ -0,0 +1,94 @@
+"""Tests for the typed document API."""
+
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from x_make_markdown_x.documents import (
+    CsvTable,
+    Document,
+    Header,
+    Image,
+    ListBlock,
+    Paragraph,
+    Raw,
+    Table,
+)
+from x_make_markdown_x.x_cls_make_markdown_x import main_json, render_document
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_render_document_matches_main_json(tmp_path: Path) -> None:
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("a,b\n1,2\n", encoding="utf-8")
+    document = Document(
+        (
+            Header("Intro"),
+            Paragraph("Welcome"),
+            Table(("k", "v"), (("1", "one"),)),
+            Image("Diagram of the flow", "https://example.com/flow.png"),
+            ListBlock(("x", "y"), ordered=True),
+            Raw("<!-- raw -->\n"),
+            Header("Data", level=2),
+            CsvTable(csv_path, columns=("b",)),
+        ),
+        include_toc=True,
+        metadata={"document_class": "typed"},
+    )
+    typed = render_document(document, tmp_path / "typed.md")
+
+    blocks = [
+        {"kind": "header", "text": "Intro", "level": 1},
+        {"kind": "paragraph", "text": "Welcome"},
+        {"kind": "table", "headers": ["k", "v"], "rows": [["1", "one"]]},
+        {
+            "kind": "image",
+            "alt_text": "Diagram of the flow",
+            "url": "https://example.com/flow.png",
+        },
+        {"kind": "list", "items": ["x", "y"], "ordered": True},
+        {"kind": "raw", "text": "<!-- raw -->\n"},
+        {"kind": "header", "text": "Data", "level": 2},
+        {"kind": "csv_table", "path": str(csv_path), "columns": ["b"]},
+    ]
+    payload: dict[str, object] = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(tmp_path / "json.md"),
+            "document": {"blocks": copy.deepcopy(blocks), "include_toc": True},
+            "metadata": {"document_class": "typed"},
+        },
+    }
+    untyped = main_json(payload)
+
+    assert (tmp_path / "typed.md").read_text(encoding="utf-8") == (
+        tmp_path / "json.md"
+    ).read_text(encoding="utf-8")
+    typed_summary = cast("dict[str, object]", typed["summary"])
+    untyped_summary = cast("dict[str, object]", untyped["summary"])
+    for key in ("blocks", "headers", "words", "metadata"):
+        assert typed_summary[key] == untyped_summary[key]
+
+
+@pytest.mark.parametrize(
+    ("factory", "match"),
+    [
+        (lambda: Header("Deep", level=7), "between 1 and 6"),
+        (lambda: Header(""), "must not be empty"),
+        (lambda: Header(3), "must be a string"),  # type: ignore[arg-type]
+        (lambda: Paragraph(None), "must be a string"),  # type: ignore[arg-type]
+        (lambda: Raw(["- a"]), "must be a string"),  # type: ignore[arg-type]
+        (lambda: Image("", "a.png"), "must not be empty"),
+        (lambda: Table((), ()), "at least one header"),
+        (lambda: ListBlock(()), "at least one item"),
+        (lambda: CsvTable("rows.csv", delimiter=";;"), "single character"),
+        (lambda: Document(("not a block",)), "not a document block"),  # type: ignore[arg-type]
+    ],
+)
+def test_blocks_validate_on_construction(factory: object, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        cast("type", factory)()
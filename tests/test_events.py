@@ -0,0 +1,140 @@
+"""Tests for the buffered JSON-lines event log."""
+
+from __future__ import annotations
+
+import io
+import json
+import time
+from typing import TYPE_CHECKING
+
+from x_make_markdown_x.events import EventSink, configure_events
+from x_make_markdown_x.x_cls_make_markdown_x import (
+    XClsMakeMarkdownX,
+    _info,
+    _run_json_cli,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _read_events(path: Path) -> list[dict[str, object]]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_sink_filters_levels_and_buffers_until_flush(tmp_path: Path) -> None:
+    log = tmp_path / "events.jsonl"
+    sink = EventSink(log, level="info", flush_seconds=60)
+    sink.emit("skipped", "debug", phase="render")
+    sink.emit("kept", "info", document="a.md", bytes=12)
+    sink.emit("object", "warning", path=tmp_path)
+
+    assert log.read_bytes() == b""
+    sink.close()
+    sink.emit("late", "error")
+
+    events = _read_events(log)
+    assert [event["event"] for event in events] == ["kept", "object"]
+    assert events[0]["document"] == "a.md"
+    assert events[0]["bytes"] == 12
+    assert events[1]["path"] == str(tmp_path)
+
+
+def test_full_buffer_is_flushed_in_the_background(tmp_path: Path) -> None:
+    log = tmp_path / "events.jsonl"
+    with EventSink(log, flush_seconds=60, max_buffered=3) as sink:
+        for number in range(3):
+            sink.emit("tick", number=number)
+        deadline = time.monotonic() + 5
+        while not log.read_bytes() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(_read_events(log)) == 3
+
+
+def test_write_errors_disable_the_sink_instead_of_piling_up(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    class _BrokenStream(io.StringIO):
+        def write(self, _text: str, /) -> int:
+            message = "disk full"
+            raise OSError(message)
+
+    sink = EventSink(_BrokenStream(), flush_seconds=60)
+    sink.emit("first")
+    sink.flush()
+    sink.emit("dropped")
+    sink.close()
+
+    assert isinstance(sink.error, OSError)
+    assert "event log disabled: disk full" in capsys.readouterr().err
+
+
+def test_info_routes_to_the_configured_sink(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    log = tmp_path / "events.jsonl"
+
+    class _Ctx:
+        verbose = True
+
+    sink = EventSink(log)
+    previous = configure_events(sink)
+    try:
+        maker = XClsMakeMarkdownX(wkhtmltopdf_path="", ctx=_Ctx())
+        maker.add_paragraph("hello")
+        maker.generate(output_file=str(tmp_path / "doc.md"))
+        _info("[markdown] done")
+    finally:
+        configure_events(previous)
+        sink.close()
+
+    assert capsys.readouterr().out == ""
+    events = _read_events(log)
+    assert events[0]["document"] == str(tmp_path / "doc.md")
+    assert events[0]["bytes"] == len("hello\n\n")
+    assert events[1]["message"] == "[markdown] done"
+
+
+def test_cli_event_log_keeps_stdout_to_the_result(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    output = tmp_path / "report.md"
+    payload_file = tmp_path / "payload.json"
+    payload_file.write_text(
+        json.dumps(
+            {
+                "command": "x_make_markdown_x",
+                "parameters": {
+                    "output_markdown": str(output),
+                    "export_pdf": False,
+                    "document": {"blocks": [{"kind": "paragraph", "text": "hi"}]},
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    log = tmp_path / "events.jsonl"
+
+    _run_json_cli(
+        [
+            "--json-file",
+            str(payload_file),
+            "--event-log",
+            str(log),
+            "--event-level",
+            "debug",
+        ]
+    )
+
+    result = json.loads(capsys.readouterr().out)
+    events = _read_events(log)
+    phases = [event["phase"] for event in events if event["event"] == "phase"]
+    assert phases == ["validate", "render", "write"]
+    run = events[-1]
+    assert run["event"] == "run"
+    assert run["document"] == str(output)
+    assert run["status"] == "success"
+    assert run["bytes"] == result["markdown"]["bytes"]
+    assert isinstance(run["duration"], float)
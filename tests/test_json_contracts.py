@@ -2,10 +2,16 @@ from __future__ import annotations
 
 # ruff: noqa: S101 - assertions express expectations in test cases
 import copy
+import gzip
 import json
-from collections.abc import Mapping
+import lzma
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Mapping
 from pathlib import Path
-from typing import Final, cast
+from typing import IO, Final, cast
 
 import pytest
 
@@ -15,7 +21,14 @@ from x_make_markdown_x.json_contracts import (
     INPUT_SCHEMA,
     OUTPUT_SCHEMA,
 )
-from x_make_markdown_x.x_cls_make_markdown_x import main_json
+from x_make_markdown_x.section_index import SectionIndex, read_section
+from x_make_markdown_x.x_cls_make_markdown_x import (
+    XClsMakeMarkdownX,
+    _ProfileOptions,
+    _run_json_cli,
+    _run_profiled,
+    main_json,
+)
 
 FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "json_contracts"
 REPORTS_DIR = Path(__file__).resolve().parents[1] / "reports"
@@ -87,3 +100,262 @@ def test_main_json_returns_error_for_invalid_payload() -> None:
     status_value = result.get("status")
     assert isinstance(status_value, str)
     assert status_value == "failure"
+
+
+def test_cli_profile_flags_write_artifacts_next_to_output(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    payload = copy.deepcopy(SAMPLE_INPUT)
+    parameters = cast("dict[str, object]", payload["parameters"])
+    parameters["output_markdown"] = str(tmp_path / "report.md")
+    parameters["export_pdf"] = False
+    payload_file = tmp_path / "payload.json"
+    payload_file.write_text(json.dumps(payload), encoding="utf-8")
+
+    _run_json_cli(["--json-file", str(payload_file), "--profile", "--profile-memory"])
+
+    result = cast("dict[str, object]", json.loads(capsys.readouterr().out))
+    validate_payload(result, OUTPUT_SCHEMA)
+    assert (tmp_path / "report.prof").is_file()
+    report = (tmp_path / "report.tracemalloc.txt").read_text(encoding="utf-8")
+    assert report.startswith("peak traced memory:")
+    messages = cast("list[str]", result["messages"])
+    assert any(str(tmp_path / "report.prof") in message for message in messages)
+
+
+def test_concurrent_profiled_renders_take_turns(tmp_path: Path) -> None:
+    payload = copy.deepcopy(SAMPLE_INPUT)
+    parameters = cast("dict[str, object]", payload["parameters"])
+    parameters["output_markdown"] = str(tmp_path / "report.md")
+    active: list[int] = []
+    overlaps: list[int] = []
+
+    def _render() -> dict[str, object]:
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+        return {"status": "success"}
+
+    options = _ProfileOptions(cpu=True, memory=True)
+    threads = [
+        threading.Thread(target=_run_profiled, args=(payload, options, _render))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1, 1, 1]
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.parametrize(
+    ("file_name", "compression", "opener"),
+    [
+        ("report.md.gz", None, gzip.open),
+        ("report.md.xz", None, lzma.open),
+        ("report.md", "gzip", gzip.open),
+    ],
+)
+def test_main_json_compresses_while_writing(
+    tmp_path: Path,
+    file_name: str,
+    compression: str | None,
+    opener: Callable[..., IO[str]],
+) -> None:
+    payload = copy.deepcopy(SAMPLE_INPUT)
+    parameters = cast("dict[str, object]", payload["parameters"])
+    parameters["output_markdown"] = str(tmp_path / file_name)
+    parameters["export_pdf"] = False
+    if compression is not None:
+        parameters["compression"] = compression
+
+    result = main_json(payload)
+
+    validate_payload(result, OUTPUT_SCHEMA)
+    artifact = cast("dict[str, object]", result["markdown"])
+    with opener(tmp_path / file_name, "rt", encoding="utf-8") as handle:
+        text = handle.read()
+    assert text.startswith("- [1 Release Notes]")
+    assert artifact["uncompressed_bytes"] == len(text.encode("utf-8"))
+    assert artifact["bytes"] == (tmp_path / file_name).stat().st_size
+    assert artifact["compression"] in {"gzip", "xz"}
+
+
+def test_main_json_renders_csv_table_block(tmp_path: Path) -> None:
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("a,b\n1,2\n3\n", encoding="utf-8")
+    payload: dict[str, object] = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(tmp_path / "doc.md"),
+            "document": {"blocks": [{"kind": "csv_table", "path": str(csv_path)}]},
+            "lint": {},
+        },
+    }
+
+    result = main_json(payload)
+
+    validate_payload(result, OUTPUT_SCHEMA)
+    written = (tmp_path / "doc.md").read_text(encoding="utf-8")
+    assert written == "a | b\n--- | ---\n1 | 2\n3 | \n\n"
+    summary = cast("dict[str, object]", result["summary"])
+    lint = cast("dict[str, object]", summary["lint"])
+    assert cast("dict[str, int]", lint["counts"])["error"] == 1
+
+    parameters = cast("dict[str, object]", payload["parameters"])
+    parameters["document"] = {
+        "blocks": [{"kind": "csv_table", "path": str(tmp_path / "missing.csv")}]
+    }
+    failure = main_json(payload)
+    validate_payload(failure, ERROR_SCHEMA)
+    assert failure["message"] == "markdown generation failed"
+
+    parameters["document"] = {
+        "blocks": [{"kind": "csv_table", "path": str(csv_path), "columns": [5]}]
+    }
+    out_of_range = main_json(payload)
+    validate_payload(out_of_range, ERROR_SCHEMA)
+    details = cast("dict[str, object]", out_of_range["details"])
+    assert details["message"] == "CSV column 5 is out of range for 2 columns"
+
+
+def _wedged_wkhtmltopdf(tmp_path: Path) -> Path:
+    script = tmp_path / "wkhtmltopdf"
+    script.write_text(
+        f"#!{sys.executable}\nimport time\ntime.sleep(30)\n", encoding="utf-8"
+    )
+    script.chmod(0o755)
+    return script
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs an executable script")
+def test_main_json_kills_overrunning_export_and_keeps_markdown(
+    tmp_path: Path,
+) -> None:
+    payload: dict[str, object] = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(tmp_path / "doc.md"),
+            "export_pdf": True,
+            "wkhtmltopdf_path": str(_wedged_wkhtmltopdf(tmp_path)),
+            "export_timeout_seconds": 0.5,
+            "document": {"blocks": [{"kind": "paragraph", "text": "kept"}]},
+        },
+    }
+
+    started = time.monotonic()
+    result = main_json(payload, deadline_seconds=20)
+
+    assert time.monotonic() - started < 10
+    validate_payload(result, OUTPUT_SCHEMA)
+    assert (tmp_path / "doc.md").read_text(encoding="utf-8") == "kept\n\n"
+    pdf = cast(
+        "dict[str, object]", cast("dict[str, object]", result["markdown"])["pdf"]
+    )
+    assert pdf["succeeded"] is False
+    assert "0.5s budget" in str(pdf["detail"])
+    summary = cast("dict[str, object]", result["summary"])
+    assert cast("dict[str, float]", summary["deadline"])["budget_seconds"] == 20
+
+
+def test_main_json_fails_between_phases_once_deadline_has_passed(
+    tmp_path: Path,
+) -> None:
+    payload: dict[str, object] = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(tmp_path / "doc.md"),
+            "export_pdf": False,
+            "deadline_seconds": 1e-9,
+            "document": {"blocks": [{"kind": "paragraph", "text": "kept"}]},
+        },
+    }
+
+    result = main_json(payload)
+
+    validate_payload(result, ERROR_SCHEMA)
+    assert result["message"] == "deadline exceeded"
+    details = cast("dict[str, object]", result["details"])
+    assert details == {"phase": "validate", "budget_seconds": 1e-9}
+    assert not (tmp_path / "doc.md").exists()
+
+
+def test_builder_skips_export_once_deadline_has_passed(tmp_path: Path) -> None:
+    wkhtmltopdf = tmp_path / "wkhtmltopdf.exe"
+    wkhtmltopdf.write_text("binary", encoding="utf-8")
+    builder = XClsMakeMarkdownX(
+        wkhtmltopdf_path=str(wkhtmltopdf), deadline=time.monotonic() - 1
+    )
+    builder.add_paragraph("kept")
+
+    builder.generate(output_file=str(tmp_path / "doc.md"))
+
+    result = builder.get_last_export_result()
+    assert result is not None
+    assert result.succeeded is False
+    assert result.detail == "PDF export skipped: the deadline had already passed"
+
+
+def _daily_payload(output: Path, *days: str) -> dict[str, object]:
+    blocks: list[dict[str, object]] = []
+    for day in days:
+        blocks.append({"kind": "header", "text": day, "level": 1})
+        blocks.append({"kind": "paragraph", "text": f"Entries for {day}."})
+    return {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(output),
+            "append": True,
+            "document": {"blocks": blocks, "include_toc": True},
+        },
+    }
+
+
+def test_main_json_append_mode_continues_numbering_and_toc(tmp_path: Path) -> None:
+    output = tmp_path / "audit.md"
+    main_json(_daily_payload(output, "Monday"))
+    second = main_json(_daily_payload(output, "Tuesday"))
+    third = main_json(_daily_payload(output, "Wednesday"))
+    validate_payload(third, OUTPUT_SCHEMA)
+
+    full = tmp_path / "full.md"
+    main_json(_daily_payload(full, "Monday", "Tuesday", "Wednesday"))
+    full_toc = SectionIndex.load(full).toc
+    assert full_toc is not None
+    expected = full.read_text(encoding="utf-8")
+    toc, body = expected[: full_toc[1]], expected[full_toc[1] :]
+    appended = output.read_text(encoding="utf-8")
+    assert appended.startswith(toc)
+    assert appended.endswith(body)
+    assert not appended[len(toc) : -len(body)].strip(), "only padding in between"
+
+    second_summary = cast("dict[str, dict[str, object]]", second["summary"])
+    third_summary = cast("dict[str, dict[str, object]]", third["summary"])
+    assert second_summary["append"]["toc_rewritten"] is True
+    assert third_summary["append"]["toc_rewritten"] is False
+    assert cast("dict[str, object]", third["summary"])["words"] == 6
+    assert read_section(output, "2") == "# 2 Tuesday\nEntries for Tuesday.\n\n"
+
+
+def test_main_json_append_mode_adds_a_missing_toc(tmp_path: Path) -> None:
+    output = tmp_path / "audit.md"
+    first = _daily_payload(output, "Monday")
+    cast("dict[str, dict[str, object]]", first["parameters"])["document"][
+        "include_toc"
+    ] = False
+    main_json(first)
+    assert SectionIndex.load(output).toc is None
+
+    second = main_json(_daily_payload(output, "Tuesday"))
+
+    summary = cast("dict[str, dict[str, object]]", second["summary"])
+    assert summary["append"]["toc_rewritten"] is True
+    appended = output.read_text(encoding="utf-8")
+    assert appended.startswith("- [1 Monday](#1-monday)\n- [2 Tuesday](#2-tuesday)")
+    assert appended.endswith("# 2 Tuesday\nEntries for Tuesday.\n\n")
+    assert SectionIndex.load(output).toc is not None
+    assert read_section(output, "1") == "# 1 Monday\nEntries for Monday.\n\n"
+    assert not list(tmp_path.glob("*.tmp"))
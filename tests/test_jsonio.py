@@ -0,0 +1,108 @@
+"""Round-trip tests for the pluggable JSON backend."""
+
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import cast
+
+import pytest
+from x_make_common_x.json_contracts import validate_payload
+from x_make_markdown_x.json_contracts import OUTPUT_SCHEMA
+from x_make_markdown_x.jsonio import (
+    BACKENDS,
+    JsonBackend,
+    dumps,
+    dumps_bytes,
+    load_backend,
+    loads,
+)
+from x_make_markdown_x.x_cls_make_markdown_x import _run_json_cli
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "json_contracts"
+FIXTURES = sorted(FIXTURE_DIR.glob("*.json"))
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request: pytest.FixtureRequest) -> JsonBackend:
+    name = cast("str", request.param)
+    try:
+        return load_backend(name)
+    except ModuleNotFoundError:
+        pytest.skip(f"{name} is not installed")
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+@pytest.mark.parametrize("compact", [False, True])
+def test_fixtures_round_trip(
+    backend: JsonBackend, fixture: Path, *, compact: bool
+) -> None:
+    raw = fixture.read_bytes()
+    expected = json.loads(raw)
+
+    decoded = loads(raw, backend=backend)
+    assert decoded == expected
+    encoded = dumps_bytes(decoded, compact=compact, backend=backend)
+    assert json.loads(encoded) == expected
+    if compact:
+        assert b"\n" not in encoded
+    else:
+        assert encoded.decode("utf-8") == json.dumps(expected, indent=2)
+
+
+def test_stdlib_only_values_fall_back(backend: JsonBackend) -> None:
+    raw = b'{"big": 123456789012345678901234567890, "nan": NaN, "text": "caf\\u00e9"}'
+
+    decoded = cast("dict[str, object]", loads(raw, backend=backend))
+
+    assert decoded["big"] == 123456789012345678901234567890
+    assert math.isnan(cast("float", decoded["nan"]))
+    assert decoded["text"] == "café"
+    assert json.loads(dumps({1: decoded["big"]}, backend=backend)) == {
+        "1": 123456789012345678901234567890
+    }
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_non_finite_floats_encode_like_the_stdlib(
+    backend: JsonBackend, *, compact: bool
+) -> None:
+    value = {"nan": math.nan, "rates": [1.5, math.inf, -math.inf]}
+    separators = (",", ":") if compact else None
+
+    encoded = dumps(value, compact=compact, backend=backend)
+
+    assert encoded == json.dumps(
+        value, indent=None if compact else 2, separators=separators
+    )
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError, match="unknown JSON backend"):
+        load_backend("yaml")
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_cli_output_matches_across_modes(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], *, compact: bool
+) -> None:
+    payload = cast(
+        "dict[str, object]", json.loads((FIXTURE_DIR / "input.json").read_bytes())
+    )
+    parameters = cast("dict[str, object]", payload["parameters"])
+    parameters["output_markdown"] = str(tmp_path / "report.md")
+    parameters["export_pdf"] = False
+    payload_file = tmp_path / "payload.json"
+    payload_file.write_text(json.dumps(payload), encoding="utf-8")
+
+    _run_json_cli(
+        ["--json-file", str(payload_file), *(["--compact"] if compact else [])]
+    )
+
+    out = capsys.readouterr().out
+    assert out.endswith("\n")
+    assert (out.count("\n") == 1) is compact
+    result = cast("dict[str, object]", json.loads(out))
+    validate_payload(result, OUTPUT_SCHEMA)
+    assert cast("dict[str, object]", result["summary"])["blocks"]
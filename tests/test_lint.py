@@ -0,0 +1,65 @@
+"""Tests for render-time accessibility and structure lint."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, cast
+
+from x_make_markdown_x.lint import MarkdownLinter
+from x_make_markdown_x.x_cls_make_markdown_x import XClsMakeMarkdownX, main_json
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_builder_reports_findings_while_rendering() -> None:
+    linter = MarkdownLinter(max_line_length=40)
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="", linter=linter)
+    builder.add_header("Intro", level=1)
+    builder.add_header("Deep", level=3)
+    builder.add_image("", "figures/chart.png")
+    builder.add_image("chart", "figures/chart.png")
+    builder.add_image("Quarterly revenue by region", "figures/chart.png")
+    builder.add_table(["A", "B"], [["1", "2"], ["3"], ["4", "5", "6"]])
+    builder.add_paragraph("x" * 41)
+    builder.add_paragraph("short")
+
+    rules = [(finding.rule, finding.block) for finding in linter.findings]
+    assert rules == [
+        ("header-level-jump", 2),
+        ("image-alt-missing", 3),
+        ("image-alt-placeholder", 4),
+        ("table-row-width", 6),
+        ("line-length", 7),
+    ]
+    assert linter.counts() == {"info": 1, "warning": 2, "error": 2}
+    assert linter.exceeds("error")
+    assert "2 row(s)" in linter.findings[3].message
+
+
+def test_main_json_reports_lint_and_honours_fail_on(tmp_path: Path) -> None:
+    blocks: list[dict[str, object]] = [
+        {"kind": "header", "text": "Same", "level": 1},
+        {"kind": "header", "text": "Same", "level": 1},
+        {"kind": "image", "alt_text": "image", "url": "https://example.com/a.png"},
+    ]
+    payload: dict[str, object] = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(tmp_path / "doc.md"),
+            "document": {"blocks": blocks},
+            "lint": {},
+        },
+    }
+
+    result = main_json(payload)
+    assert result["status"] == "success"
+    summary = cast("dict[str, object]", result["summary"])
+    lint = cast("dict[str, object]", summary["lint"])
+    assert lint["counts"] == {"info": 0, "warning": 1, "error": 0}
+
+    parameters = cast("dict[str, object]", payload["parameters"])
+    parameters["lint"] = {"fail_on": "warning"}
+    parameters["output_markdown"] = str(tmp_path / "strict.md")
+    failure = main_json(payload)
+    assert failure["status"] == "failure"
+    assert not (tmp_path / "strict.md").exists(), "lint failure skips the write"
@@ -0,0 +1,66 @@
+"""Tests for the main_json load driver."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from x_make_markdown_x.loadtest import LoadReport, main, run_load, synthetic_payloads
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_run_load_replays_mixed_corpus_with_fake_exporter(tmp_path: Path) -> None:
+    payloads = synthetic_payloads([("tiny", 2, 2, False), ("tiny-pdf", 2, 2, True)])
+    report = run_load(payloads, requests=6, concurrency=3, output_dir=tmp_path)
+
+    assert report.failures == 0
+    assert len(report.latencies) == 6
+    assert len(list(tmp_path.glob("*-tiny.md"))) == 3
+    assert len(list(tmp_path.glob("*-tiny-pdf.pdf"))) == 3
+    assert set(report.latency_percentiles()) == {"p50", "p95", "p99"}
+    assert report.to_metadata()["throughput_per_second"] == round(report.throughput, 3)
+
+
+def test_load_report_uses_nearest_rank_percentiles() -> None:
+    report = LoadReport(
+        mode="inprocess",
+        requests=4,
+        failures=0,
+        concurrency=1,
+        rate=None,
+        elapsed_seconds=2.0,
+        latencies=(0.4, 0.1, 0.3, 0.2),
+        peak_rss_bytes=None,
+    )
+    assert report.throughput == 2.0
+    assert report.latency_percentiles((50, 99)) == {"p50": 0.2, "p99": 0.4}
+
+
+def test_run_load_rejects_unknown_mode(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="mode"):
+        run_load(synthetic_payloads(), requests=1, mode="grpc", output_dir=tmp_path)
+
+
+@pytest.mark.parametrize("rate", [0.0, -5.0])
+def test_run_load_rejects_non_positive_rates(tmp_path: Path, rate: float) -> None:
+    with pytest.raises(ValueError, match="rate must be a positive"):
+        run_load(synthetic_payloads(), requests=1, rate=rate, output_dir=tmp_path)
+    with pytest.raises(SystemExit):
+        main(["--rate", str(rate), "--requests", "1"])
+
+
+@pytest.mark.parametrize(("requests", "concurrency"), [(0, 1), (1, 0), (1, -2)])
+def test_run_load_rejects_non_positive_counts(
+    tmp_path: Path, requests: int, concurrency: int
+) -> None:
+    with pytest.raises(ValueError, match="must be a positive integer"):
+        run_load(
+            synthetic_payloads(),
+            requests=requests,
+            concurrency=concurrency,
+            output_dir=tmp_path,
+        )
+    with pytest.raises(SystemExit):
+        main(["--requests", str(requests), "--concurrency", str(concurrency)])
@@ -4,15 +4,23 @@
 
 from __future__ import annotations
 
+import array
 import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import TYPE_CHECKING, NoReturn
+from typing import TYPE_CHECKING, Any, NoReturn
 
 import pytest
 
 from x_make_common_x import exporters
-from x_make_markdown_x.x_cls_make_markdown_x import XClsMakeMarkdownX
+from x_make_markdown_x import x_cls_make_markdown_x as markdown_module
+from x_make_markdown_x.section_index import SectionIndex, read_section
+from x_make_markdown_x.x_cls_make_markdown_x import (
+    ColumnFormat,
+    XClsMakeMarkdownX,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -122,3 +130,342 @@ def test_generate_records_export_result(tmp_path: Path) -> None:
     assert result is not None
     assert result.succeeded is True
     assert result.output_path == tmp_path / "doc.pdf"
+
+
+@pytest.mark.parametrize("memory_budget", [None, 16])
+def test_generate_stages_local_images_once(
+    tmp_path: Path, memory_budget: int | None
+) -> None:
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "a.png").write_bytes(b"same-bytes")
+    (images / "b.png").write_bytes(b"same-bytes")
+    (images / "c.png").write_bytes(b"other-bytes")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    builder = XClsMakeMarkdownX(
+        wkhtmltopdf_path="",
+        asset_dir=out_dir / "doc_assets",
+        memory_budget=memory_budget,
+    )
+    builder.add_header("Gallery")
+    for name in ("a.png", "b.png", "a.png", "c.png"):
+        builder.add_image(f"Image {name}", str(images / name))
+    builder.add_image("Remote", "https://example.com/remote.png")
+    builder.add_toc()
+
+    markdown_text = builder.generate(output_file=str(out_dir / "doc.md"))
+    builder.close()
+
+    staged = sorted(path.name for path in (out_dir / "doc_assets").iterdir())
+    assert len(staged) == 2, "identical content should be staged once"
+    assert str(images) not in markdown_text, "local references should be rewritten"
+    assert "](doc_assets/" in markdown_text
+    assert "(https://example.com/remote.png)" in markdown_text
+    report = builder.get_last_asset_report()
+    assert report is not None
+    assert report.references == 4
+    assert report.unique == 2
+    assert report.cache_hits == 2
+
+
+def test_generate_stages_relative_images_from_the_output_directory(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    docs = tmp_path / "docs"
+    (docs / "img").mkdir(parents=True)
+    (docs / "img" / "a.png").write_bytes(b"relative-bytes")
+    monkeypatch.chdir(tmp_path)
+
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="", asset_dir=docs / "d_assets")
+    builder.add_image("A", "img/a.png")
+    markdown_text = builder.generate(output_file=str(docs / "d.md"))
+    builder.close()
+
+    assert "](d_assets/" in markdown_text
+    assert "(img/a.png)" not in markdown_text
+    report = builder.get_last_asset_report()
+    assert report is not None
+    assert report.references == 1
+
+
+def test_memory_budget_spills_and_splices_in_order(tmp_path: Path) -> None:
+    reference = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    budgeted = XClsMakeMarkdownX(wkhtmltopdf_path="", memory_budget=64)
+    for builder in (reference, budgeted):
+        for index in range(20):
+            builder.add_header(f"Section {index}", level=1 + index % 2)
+            builder.add_paragraph(f"Paragraph body number {index}.")
+            builder.add_list([f"item {index}a", f"item {index}b"])
+        builder.add_toc()
+
+    expected = reference.generate(output_file=str(tmp_path / "reference.md"))
+
+    assert budgeted.has_spilled(), "small budget should force a spill"
+    assert sum(map(len, budgeted.elements)) <= 64 + 64
+    written = budgeted.write_markdown(str(tmp_path / "budgeted.md"))
+    assert written.read_text(encoding="utf-8") == expected
+    assert budgeted.generate(output_file=str(tmp_path / "again.md")) == expected
+    budgeted.close()
+
+    # The budget counts encoded bytes: 40 two-byte characters exceed 64.
+    accented = XClsMakeMarkdownX(wkhtmltopdf_path="", memory_budget=64)
+    accented.add_paragraph("é" * 40)
+    assert accented.has_spilled()
+    accented.close()
+
+
+def test_sections_filled_concurrently_merge_in_reserved_order(
+    tmp_path: Path,
+) -> None:
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    builder.add_header("Report")
+    chapters = [builder.new_section(f"chapter-{index}") for index in range(4)]
+
+    def fill(index: int) -> None:
+        # Later chapters finish first to prove merge order is not fill order.
+        time.sleep(0.01 * (4 - index))
+        section = chapters[index]
+        section.add_header(f"Chapter {index}", level=2)
+        section.add_paragraph(f"Body {index}")
+        section.add_header("Details", level=3)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(fill, range(4)))
+    builder.merge_sections()
+    builder.add_toc()
+
+    markdown_text = builder.generate(output_file=str(tmp_path / "doc.md"))
+
+    assert "## 1.1 Chapter 0\n" in markdown_text
+    assert "## 1.4 Chapter 3\n" in markdown_text
+    assert "### 1.4.1 Details\n" in markdown_text
+    assert markdown_text.index("Body 0") < markdown_text.index("Body 3")
+    assert "- [1.3.1 Details](#131-details)" in markdown_text
+
+
+def test_csv_table_matches_inline_table(tmp_path: Path) -> None:
+    csv_path = tmp_path / "inventory.csv"
+    csv_path.write_text(
+        'sku,name,qty\nA1,"Bolt, hex",10\nB2,Nut | small,200\nC3,Washer,5\n',
+        encoding="utf-8",
+    )
+    inline = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    inline.add_table(["qty", "sku"], [["10", "A1"], ["200", "B2"]])
+    streamed = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    streamed.add_csv_table(csv_path, columns=["qty", 0], limit=2)
+
+    assert "".join(streamed.elements) == "".join(inline.elements)
+
+    escaped = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    escaped.add_csv_table(csv_path, columns=["name"])
+    assert "Nut \\| small" in "".join(escaped.elements)
+
+
+def test_tsv_table_without_header_row(tmp_path: Path) -> None:
+    tsv_path = tmp_path / "data.tsv"
+    tsv_path.write_text("1\t2\n3\t4\n", encoding="utf-8")
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    builder.add_csv_table(tsv_path, header=False, headers=["left", "right"])
+
+    assert "".join(builder.elements) == "left | right\n--- | ---\n1 | 2\n3 | 4\n\n"
+
+    second = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    second.add_csv_table(tsv_path, header=False, columns=[1])
+    assert "".join(second.elements) == "1\n---\n2\n4\n\n"
+    with pytest.raises(ValueError, match="out of range for 2 columns"):
+        XClsMakeMarkdownX(wkhtmltopdf_path="").add_csv_table(
+            tsv_path, header=False, columns=[2]
+        )
+
+
+def test_table_columns_match_row_table_and_apply_formats() -> None:
+    rows = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    rows.add_table(["sku", "qty"], [["A1", "10"], ["B2", "200"]])
+    columns = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    columns.add_table_columns({"sku": ["A1", "B2"], "qty": array.array("i", [10, 200])})
+
+    assert "".join(columns.elements) == "".join(rows.elements)
+
+    formatted = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    formatted.add_table_columns(
+        {"price": array.array("d", [1234.5, 0.125]), "share": [0.5, 0.25]},
+        formats={
+            "price": ColumnFormat(precision=2, thousands=True, align="right"),
+            "share": ColumnFormat(precision=1, align="center"),
+        },
+    )
+    assert "".join(formatted.elements) == (
+        "price | share\n---: | :---:\n1,234.50 | 0.5\n0.12 | 0.2\n\n"
+    )
+
+
+def test_table_columns_escape_text_like_csv_table(tmp_path: Path) -> None:
+    csv_path = tmp_path / "parts.csv"
+    csv_path.write_text(
+        'sku,name | alias,qty\nA1,"Bolt, hex",10\nB2,Nut | small,200\n',
+        encoding="utf-8",
+    )
+    streamed = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    streamed.add_csv_table(csv_path)
+    columns = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    columns.add_table_columns(
+        {
+            "sku": ["A1", "B2"],
+            "name | alias": ["Bolt, hex", "Nut | small"],
+            "qty": array.array("i", [10, 200]),
+        }
+    )
+
+    assert "".join(columns.elements) == "".join(streamed.elements)
+    assert "name \\| alias" in "".join(columns.elements)
+    assert "Nut \\| small" in "".join(columns.elements)
+
+
+def test_table_columns_reject_ragged_columns() -> None:
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    with pytest.raises(ValueError, match="equal lengths"):
+        builder.add_table_columns({"a": [1, 2], "b": [1]})
+    with pytest.raises(ValueError, match="align"):
+        ColumnFormat(align="justify")
+
+
+def _chaptered_markdown() -> str:
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="")
+    for index in range(12):
+        builder.add_header(f"Chapter {index}", level=1 + index % 2)
+        builder.add_paragraph(
+            f"Body *{index}* with a [link](https://example.com/{index})"
+        )
+        builder.add_list(["one", "two"], ordered=index % 3 == 0)
+        builder.add_table(["k", "v"], [[str(index), "x"]])
+        builder.add_image(f"Figure {index}", f"figures/{index}.png")
+    builder.add_toc()
+    return "".join(builder.elements)
+
+
+def test_chunked_html_matches_single_conversion() -> None:
+    text = _chaptered_markdown()
+    chunks = markdown_module.split_markdown_for_html(text, chunk_chars=200)
+
+    assert len(chunks) > 1
+    assert all(chunk.startswith("#") for chunk in chunks[1:])
+    assert "".join(chunks) == text
+    single = markdown_module.markdown_to_html(text)
+    pool = markdown_module._HTML_POOL
+    assert markdown_module.markdown_to_html(text, workers=2, chunk_chars=200) == single
+    first = pool.get(2)
+    assert markdown_module.markdown_to_html(text, workers=2, chunk_chars=200) == single
+    assert pool.get(2) is first, "the worker pool is reused across calls"
+
+    with_reference = text + "[ref]: https://example.com\n"
+    assert markdown_module.split_markdown_for_html(with_reference, chunk_chars=200) == [
+        with_reference
+    ]
+
+
+def test_html_workers_export_pdf_from_converted_html(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    captured: list[str] = []
+    export_html_to_pdf = exporters.export_html_to_pdf
+
+    def capture_html(html: str, **options: Any) -> exporters.ExportResult:
+        captured.append(html)
+        return export_html_to_pdf(html, **options)
+
+    def runner(command: Sequence[str]) -> CompletedProcess[str]:
+        Path(command[-1]).write_text("PDF", encoding="utf-8")
+        return CompletedProcess(list(command), 0, stdout="ok", stderr="")
+
+    monkeypatch.setattr(markdown_module, "export_html_to_pdf", capture_html)
+    wkhtmltopdf = tmp_path / "wkhtmltopdf.exe"
+    wkhtmltopdf.write_text("binary", encoding="utf-8")
+    builder = XClsMakeMarkdownX(
+        wkhtmltopdf_path=str(wkhtmltopdf), runner=runner, html_workers=2
+    )
+    builder.add_header("Intro")
+    builder.generate(output_file=str(tmp_path / "doc.md"))
+
+    assert captured == [builder.to_html("".join(builder.elements))]
+    result = builder.get_last_export_result()
+    assert result is not None
+    assert result.succeeded is True
+
+
+@pytest.mark.parametrize("memory_budget", [None, 64])
+def test_section_index_reads_sections_by_number_and_anchor(
+    tmp_path: Path, memory_budget: int | None
+) -> None:
+    builder = XClsMakeMarkdownX(
+        wkhtmltopdf_path="", memory_budget=memory_budget, section_index=True
+    )
+    builder.add_header("Intro", level=1)
+    builder.add_paragraph("Welcome — ünïcode keeps byte offsets honest.")
+    builder.add_header("Details", level=2)
+    builder.add_paragraph("Point A")
+    builder.add_header("Appendix", level=1)
+    builder.add_paragraph("The end.")
+    builder.add_toc()
+    output = tmp_path / "doc.md"
+    builder.write_markdown(str(output))
+
+    index = SectionIndex.load(output)
+    assert builder.get_last_index_path() == tmp_path / "doc.md.idx.json"
+    assert [entry.number for entry in index.sections] == ["1", "1.1", "2"]
+    assert read_section(output, "1.1") == "## 1.1 Details\nPoint A\n\n"
+    assert index.read("#2-appendix") == "# 2 Appendix\nThe end.\n\n"
+    assert index.read("1").startswith("# 1 Intro\nWelcome — ünïcode")
+    assert index.read("1").endswith("Point A\n\n")
+    assert index.toc is not None
+    raw = output.read_bytes()
+    assert raw[: index.toc[1]].decode("utf-8") == "\n".join(builder.toc) + "\n\n"
+
+    output.write_text("rewritten", encoding="utf-8")
+    with pytest.raises(ValueError, match="changed since it was indexed"):
+        index.read("2")
+
+
+def test_failed_append_leaves_the_document_and_toc_untouched(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    output = tmp_path / "doc.md"
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="", section_index=True)
+    builder.add_header("Intro")
+    builder.add_toc()
+    builder.write_markdown(str(output))
+    original = output.read_bytes()
+
+    resumed = XClsMakeMarkdownX(wkhtmltopdf_path="", section_index=True)
+    resumed.resume(output)
+    resumed.add_header("A much longer heading that outgrows the old TOC span")
+
+    def _fail(_handle: object) -> NoReturn:
+        message = "disk full"
+        raise OSError(message)
+
+    monkeypatch.setattr(resumed, "_write_appended", _fail)
+    with pytest.raises(OSError, match="disk full"):
+        resumed.append_markdown(output)
+    assert output.read_bytes() == original
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_write_markdown_counts_words_across_spill_chunks(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    # Tiny chunks split words across reads of the spill file.
+    monkeypatch.setattr(markdown_module, "_SPLICE_CHUNK_SIZE", 7)
+    builder = XClsMakeMarkdownX(wkhtmltopdf_path="", memory_budget=32)
+    for index in range(10):
+        builder.add_header(f"Section {index}")
+        builder.add_paragraph(f"Paragraph words number {index} arelonger.")
+    builder.add_raw("tail")
+    assert builder.has_spilled()
+
+    written = builder.write_markdown(str(tmp_path / "doc.md"), count_words=True)
+    builder.close()
+
+    text = written.read_text(encoding="utf-8")
+    assert builder.get_last_word_count() == len(text.split())
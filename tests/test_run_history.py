@@ -0,0 +1,98 @@
+"""Tests for the append-only run history store."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import TYPE_CHECKING
+
+import pytest
+from x_make_markdown_x.run_history import (
+    RunHistoryStore,
+    RunRecord,
+    main,
+    percentile_of,
+)
+from x_make_markdown_x.x_cls_make_markdown_x import main_json
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _payload(output_markdown: Path, document_class: str) -> dict[str, object]:
+    return {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(output_markdown),
+            "document": {
+                "blocks": [
+                    {"kind": "header", "text": "Intro", "level": 1},
+                    {"kind": "paragraph", "text": "Three words here."},
+                ],
+            },
+            "metadata": {"document_class": document_class},
+        },
+    }
+
+
+def test_main_json_appends_run_records(tmp_path: Path) -> None:
+    database = tmp_path / "history.sqlite3"
+    for index in range(3):
+        result = main_json(
+            _payload(tmp_path / f"doc{index}.md", "dossier"),
+            run_history=database,
+        )
+        assert result["status"] == "success"
+    main_json(_payload(tmp_path / "other.md", "ledger"), run_history=database)
+
+    store = RunHistoryStore(database)
+    report = store.percentiles("words")
+    assert set(report) == {"dossier", "ledger"}
+    assert report["dossier"]["count"] == 3
+    assert report["dossier"]["p50"] == report["dossier"]["p99"]
+
+    with sqlite3.connect(database) as connection:
+        timings = json.loads(
+            connection.execute("SELECT timings FROM runs LIMIT 1").fetchone()[0]
+        )
+        assert {"validate", "render", "write", "total"} <= set(timings)
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            connection.execute("DELETE FROM runs")
+
+
+def test_query_cli_reports_trend(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    database = tmp_path / "history.sqlite3"
+    store = RunHistoryStore(database)
+    for seconds in (1.0, 2.0, 9.0):
+        store.record(
+            RunRecord(
+                document_class="dossier",
+                status="success",
+                timings={"total": seconds},
+                tool_version="0.20.4",
+            )
+        )
+
+    exit_code = main(["--db", str(database), "trend", "--bucket", "release"])
+
+    assert exit_code == 0
+    trend = json.loads(capsys.readouterr().out)
+    assert trend == [
+        {"document_class": "dossier", "bucket": "0.20.4", "count": 3, "p50": 2.0}
+    ]
+
+
+def test_percentiles_outside_0_to_100_are_rejected(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(ValueError, match="between 0 and 100"):
+        percentile_of([1.0, 2.0], 101)
+    assert percentile_of([1.0, 2.0], 0) == 1.0
+
+    database = tmp_path / "history.sqlite3"
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--db", str(database), "percentiles", "--percentile", "-5"])
+    assert excinfo.value.code == 2
+    assert "between 0 and 100" in capsys.readouterr().err
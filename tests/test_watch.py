@@ -0,0 +1,126 @@
+"""Tests for the payload watch mode."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from x_make_markdown_x.runners import CancellableRunner
+from x_make_markdown_x.watch import PayloadWatcher
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from x_make_common_x.exporters import CommandRunner
+
+
+def _write_payload(path: Path, text: str) -> None:
+    payload = {
+        "command": "x_make_markdown_x",
+        "parameters": {
+            "output_markdown": str(path.with_suffix(".md")),
+            "document": {"blocks": [{"kind": "paragraph", "text": text}]},
+        },
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_watcher_debounces_and_rerenders_only_changed_payloads(
+    tmp_path: Path,
+) -> None:
+    first = tmp_path / "first.json"
+    second = tmp_path / "second.json"
+    _write_payload(first, "one")
+    _write_payload(second, "two")
+    results: list[tuple[str, object]] = []
+    watcher = PayloadWatcher(
+        [tmp_path],
+        on_result=lambda path, result: results.append((path.name, result["status"])),
+        debounce=1.0,
+    )
+
+    assert watcher.tick(now=0.0) == [], "changes wait for the debounce window"
+    assert sorted(p.name for p in watcher.tick(now=1.0)) == [
+        "first.json",
+        "second.json",
+    ]
+    watcher.wait_idle()
+    assert sorted(results) == [("first.json", "success"), ("second.json", "success")]
+    assert (tmp_path / "first.md").read_text(encoding="utf-8") == "one\n\n"
+
+    results.clear()
+    _write_payload(second, "two, edited")
+    assert watcher.tick(now=2.0) == []
+    assert [p.name for p in watcher.tick(now=3.5)] == ["second.json"]
+    watcher.wait_idle()
+    assert results == [("second.json", "success")]
+
+
+def test_newer_change_cancels_in_flight_export(tmp_path: Path) -> None:
+    payload_path = tmp_path / "doc.json"
+    _write_payload(payload_path, "draft")
+    started = threading.Event()
+    rendered: list[str] = []
+
+    def render(
+        payload: Mapping[str, object], runner: CommandRunner
+    ) -> dict[str, object]:
+        started.set()
+        # The first render stands in for a wedged export; the second is quick.
+        script = "import time; time.sleep(30)" if not rendered else "pass"
+        completed = runner([sys.executable, "-c", script])
+        rendered.append(completed.stderr)
+        return {"status": "success", "payload": dict(payload)}
+
+    emitted: list[Path] = []
+    watcher = PayloadWatcher(
+        [payload_path],
+        on_result=lambda path, _result: emitted.append(path),
+        render=render,
+        debounce=0.0,
+    )
+    watcher.tick(now=0.0)
+    assert started.wait(5)
+
+    _write_payload(payload_path, "final draft, longer")
+    begin = time.monotonic()
+    watcher.tick(now=1.0)
+    watcher.wait_idle(timeout=20)
+
+    assert time.monotonic() - begin < 20, "stale export should be killed"
+    assert rendered[0] == "cancelled"
+    assert len(emitted) == 1, "only the newest render reports a result"
+
+
+def test_cancellable_runner_returns_process_output() -> None:
+    runner = CancellableRunner()
+    completed = runner([sys.executable, "-c", "print('ok')"])
+    assert completed.returncode == 0
+    assert completed.stdout.strip() == "ok"
+
+
+def test_cancellable_runner_kills_command_after_timeout() -> None:
+    runner = CancellableRunner().with_timeout(0.2)
+    begin = time.monotonic()
+    completed = runner([sys.executable, "-c", "import time; time.sleep(30)"])
+    assert time.monotonic() - begin < 10
+    assert runner.timed_out
+    assert completed.stderr == "timed out"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX shell")
+def test_cancellable_runner_kills_children_of_a_wrapper(tmp_path: Path) -> None:
+    wrapper = tmp_path / "wrapper.sh"
+    # The forked sleep inherits stdout/stderr and would hold the pipes open.
+    wrapper.write_text("#!/bin/sh\nsleep 30\n", encoding="utf-8")
+    wrapper.chmod(0o755)
+    runner = CancellableRunner().with_timeout(0.2)
+    begin = time.monotonic()
+    runner([str(wrapper)])
+    assert time.monotonic() - begin < 10
+    assert runner.timed_out
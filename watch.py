@@ -0,0 +1,193 @@
+"""Watch mode for x_make_markdown_x.
+
+Keeps one warm process polling payload files (or directories of `*.json`
+payloads) and re-renders only the documents whose payload changed. Bursts of
+saves are debounced, and a newer change cancels an in-flight PDF export for
+the same payload instead of queueing behind it.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from x_make_markdown_x.jsonio import dumps
+from x_make_markdown_x.runners import CancellableRunner
+from x_make_markdown_x.x_cls_make_markdown_x import (
+    failure_payload,
+    load_json_payload,
+    main_json,
+)
+
+if TYPE_CHECKING:
+    from x_make_common_x.exporters import CommandRunner
+
+DEFAULT_DEBOUNCE_SECONDS = 0.3
+DEFAULT_POLL_SECONDS = 0.25
+
+RenderFunction = Callable[[Mapping[str, object], "CommandRunner"], dict[str, object]]
+ResultSink = Callable[[Path, dict[str, object]], None]
+
+
+def _render_with_main_json(
+    payload: Mapping[str, object], runner: CommandRunner
+) -> dict[str, object]:
+    return main_json(payload, runner=runner)
+
+
+def collect_payload_files(paths: Iterable[Path]) -> list[Path]:
+    """Expand directories to their `*.json` payloads; keep files as given."""
+
+    files: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.json")))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _Job:
+    def __init__(self, runner: CancellableRunner, thread: threading.Thread) -> None:
+        self.runner = runner
+        self.thread = thread
+
+
+class PayloadWatcher:
+    """Poll payload files and re-render changed ones after a quiet period."""
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        *,
+        on_result: ResultSink,
+        render: RenderFunction = _render_with_main_json,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_SECONDS,
+    ) -> None:
+        self.paths = tuple(paths)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._render = render
+        self._on_result = on_result
+        self._emit_lock = threading.Lock()
+        self._signatures: dict[Path, tuple[int, int]] = {}
+        self._pending: dict[Path, float] = {}
+        self._jobs: dict[Path, _Job] = {}
+
+    def scan(self) -> list[Path]:
+        """Return payloads that appeared or changed since the previous scan."""
+
+        changed: list[Path] = []
+        current: dict[Path, tuple[int, int]] = {}
+        for path in collect_payload_files(self.paths):
+            signature = _signature(path)
+            if signature is None:
+                continue
+            current[path] = signature
+            if self._signatures.get(path) != signature:
+                changed.append(path)
+        self._signatures = current
+        return changed
+
+    def tick(self, now: float | None = None) -> list[Path]:
+        """Scan once and dispatch every payload whose debounce window elapsed."""
+
+        moment = time.monotonic() if now is None else now
+        for path in self.scan():
+            self._pending[path] = moment
+        ready = [
+            path
+            for path, changed_at in self._pending.items()
+            if moment - changed_at >= self.debounce
+        ]
+        for path in ready:
+            del self._pending[path]
+            self._dispatch(path)
+        return ready
+
+    def _dispatch(self, path: Path) -> None:
+        previous = self._jobs.get(path)
+        if previous is not None:
+            previous.runner.cancel()
+        runner = CancellableRunner()
+        thread = threading.Thread(
+            target=self._run_job,
+            args=(path, runner, previous),
+            name=f"x_make_markdown_x-watch-{path.name}",
+            daemon=True,
+        )
+        self._jobs[path] = _Job(runner, thread)
+        thread.start()
+
+    def _run_job(
+        self, path: Path, runner: CancellableRunner, previous: _Job | None
+    ) -> None:
+        if previous is not None:
+            previous.thread.join()
+        if runner.cancelled:
+            return
+        try:
+            payload = load_json_payload(str(path))
+        except (OSError, TypeError, ValueError) as exc:
+            result = failure_payload(
+                "payload could not be loaded",
+                details={"path": str(path), "error": str(exc)},
+            )
+        else:
+            result = self._render(dict(payload), runner)
+        if runner.cancelled:
+            # A newer change superseded this render; its result is stale.
+            return
+        with self._emit_lock:
+            self._on_result(path, result)
+
+    def wait_idle(self, timeout: float | None = None) -> None:
+        """Block until every dispatched render has finished."""
+
+        for job in list(self._jobs.values()):
+            job.thread.join(timeout)
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Poll until `stop` is set (or forever), dispatching changed payloads."""
+
+        stop_event = stop or threading.Event()
+        try:
+            while not stop_event.is_set():
+                self.tick()
+                stop_event.wait(self.poll_interval)
+        finally:
+            for job in self._jobs.values():
+                job.runner.cancel()
+            self.wait_idle()
+
+
+def write_json_line(stream_write: Callable[[str], object]) -> ResultSink:
+    """Build a result sink that writes one JSON object per line."""
+
+    def _sink(path: Path, result: dict[str, object]) -> None:
+        stream_write(
+            dumps({"payload": str(path), "result": result}, compact=True) + "\n"
+        )
+
+    return _sink
+
+
+__all__ = [
+    "DEFAULT_DEBOUNCE_SECONDS",
+    "DEFAULT_POLL_SECONDS",
+    "PayloadWatcher",
+    "collect_payload_files",
+    "write_json_line",
+]
@@ -4,18 +4,48 @@ Features (redrabbit):
 - Headers with hierarchical numbering and TOC entries
 - Paragraphs, tables, images, lists
 - Optional PDF export using wkhtmltopdf via pdfkit
+- Optional staging of local images beside the output, deduplicated by content
+- Optional memory budget that spills buffered elements to a temporary file
+- Detached sections that can be filled concurrently and merged in order
+- Optional accessibility/structure lint evaluated as blocks are added
+- Optional gzip/xz compression of the markdown artifact while it is written
+- Tables streamed from local CSV/TSV files
+- Column-oriented tables (lists, array.array, NumPy) with batched formatting
+- Optional chunked markdown-to-HTML conversion across a process pool
+- Optional per-export timeout and overall deadline that kill a wedged export
+- Optional byte-offset section index sidecar for random access to sections
+- Append mode that extends an indexed document with continued numbering
+- Typed documents (`render_document`) that skip JSON validation and coercion
+- Optional orjson/msgspec JSON backend and compact CLI output
+- Batch rendering sharded across nodes by a stable hash of `output_markdown`
+- Optional buffered JSON-lines event log with level filtering
+- Coalesced batch PDF export: one wkhtmltopdf run for many small documents
 """
 
 from __future__ import annotations
 
 import argparse
+import cProfile
+import csv
+import gzip
 import importlib
-import json
+import io
 import logging as _logging
+import lzma
 import os as _os
+import re
+import shutil
+import sqlite3
 import sys as _sys
-from collections.abc import Mapping, Sequence
-from contextlib import suppress
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, replace
+from itertools import chain
 from pathlib import Path
 from types import MappingProxyType
 from typing import IO, Protocol, cast
@@ -28,7 +58,29 @@ from x_make_common_x.exporters import (
 )
 from x_make_common_x.json_contracts import validate_payload
 from x_make_common_x.run_reports import isoformat_timestamp
-from x_make_markdown_x.json_contracts import ERROR_SCHEMA, INPUT_SCHEMA, OUTPUT_SCHEMA
+from x_make_markdown_x.assets import (
+    ImageAssetStager,
+    StagingReport,
+    local_image_path,
+)
+from x_make_markdown_x.documents import Document
+from x_make_markdown_x.events import active_sink, configure_events, open_sink
+from x_make_markdown_x.json_contracts import (
+    ERROR_SCHEMA,
+    INPUT_SCHEMA,
+    MAX_HEADER_LEVEL,
+    OUTPUT_SCHEMA,
+)
+from x_make_markdown_x.jsonio import dumps_bytes, loads, read_stream, write_stream
+from x_make_markdown_x.lint import DEFAULT_MAX_LINE_LENGTH, MarkdownLinter
+from x_make_markdown_x.run_history import (
+    DEFAULT_DOCUMENT_CLASS,
+    RUN_HISTORY_ENV_VAR,
+    RunHistoryStore,
+    RunRecord,
+)
+from x_make_markdown_x.runners import CancellableRunner
+from x_make_markdown_x.section_index import SectionIndex, build_entries
 
 _LOGGER = _logging.getLogger("x_make")
 
@@ -71,8 +123,13 @@ class BaseMake:
         return str(v).lower() in ("1", "true", "yes")
 
 
-def _info(*args: object) -> None:
+def _info(*args: object, **fields: object) -> None:
     msg = " ".join(str(a) for a in args)
+    sink = active_sink()
+    if sink is not None:
+        # A configured event log replaces the logger/print pair.
+        sink.emit("message", message=msg, **fields)
+        return
     with suppress(Exception):
         _LOGGER.info("%s", msg)
     if not _emit_print(msg):
@@ -88,6 +145,338 @@ def _emit_print(msg: str) -> bool:
     return True
 
 
+_SPLICE_CHUNK_SIZE = 1024 * 1024
+
+
+def _splice_file(source: IO[str], target: IO[str], *, kernel_copy: bool = True) -> None:
+    """Append the whole of `source` to `target`, kernel-side when possible.
+
+    `kernel_copy` must be False when `target` transforms its bytes (for
+    example a compressing stream), since sendfile writes to the raw fd.
+    """
+    source.flush()
+    target.flush()
+    size = _os.fstat(source.fileno()).st_size
+    offset = 0
+    sendfile = getattr(_os, "sendfile", None) if kernel_copy else None
+    if sendfile is not None:
+        with suppress(OSError):
+            while offset < size:
+                sent = cast(
+                    "int",
+                    sendfile(target.fileno(), source.fileno(), offset, size - offset),
+                )
+                if sent == 0:
+                    break
+                offset += sent
+    if offset >= size:
+        return
+    if offset:
+        message = "spill file copy was interrupted"
+        raise OSError(message)
+    source.seek(0)
+    shutil.copyfileobj(source, target, _SPLICE_CHUNK_SIZE)
+
+
+COMPRESSION_SUFFIXES: Mapping[str, str] = MappingProxyType({".gz": "gzip", ".xz": "xz"})
+
+
+def resolve_compression(path: Path, compression: str | None = None) -> str | None:
+    """Return "gzip", "xz" or None for `path`, honouring an explicit choice."""
+    if compression is None:
+        return COMPRESSION_SUFFIXES.get(path.suffix.lower())
+    if compression == "none":
+        return None
+    if compression not in COMPRESSION_SUFFIXES.values():
+        message = f"unsupported compression {compression!r}; use gzip, xz or none"
+        raise ValueError(message)
+    return compression
+
+
+def open_markdown(
+    path: Path, mode: str, compression: str | None, newline: str | None = None
+) -> IO[str]:
+    """Open a Markdown file as text through its compression codec, if any."""
+    if compression == "gzip":
+        return cast(
+            "IO[str]", gzip.open(path, f"{mode}t", encoding="utf-8", newline=newline)
+        )
+    if compression == "xz":
+        return cast(
+            "IO[str]", lzma.open(path, f"{mode}t", encoding="utf-8", newline=newline)
+        )
+    return path.open(mode, encoding="utf-8", newline=newline)
+
+
+def _byte_len(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def markdown_stem(path: Path) -> str:
+    """Return the document stem, ignoring a compression suffix."""
+    if path.suffix.lower() in COMPRESSION_SUFFIXES:
+        return Path(path.stem).stem
+    return path.stem
+
+
+# Documents below this many characters convert in a single call.
+_HTML_CHUNK_CHARS = 256 * 1024
+# An ATX header after a blank line always starts a new top-level block.
+_HTML_BOUNDARY = re.compile(r"\n\n(?=#)")
+# Reference definitions and raw HTML blocks carry state across blank lines.
+_HTML_CHUNK_HAZARD = re.compile(r"^(?: {0,3}\[[^\]\n]+\]:|<)", re.MULTILINE)
+
+
+def _convert_markdown_chunk(text: str) -> str:
+    markdown_module = cast("MarkdownModule", importlib.import_module("markdown"))
+    return markdown_module.markdown(text)
+
+
+def split_markdown_for_html(
+    text: str, *, chunk_chars: int = _HTML_CHUNK_CHARS
+) -> list[str]:
+    """Split `text` before top-level headers into chunks of about `chunk_chars`.
+
+    Each chunk converts to the same HTML it has inside the whole document, so
+    joining the converted chunks with newlines matches a single conversion.
+    Text with reference-style link definitions or raw HTML blocks is returned
+    whole because those constructs span the boundaries used here.
+    """
+    if len(text) <= chunk_chars or _HTML_CHUNK_HAZARD.search(text):
+        return [text]
+    chunks: list[str] = []
+    start = 0
+    for match in _HTML_BOUNDARY.finditer(text):
+        boundary = match.end()
+        if boundary - start >= chunk_chars:
+            chunks.append(text[start:boundary])
+            start = boundary
+    chunks.append(text[start:])
+    return chunks
+
+
+class _SharedProcessPool:
+    """A process pool started on first use and reused across calls.
+
+    Starting worker processes (and importing markdown in each) costs more
+    than converting a typical chunk, so the pool outlives a single document.
+    It is replaced by a larger one when a call asks for more workers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._size = 0
+
+    def get(self, size: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None or self._size < size:
+                if self._pool is not None:
+                    # Calls already mapping on the old pool still finish.
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=size)
+                self._size = size
+            return self._pool
+
+
+_HTML_POOL = _SharedProcessPool()
+
+
+def markdown_to_html(
+    text: str,
+    *,
+    workers: int | None = None,
+    chunk_chars: int = _HTML_CHUNK_CHARS,
+) -> str:
+    """Convert markdown to HTML, across `workers` processes for large text."""
+    chunks = split_markdown_for_html(text, chunk_chars=chunk_chars)
+    pool_size = min(workers or 1, len(chunks))
+    if pool_size == 1:
+        return "\n".join(map(_convert_markdown_chunk, chunks))
+    return "\n".join(_HTML_POOL.get(pool_size).map(_convert_markdown_chunk, chunks))
+
+
+_TABLE_CHUNK_ROWS = 4096
+_ALIGN_SEPARATORS: Mapping[str | None, str] = MappingProxyType(
+    {None: "---", "left": ":---", "right": "---:", "center": ":---:"}
+)
+
+
+@dataclass(frozen=True)
+class ColumnFormat:
+    """How `add_table_columns` renders one column.
+
+    `precision` fixes the digits after the decimal point, `thousands` adds
+    "," grouping, and `align` sets the markdown column alignment.
+    """
+
+    precision: int | None = None
+    thousands: bool = False
+    align: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.align not in _ALIGN_SEPARATORS:
+            message = "align must be 'left', 'right', 'center' or None"
+            raise ValueError(message)
+        if self.precision is not None and self.precision < 0:
+            message = "precision must be zero or positive"
+            raise ValueError(message)
+
+    def printf_spec(self) -> str | None:
+        """Return the %-style spec, or None when cells need `formatter()`."""
+        if self.thousands:
+            return None
+        return f"%.{self.precision}f" if self.precision is not None else "%s"
+
+    def formatter(self) -> Callable[[object], str]:
+        spec = ("," if self.thousands else "") + (
+            f".{self.precision}f" if self.precision is not None else ""
+        )
+        # Bound str.format keeps the per-cell loop inside map() in C.
+        return f"{{:{spec}}}".format if spec else str
+
+
+_DEFAULT_COLUMN_FORMAT = ColumnFormat()
+
+
+def _column_values(column: object) -> Sequence[object]:
+    """Return a sliceable sequence for lists, array.array or NumPy arrays."""
+    to_list = getattr(column, "tolist", None)
+    if callable(to_list) and not isinstance(column, Sequence):
+        # NumPy: slicing stays a view; convert to Python scalars per chunk.
+        return cast("Sequence[object]", column)
+    if isinstance(column, Sequence) and not isinstance(column, (str, bytes)):
+        return cast("Sequence[object]", column)
+    message = f"unsupported column type {type(column).__name__}"
+    raise TypeError(message)
+
+
+def _column_chunk(
+    values: Sequence[object],
+    start: int,
+    stop: int,
+    formatter: Callable[[object], str] | None,
+) -> Sequence[object]:
+    chunk = values[start:stop]
+    to_list = getattr(chunk, "tolist", None)
+    items = cast("list[object]", to_list()) if callable(to_list) else chunk
+    if formatter is not None:
+        return list(map(formatter, items))
+    # map(type) stays in C, so numeric chunks skip the per-cell escape pass.
+    if str in set(map(type, items)):
+        return [_escape_cell(item) if isinstance(item, str) else item for item in items]
+    return items
+
+
+def _escape_cell(cell: str) -> str:
+    """Keep a CSV cell inside one markdown table cell."""
+    if "|" in cell or "\n" in cell:
+        return cell.replace("|", "\\|").replace("\r\n", " ").replace("\n", " ")
+    return cell
+
+
+def _select_csv_columns(
+    file_headers: Sequence[str] | None,
+    columns: Sequence[str | int] | None,
+    headers: Sequence[str] | None,
+    width: int | None = None,
+) -> list[int]:
+    """Resolve requested columns (names or indexes) to 0-based indexes.
+
+    `width` is the header (or first-row) width that integer indexes must fit.
+    """
+    if columns is None:
+        if file_headers is not None:
+            return list(range(len(file_headers)))
+        if headers is not None:
+            return list(range(len(headers)))
+        message = "CSV tables without a header row need columns or headers"
+        raise ValueError(message)
+    selected: list[int] = []
+    for column in columns:
+        if isinstance(column, int):
+            if column < 0 or (width is not None and column >= width):
+                message = f"CSV column {column} is out of range for {width} columns"
+                raise ValueError(message)
+            selected.append(column)
+        elif file_headers is not None and column in file_headers:
+            selected.append(list(file_headers).index(column))
+        else:
+            message = f"CSV column {column!r} not found"
+            raise ValueError(message)
+    return selected
+
+
+def _count_words(path: Path, start: int = 0) -> int:
+    """Count whitespace-separated words without loading the whole file.
+
+    `start` skips that many bytes first.
+    """
+    with path.open("rb") as raw:
+        raw.seek(start)
+        text = io.TextIOWrapper(raw, encoding="utf-8")
+        return sum(len(line.split()) for line in text)
+
+
+class _WordCounter:
+    """Count whitespace-separated words across consecutive text chunks."""
+
+    def __init__(self) -> None:
+        self.words = 0
+        self._in_word = False
+
+    def feed(self, chunk: str) -> str:
+        if chunk:
+            self.words += len(chunk.split())
+            # A word cut by the chunk boundary was counted on both sides.
+            if self._in_word and not chunk[0].isspace():
+                self.words -= 1
+            self._in_word = not chunk[-1].isspace()
+        return chunk
+
+
+def _spilled_chunks(spill_file: IO[str] | None) -> Iterator[str]:
+    if spill_file is None:
+        return
+    spill_file.flush()
+    spill_file.seek(0)
+    while chunk := spill_file.read(_SPLICE_CHUNK_SIZE):
+        yield chunk
+
+
+# Room left after a rewritten TOC so later appends can update it in place.
+_TOC_RESERVE_BYTES = 4096
+
+
+def _toc_padding(size: int) -> str:
+    """Return `size` bytes of markdown that render as nothing (a blank line)."""
+    if size <= 0:
+        return ""
+    return " " * (size - 1) + "\n"
+
+
+class _PhaseTimer:
+    """Collect wall-clock durations of the named phases of one run."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.timings[name] = round(self.timings.get(name, 0.0) + seconds, 6)
+
+    def elapsed(self) -> float:
+        return round(time.perf_counter() - self._started, 6)
+
+
 def _ctx_is_verbose(ctx: object | None) -> bool:
     """Return True if the context exposes a truthy `verbose` attribute."""
     verbose_attr: object = getattr(ctx, "verbose", False)
@@ -103,6 +492,57 @@ class MarkdownModule(Protocol):
     def markdown(self, text: str) -> str: ...
 
 
+class MarkdownSection:
+    """Detached chapter content that is merged into a builder later.
+
+    A section only records its blocks, so different sections can be filled
+    from different threads (or built in worker processes and pickled back).
+    Header numbering and TOC anchors are assigned when the parent builder
+    merges it, in the order the parent chooses.
+    """
+
+    def __init__(self, name: str | None = None) -> None:
+        self.name = name
+        self.blocks: list[tuple[str, tuple[object, ...], dict[str, object]]] = []
+
+    def _record(self, method: str, *args: object, **kwargs: object) -> None:
+        self.blocks.append((method, args, kwargs))
+
+    def add_header(self, text: str, level: int = 1) -> None:
+        if level > XClsMakeMarkdownX.HEADER_MAX_LEVEL:
+            message = (
+                f"Header level cannot exceed {XClsMakeMarkdownX.HEADER_MAX_LEVEL}."
+            )
+            raise ValueError(message)
+        self._record("add_header", text, level)
+
+    def add_paragraph(self, text: str) -> None:
+        self._record("add_paragraph", text)
+
+    def add_table(self, headers: list[str], rows: list[list[str]]) -> None:
+        self._record("add_table", list(headers), [list(row) for row in rows])
+
+    def add_image(self, alt_text: str, url: str) -> None:
+        self._record("add_image", alt_text, url)
+
+    def add_list(self, items: list[str], *, ordered: bool = False) -> None:
+        self._record("add_list", list(items), ordered=ordered)
+
+    def add_raw(self, text: str) -> None:
+        self._record("add_raw", text)
+
+    def add_csv_table(self, path: str | Path, **options: object) -> None:
+        self._record("add_csv_table", str(path), **options)
+
+    def add_table_columns(
+        self,
+        columns: Mapping[str, object],
+        *,
+        formats: Mapping[str, ColumnFormat] | None = None,
+    ) -> None:
+        self._record("add_table_columns", dict(columns), formats=formats)
+
+
 class XClsMakeMarkdownX(BaseMake):
     """A simple markdown builder with an optional PDF export step."""
 
@@ -110,7 +550,7 @@ class XClsMakeMarkdownX(BaseMake):
     WKHTMLTOPDF_ENV_VAR: str = "X_WKHTMLTOPDF_PATH"
     # Default Windows install path (used if present and env var not set)
     DEFAULT_WKHTMLTOPDF_PATH: str = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
-    HEADER_MAX_LEVEL: int = 6
+    HEADER_MAX_LEVEL: int = MAX_HEADER_LEVEL
 
     def __init__(
         self,
@@ -118,12 +558,47 @@ class XClsMakeMarkdownX(BaseMake):
         ctx: object | None = None,
         *,
         runner: CommandRunner | None = None,
+        asset_dir: str | Path | None = None,
+        asset_workers: int | None = None,
+        image_max_dimension: int | None = None,
+        memory_budget: int | None = None,
+        linter: MarkdownLinter | None = None,
+        html_workers: int | None = None,
+        export_timeout: float | None = None,
+        deadline: float | None = None,
+        section_index: bool = False,
     ) -> None:
         """Accept optional ctx for future orchestrator integration.
 
         Backwards compatible: callers that don't pass ctx behave as before.
         If ctx has a truthy `verbose` attribute this class will emit small
         informational messages to stdout to help debugging in orchestrated runs.
+
+        When `asset_dir` is given, local image paths passed to `add_image` are
+        staged into that directory during `generate()` and the references are
+        rewritten relative to its parent, which should be the output directory.
+
+        When `memory_budget` is given, buffered elements are spilled to a
+        temporary file once they exceed that many UTF-8 bytes and are spliced
+        back into the output by `write_markdown()`/`generate()`.
+
+        When `linter` is given, every added block is checked as it is rendered
+        and the findings accumulate on `linter.findings`.
+
+        When `html_workers` is given, large documents are converted to HTML
+        in chunks across that many processes, and the PDF export renders that
+        HTML instead of converting the markdown again.
+
+        `export_timeout` (seconds) bounds each PDF export and `deadline` (a
+        `time.monotonic()` value) bounds the whole run; an export gets the
+        tighter of the two. When no `runner` is given, or it is a
+        `CancellableRunner`, an overrunning export is killed and recorded as a
+        failed `ExportResult` while the markdown is kept. Other runners must
+        enforce the limit themselves.
+
+        When `section_index` is True, writing an uncompressed document also
+        writes a `<output>.idx.json` sidecar with the byte offset and length
+        of every numbered section (see `x_make_markdown_x.section_index`).
         """
         self._ctx = ctx
         self.elements: list[str] = []
@@ -131,20 +606,50 @@ class XClsMakeMarkdownX(BaseMake):
         self.section_counter: list[int] = []
         self._runner: CommandRunner | None = runner
         self._last_export_result: ExportResult | None = None
-        resolved_path: str | None
-        if wkhtmltopdf_path is None:
-            env_value = self.get_env(self.WKHTMLTOPDF_ENV_VAR)
-            env_candidate = Path(env_value) if isinstance(env_value, str) else None
-            default_candidate = Path(self.DEFAULT_WKHTMLTOPDF_PATH)
-            if env_candidate and env_candidate.is_file():
-                resolved_path = str(env_candidate)
-            elif default_candidate.is_file():
-                resolved_path = str(default_candidate)
-            else:
-                resolved_path = None
-        else:
-            resolved_path = wkhtmltopdf_path
-        self.wkhtmltopdf_path: str | None = resolved_path
+        self._last_export_seconds: float | None = None
+        self._last_uncompressed_bytes: int | None = None
+        self._last_compression: str | None = None
+        self._last_word_count: int | None = None
+        self._asset_stager: ImageAssetStager | None = (
+            ImageAssetStager(
+                Path(asset_dir),
+                max_workers=asset_workers,
+                max_dimension=image_max_dimension,
+            )
+            if asset_dir is not None
+            else None
+        )
+        self._image_refs: list[tuple[int, str, str]] = []
+        self._last_asset_report: StagingReport | None = None
+        if memory_budget is not None and memory_budget < 1:
+            message = "memory_budget must be a positive integer"
+            raise ValueError(message)
+        self.memory_budget: int | None = memory_budget
+        self._buffered_bytes = 0
+        self._prefix: list[str] = []
+        self._spill_file: IO[str] | None = None
+        self._sections: list[MarkdownSection] = []
+        self._sections_lock = threading.Lock()
+        self.linter: MarkdownLinter | None = linter
+        if html_workers is not None and html_workers < 1:
+            message = "html_workers must be a positive integer"
+            raise ValueError(message)
+        self.html_workers: int | None = html_workers
+        self.export_timeout: float | None = export_timeout
+        self.deadline: float | None = deadline
+        self.section_index = section_index
+        # (number, anchor, title, level, element index) of buffered headers,
+        # and the same with a byte offset into the spill file once spilled.
+        self._header_refs: list[tuple[str, str, str, int, int]] = []
+        self._spilled_headers: list[tuple[str, str, str, int, int]] = []
+        self._spill_bytes = 0
+        self._toc_text: str | None = None
+        self._last_index_path: Path | None = None
+        self._resumed: SectionIndex | None = None
+        self._last_append: dict[str, object] | None = None
+        self.wkhtmltopdf_path: str | None = (
+            resolve_wkhtmltopdf_path() if wkhtmltopdf_path is None else wkhtmltopdf_path
+        )
 
     def add_header(self, text: str, level: int = 1) -> None:
         """Add a header with hierarchical numbering and TOC update."""
@@ -163,47 +668,331 @@ class XClsMakeMarkdownX(BaseMake):
         header_text = f"{section_index} {text}"
 
         # Add header to elements and TOC
-        self.elements.append(f"{'#' * level} {header_text}\n")
-        self.toc.append(
-            f"{'  ' * (level - 1)}- [{header_text}]"
-            f"(#{header_text.lower().replace(' ', '-').replace('.', '')})"
-        )
+        anchor = header_text.lower().replace(" ", "-").replace(".", "")
+        self.toc.append(f"{'  ' * (level - 1)}- [{header_text}](#{anchor})")
+        if self.linter is not None:
+            self.linter.check_header(header_text, level, anchor)
+        if self.section_index:
+            self._header_refs.append(
+                (section_index, anchor, text, level, len(self.elements))
+            )
+        self._emit(f"{'#' * level} {header_text}\n")
 
     def add_paragraph(self, text: str) -> None:
         """Add a paragraph to the markdown document."""
-        self.elements.append(f"{text}\n\n")
+        if self.linter is not None:
+            self.linter.check_text(text)
+        self._emit(f"{text}\n\n")
 
-    def add_table(self, headers: list[str], rows: list[list[str]]) -> None:
+    def add_table(self, headers: Sequence[str], rows: Sequence[Sequence[str]]) -> None:
         """Add a table to the markdown document."""
+        if self.linter is not None:
+            self.linter.check_table(headers, rows)
         header_row = " | ".join(headers)
         separator_row = " | ".join(["---"] * len(headers))
         data_rows = "\n".join([" | ".join(row) for row in rows])
-        self.elements.append(f"{header_row}\n{separator_row}\n{data_rows}\n\n")
+        self._emit(f"{header_row}\n{separator_row}\n{data_rows}\n\n")
+
+    def add_csv_table(
+        self,
+        path: str | Path,
+        *,
+        delimiter: str | None = None,
+        columns: Sequence[str | int] | None = None,
+        limit: int | None = None,
+        header: bool = True,
+        headers: Sequence[str] | None = None,
+    ) -> None:
+        """Stream a table from a CSV/TSV file into the document.
+
+        Rows are read and emitted in chunks, so a large file never sits in
+        memory as a whole (and spills under `memory_budget`). `columns` picks
+        columns by header name or 0-based index; `limit` caps the data rows.
+        Without a header row, pass `headers` or columns are named by index.
+        """
+        csv_path = Path(path)
+        if delimiter is None:
+            delimiter = "\t" if csv_path.suffix.lower() in {".tsv", ".tab"} else ","
+        with csv_path.open("r", encoding="utf-8", newline="") as handle:
+            reader = csv.reader(handle, delimiter=delimiter)
+            file_headers = next(reader, None) if header else None
+            if file_headers is not None:
+                width: int | None = len(file_headers)
+                rows: Iterator[list[str]] = reader
+            else:
+                first_row = next(reader, None)
+                width = len(first_row) if first_row is not None else None
+                rows = chain([first_row] if first_row is not None else [], reader)
+            selected = _select_csv_columns(file_headers, columns, headers, width)
+            table_headers = list(headers) if headers is not None else None
+            if table_headers is None:
+                table_headers = (
+                    [file_headers[index] for index in selected]
+                    if file_headers is not None
+                    else [str(index) for index in selected]
+                )
+            if not table_headers:
+                message = f"CSV table {csv_path} has no columns"
+                raise ValueError(message)
+            self._stream_csv_rows(rows, table_headers, selected, width, limit)
+
+    def _stream_csv_rows(
+        self,
+        reader: Iterator[list[str]],
+        headers: list[str],
+        selected: Sequence[int],
+        width: int | None,
+        limit: int | None,
+    ) -> None:
+        header_row = " | ".join(map(_escape_cell, headers))
+        self._emit(f"{header_row}\n{' | '.join(['---'] * len(headers))}\n")
+        needed = max(selected, default=-1) + 1
+        mismatched: list[int] = []
+        chunk: list[str] = []
+        for row_number, row in enumerate(reader, start=1):
+            if limit is not None and row_number > limit:
+                break
+            if width is None:
+                width = len(row)
+            if len(row) != width:
+                mismatched.append(row_number)
+            if len(row) < needed:
+                row = [*row, *([""] * (needed - len(row)))]
+            chunk.append(" | ".join([_escape_cell(row[index]) for index in selected]))
+            if len(chunk) >= _TABLE_CHUNK_ROWS:
+                self._emit("\n".join(chunk) + "\n")
+                chunk = []
+        if chunk:
+            self._emit("\n".join(chunk) + "\n")
+        self._emit("\n")
+        if self.linter is not None:
+            self.linter.check_table_shape(width or len(headers), mismatched)
+
+    def add_table_columns(
+        self,
+        columns: Mapping[str, object],
+        *,
+        formats: Mapping[str, ColumnFormat] | None = None,
+    ) -> None:
+        """Add a table from column-oriented data.
+
+        Each value in `columns` may be a sequence, an `array.array` or a NumPy
+        array. Cells are formatted a column and a chunk at a time with the
+        column's `ColumnFormat`, and rows are joined without per-cell Python
+        code, which keeps million-row numeric tables fast.
+        """
+        headers = list(columns)
+        if not headers:
+            message = "add_table_columns needs at least one column"
+            raise ValueError(message)
+        values = [_column_values(columns[name]) for name in headers]
+        lengths = {len(column) for column in values}
+        if len(lengths) != 1:
+            message = f"columns must have equal lengths, got {sorted(lengths)}"
+            raise ValueError(message)
+        row_count = lengths.pop()
+        column_formats = [
+            (formats or {}).get(name, _DEFAULT_COLUMN_FORMAT) for name in headers
+        ]
+        # One %-template formats and joins a whole chunk of rows in a single
+        # C-level call; only thousands grouping needs a per-column pre-pass.
+        specs = [column_format.printf_spec() for column_format in column_formats]
+        formatters = [
+            None if spec is not None else column_format.formatter()
+            for spec, column_format in zip(specs, column_formats, strict=True)
+        ]
+        row_template = " | ".join(spec or "%s" for spec in specs) + "\n"
+        separator_row = " | ".join(
+            _ALIGN_SEPARATORS[column_format.align] for column_format in column_formats
+        )
+        header_row = " | ".join(map(_escape_cell, headers))
+        self._emit(f"{header_row}\n{separator_row}\n")
+        for start in range(0, row_count, _TABLE_CHUNK_ROWS):
+            stop = min(start + _TABLE_CHUNK_ROWS, row_count)
+            chunk = [
+                _column_chunk(column, start, stop, formatter)
+                for column, formatter in zip(values, formatters, strict=True)
+            ]
+            cells = tuple(chain.from_iterable(zip(*chunk, strict=True)))
+            self._emit(row_template * (stop - start) % cells)
+        self._emit("\n")
+        if self.linter is not None:
+            self.linter.check_table_shape(len(headers), [])
 
     def add_image(self, alt_text: str, url: str) -> None:
         """Add an image to the markdown document."""
-        self.elements.append(f"![{alt_text}]({url})\n\n")
+        if self.linter is not None:
+            self.linter.check_image(alt_text, url)
+        if self._asset_stager is not None:
+            self._image_refs.append((len(self.elements), alt_text, url))
+        self._emit(f"![{alt_text}]({url})\n\n")
 
-    def add_list(self, items: list[str], *, ordered: bool = False) -> None:
+    def add_list(self, items: Sequence[str], *, ordered: bool = False) -> None:
         """Add a list to the markdown document."""
+        if self.linter is not None:
+            self.linter.check_text("\n".join(items))
         if ordered:
-            self.elements.extend([f"{i + 1}. {item}" for i, item in enumerate(items)])
+            self._emit(*[f"{i + 1}. {item}" for i, item in enumerate(items)], "\n")
         else:
-            self.elements.extend([f"- {item}" for item in items])
-        self.elements.append("\n")
+            self._emit(*[f"- {item}" for item in items], "\n")
+
+    def add_raw(self, text: str) -> None:
+        """Add pre-rendered markdown verbatim."""
+        if self.linter is not None:
+            self.linter.check_text(text)
+        self._emit(f"{text}\n")
+
+    def new_section(self, name: str | None = None) -> MarkdownSection:
+        """Reserve the next section slot; `merge_sections()` keeps this order."""
+        section = MarkdownSection(name)
+        with self._sections_lock:
+            self._sections.append(section)
+        return section
+
+    def merge_sections(self, sections: Iterable[MarkdownSection] | None = None) -> None:
+        """Append sections in order, numbering their headers as they land.
+
+        Without an argument, the sections reserved by `new_section()` are
+        merged in reservation order regardless of when each was filled.
+        """
+        if sections is None:
+            with self._sections_lock:
+                pending, self._sections = self._sections, []
+        else:
+            pending = list(sections)
+        for section in pending:
+            for method, args, kwargs in section.blocks:
+                getattr(self, method)(*args, **kwargs)
 
     def add_toc(self) -> None:
-        """Add a table of contents (TOC) to the top of the document."""
-        self.elements = ["\n".join(self.toc) + "\n\n", *self.elements]
+        """Add a table of contents (TOC) to the top of the document.
+
+        On a resumed document this only asks `append_markdown()` for a TOC;
+        one the document already has is refreshed regardless.
+        """
+        toc_text = "\n".join(self.toc) + "\n\n"
+        self._toc_text = toc_text
+        if self._resumed is not None:
+            return
+        if self._spill_file is not None:
+            # Spilled content precedes the buffer, so the TOC goes before both.
+            self._prefix.insert(0, toc_text)
+            return
+        self.elements = [toc_text, *self.elements]
+        self._image_refs = [
+            (index + 1, alt_text, url) for index, alt_text, url in self._image_refs
+        ]
+        self._header_refs = [(*ref[:4], ref[4] + 1) for ref in self._header_refs]
+
+    def _emit(self, *parts: str) -> None:
+        self.elements.extend(parts)
+        if self.memory_budget is None:
+            return
+        self._buffered_bytes += sum(map(_byte_len, parts))
+        if self._buffered_bytes > self.memory_budget:
+            self._spill()
+
+    def _spill(self) -> None:
+        """Move buffered elements to the spill file and empty the buffer."""
+        self.stage_image_assets()
+        if self._spill_file is None:
+            # Held open across calls; close() owns and releases the handle.
+            self._spill_file = tempfile.TemporaryFile(  # noqa: SIM115
+                mode="w+",
+                encoding="utf-8",
+                prefix="x_make_markdown_",
+                newline=self._newline(),
+            )
+        if self.section_index:
+            located, self._spill_bytes = self._locate_buffered_headers(
+                self._spill_bytes
+            )
+            self._spilled_headers.extend(located)
+            self._header_refs = []
+        self._spill_file.writelines(self.elements)
+        self.elements = []
+        self._buffered_bytes = 0
+
+    def _locate_buffered_headers(
+        self, base: int
+    ) -> tuple[list[tuple[str, str, str, int, int]], int]:
+        """Return buffered headers with byte offsets from `base`, and the end."""
+        wanted = {ref[4]: ref for ref in self._header_refs}
+        located: list[tuple[str, str, str, int, int]] = []
+        position = base
+        for index, element in enumerate(self.elements):
+            ref = wanted.get(index)
+            if ref is not None:
+                located.append((*ref[:4], position))
+            position += _byte_len(element)
+        return located, position
+
+    def _write_section_index(
+        self,
+        output_path: Path,
+        *,
+        base: int = 0,
+        carried: Iterable[tuple[str, str, str, int, int]] = (),
+        toc_length: int | None = None,
+    ) -> Path:
+        prefix_bytes = base + sum(map(_byte_len, self._prefix))
+        buffered, total = self._locate_buffered_headers(
+            prefix_bytes + self._spill_bytes
+        )
+        headers = list(carried)
+        headers.extend(
+            (*ref[:4], ref[4] + prefix_bytes) for ref in self._spilled_headers
+        )
+        headers.extend(buffered)
+        if toc_length is None and self._toc_text is not None:
+            toc_length = _byte_len(self._toc_text)
+        toc = None if toc_length is None else (0, toc_length)
+        index = SectionIndex(
+            output_path, build_entries(headers, total), total_bytes=total, toc=toc
+        )
+        return index.write()
+
+    def has_spilled(self) -> bool:
+        return self._spill_file is not None
+
+    def close(self) -> None:
+        """Release the spill file; spilled content is discarded."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def stage_image_assets(self) -> StagingReport | None:
+        """Stage pending local images and point their references at the copies."""
+        stager = self._asset_stager
+        if stager is None or not self._image_refs:
+            return None
+        # Relative references mean the same thing before and after staging:
+        # both resolve against the output directory, the asset dir's parent.
+        base_dir = stager.asset_dir.parent
+        local_refs: list[tuple[int, str, Path]] = []
+        for index, alt_text, url in self._image_refs:
+            source = local_image_path(url, base_dir=base_dir)
+            if source is not None:
+                local_refs.append((index, alt_text, source))
+        self._image_refs = []
+        report = stager.stage(source for _, _, source in local_refs)
+        for index, alt_text, source in local_refs:
+            staged = report.staged[source.resolve()].staged_path
+            relative = Path(_os.path.relpath(staged, base_dir)).as_posix()
+            self.elements[index] = f"![{alt_text}]({relative})\n\n"
+        previous = self._last_asset_report
+        # Once spilled, the document is staged in passes; report them all.
+        self._last_asset_report = (
+            previous.merge(report)
+            if self._spill_file is not None and previous is not None
+            else report
+        )
+        return report
 
     def to_html(self, text: str) -> str:
         """Convert markdown text to HTML using python-markdown."""
         try:
-            markdown_module = cast(
-                "MarkdownModule",
-                importlib.import_module("markdown"),
-            )
-            return markdown_module.markdown(text or "")
+            return markdown_to_html(text or "", workers=self.html_workers)
         except (ModuleNotFoundError, AttributeError, TypeError, ValueError):
             # Minimal fallback: return plain text wrapped in <pre> to preserve content
             escaped = (text or "").replace("<", "&lt;").replace(">", "&gt;")
@@ -219,56 +1008,329 @@ class XClsMakeMarkdownX(BaseMake):
             raise RuntimeError(message)
         pdf_path = Path(out_path)
         export_dir = pdf_path.parent
+        runner, budget = self._export_runner()
         result: ExportResult = export_html_to_pdf(
             html_str,
             output_dir=export_dir,
             stem=pdf_path.stem,
             wkhtmltopdf_path=self.wkhtmltopdf_path,
-            runner=self._runner,
+            runner=runner,
             keep_html=False,
         )
+        result = _timed_out_export(result, runner, budget)
         self._last_export_result = result
         if not result.succeeded:
             detail = result.detail or "wkhtmltopdf execution failed"
             raise RuntimeError(detail)
 
-    def generate(self, output_file: str = "example.md") -> str:
+    def write_markdown(
+        self,
+        output_file: str = "example.md",
+        *,
+        compression: str | None = None,
+        count_words: bool = False,
+    ) -> Path:
+        """Save the markdown to a file without rendering a PDF.
+
+        Unlike `generate()`, this never materialises spilled content in memory.
+        A ".gz"/".xz" suffix (or `compression`) compresses while writing.
+        With `count_words`, words are counted as the text streams out (see
+        `get_last_word_count()`), at the cost of the kernel-side splice.
+        """
+        self.stage_image_assets()
+        output_path = Path(output_file)
+        codec = resolve_compression(output_path, compression)
+        self._last_word_count = None
+        with open_markdown(output_path, "w", codec, self._newline()) as handle:
+            if count_words:
+                counter = _WordCounter()
+                for chunk in chain(
+                    self._prefix, _spilled_chunks(self._spill_file), self.elements
+                ):
+                    handle.write(counter.feed(chunk))
+                self._last_word_count = counter.words
+            else:
+                handle.writelines(self._prefix)
+                if self._spill_file is not None:
+                    _splice_file(self._spill_file, handle, kernel_copy=codec is None)
+                handle.writelines(self.elements)
+            self._record_write(handle, codec)
+        self._record_index(output_path, codec)
+        return output_path
+
+    def _newline(self) -> str | None:
+        # Byte offsets in the section index assume "\n" is written as is.
+        return "" if self.section_index else None
+
+    def _record_index(self, output_path: Path, compression: str | None) -> None:
+        self._last_index_path = (
+            self._write_section_index(output_path)
+            if self.section_index and compression is None
+            else None
+        )
+
+    def _record_write(self, handle: IO[str], compression: str | None) -> None:
+        handle.flush()
+        buffer = getattr(handle, "buffer", None)
+        # Compressed streams report the uncompressed position from tell().
+        self._last_uncompressed_bytes = (
+            int(buffer.tell()) if buffer is not None else None
+        )
+        self._last_compression = compression
+
+    def generate(
+        self,
+        output_file: str = "example.md",
+        *,
+        compression: str | None = None,
+    ) -> str:
         """Generate markdown and save it to a file; optionally render a PDF."""
-        markdown_content = "".join(self.elements)
         output_path = Path(output_file)
-        output_path.write_text(markdown_content, encoding="utf-8")
+        codec = resolve_compression(output_path, compression)
+        if self._spill_file is None:
+            self.stage_image_assets()
+            markdown_content = "".join(self.elements)
+            with open_markdown(output_path, "w", codec, self._newline()) as handle:
+                handle.write(markdown_content)
+                self._record_write(handle, codec)
+            self._record_index(output_path, codec)
+        else:
+            # The returned text needs the whole document; read it back once.
+            self.write_markdown(output_file, compression=codec or "none")
+            with open_markdown(output_path, "r", codec) as handle:
+                markdown_content = handle.read()
 
         if _ctx_is_verbose(self._ctx):
-            _info(f"[markdown] wrote markdown to {output_file}")
+            _info(
+                f"[markdown] wrote markdown to {output_file}",
+                document=str(output_file),
+                bytes=self._last_uncompressed_bytes,
+            )
 
-        # Convert to PDF if wkhtmltopdf_path is configured
+        self._export_pdf(markdown_content, output_path)
+        return markdown_content
+
+    def _export_pdf(self, markdown_content: str, output_path: Path) -> None:
+        """Convert to PDF if wkhtmltopdf_path is configured."""
+        self._last_export_seconds = None
         if self.wkhtmltopdf_path:
-            result = export_markdown_to_pdf(
-                markdown_content,
-                output_dir=output_path.parent,
-                stem=output_path.stem,
-                wkhtmltopdf_path=self.wkhtmltopdf_path,
-                runner=self._runner,
-                keep_html=False,
-            )
+            export_started = time.perf_counter()
+            runner, budget = self._export_runner()
+            if self.html_workers is None:
+                result = export_markdown_to_pdf(
+                    markdown_content,
+                    output_dir=output_path.parent,
+                    stem=markdown_stem(output_path),
+                    wkhtmltopdf_path=self.wkhtmltopdf_path,
+                    runner=runner,
+                    keep_html=False,
+                )
+            else:
+                result = export_html_to_pdf(
+                    self.to_html(markdown_content),
+                    output_dir=output_path.parent,
+                    stem=markdown_stem(output_path),
+                    wkhtmltopdf_path=self.wkhtmltopdf_path,
+                    runner=runner,
+                    keep_html=False,
+                )
+            self._last_export_seconds = time.perf_counter() - export_started
+            result = _timed_out_export(result, runner, budget)
             self._last_export_result = result
-            if not result.succeeded:
+            # A timed-out export is reported, not raised: the markdown stands.
+            if not result.succeeded and not _is_timed_out(runner):
                 detail = result.detail or "Failed to render markdown to PDF"
                 raise RuntimeError(detail)
         else:
             self._last_export_result = None
 
-        return markdown_content
+    def resume(self, output_file: str | Path) -> None:
+        """Continue a document previously written with `section_index=True`.
+
+        Numbering and TOC entries are recovered from the sidecar index, so
+        blocks added afterwards continue where the document left off and
+        `append_markdown()` writes only them.
+        """
+        output_path = Path(output_file)
+        index = SectionIndex.load(output_path)
+        if output_path.stat().st_size != index.total_bytes:
+            message = f"{output_path.name} changed since it was indexed"
+            raise ValueError(message)
+        self.section_index = True
+        self._resumed = index
+        self._toc_text = None
+        self.toc = [
+            f"{'  ' * (entry.level - 1)}- [{entry.number} {entry.title}]"
+            f"(#{entry.anchor})"
+            for entry in index.sections
+        ]
+        if index.sections:
+            self.section_counter = [
+                int(part) for part in index.sections[-1].number.split(".")
+            ]
+
+    def append_markdown(self, output_file: str | Path) -> Path:
+        """Append the blocks added since `resume()` and refresh the TOC.
+
+        The new blocks are appended first, then the TOC is updated in place
+        when it still fits its old span (padded with a whitespace-only line).
+        A TOC that outgrows its span, or is added by `add_toc()` to a
+        document without one, is written with the appended blocks in a
+        single file swap, with room reserved for later appends. The body is
+        never re-rendered.
+        """
+        index = self._resumed
+        if index is None:
+            message = "append_markdown() needs resume() first"
+            raise RuntimeError(message)
+        self.stage_image_assets()
+        output_path = Path(output_file)
+        old_span = index.toc[1] if index.toc is not None else None
+        toc_span = old_span
+        new_toc = "\n".join(self.toc) + "\n\n"
+        rewritten = (old_span is None and self._toc_text is not None) or (
+            old_span is not None and _byte_len(new_toc) > old_span
+        )
+        if rewritten:
+            toc_span = _byte_len(new_toc) + _TOC_RESERVE_BYTES
+            _rewrite_toc(
+                output_path, new_toc, old_span or 0, toc_span, self._write_appended
+            )
+        else:
+            with output_path.open("a", encoding="utf-8", newline="") as handle:
+                self._write_appended(handle)
+            if old_span is not None:
+                with output_path.open("r+b") as handle:
+                    padding = _toc_padding(old_span - _byte_len(new_toc))
+                    handle.write((new_toc + padding).encode("utf-8"))
+        delta = (toc_span or 0) - (old_span or 0)
+        base = index.total_bytes + delta
+        carried = [
+            (entry.number, entry.anchor, entry.title, entry.level, entry.offset + delta)
+            for entry in index.sections
+        ]
+        self._last_index_path = self._write_section_index(
+            output_path, base=base, carried=carried, toc_length=toc_span
+        )
+        self._last_append = {
+            "previous_bytes": index.total_bytes,
+            "appended_offset": base,
+            "toc_rewritten": rewritten,
+        }
+        self._resumed = None
+        return output_path
+
+    def _write_appended(self, handle: IO[str]) -> None:
+        if self._spill_file is not None:
+            _splice_file(self._spill_file, handle)
+        handle.writelines(self.elements)
+        self._record_write(handle, None)
+
+    def export_written_pdf(self, output_file: str | Path) -> None:
+        """Render the PDF of a Markdown file already on disk.
+
+        Used after `append_markdown()`, whose PDF must cover the whole
+        document rather than the appended blocks.
+        """
+        output_path = Path(output_file)
+        self._export_pdf(output_path.read_text(encoding="utf-8"), output_path)
+
+    def has_resumed(self) -> bool:
+        return self._resumed is not None
+
+    def get_last_append_info(self) -> dict[str, object] | None:
+        return self._last_append
+
+    def remaining_budget(self) -> float | None:
+        """Return the seconds the next export may take, or None when unbounded."""
+        budgets = [] if self.export_timeout is None else [self.export_timeout]
+        if self.deadline is not None:
+            budgets.append(self.deadline - time.monotonic())
+        return min(budgets) if budgets else None
+
+    def _export_runner(self) -> tuple[CommandRunner | None, float | None]:
+        budget = self.remaining_budget()
+        if budget is None:
+            return self._runner, None
+        if self._runner is None:
+            return CancellableRunner(timeout=budget), budget
+        if isinstance(self._runner, CancellableRunner):
+            return self._runner.with_timeout(budget), budget
+        return self._runner, budget
 
     def get_last_export_result(self) -> ExportResult | None:
         return self._last_export_result
 
+    def get_last_asset_report(self) -> StagingReport | None:
+        return self._last_asset_report
+
+    def get_last_export_seconds(self) -> float | None:
+        return self._last_export_seconds
+
+    def get_last_index_path(self) -> Path | None:
+        return self._last_index_path
+
+    def get_last_word_count(self) -> int | None:
+        """Return the words counted by the last `write_markdown(count_words=True)`."""
+        return self._last_word_count
+
+    def get_last_write_info(self) -> tuple[int | None, str | None]:
+        """Return (uncompressed bytes, compression) of the last write."""
+        return self._last_uncompressed_bytes, self._last_compression
 
-def _failure_payload(
+
+def _rewrite_toc(
+    output_path: Path,
+    toc_text: str,
+    old_span: int,
+    span: int,
+    append: Callable[[IO[str]], None],
+) -> None:
+    """Swap in a copy with a new TOC padded to `span` bytes and `append`ed text.
+
+    The original stays untouched until the copy is complete.
+    """
+    staging = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with (
+            output_path.open("rb") as source,
+            staging.open("w", encoding="utf-8", newline="") as target,
+        ):
+            target.write(toc_text + _toc_padding(span - _byte_len(toc_text)))
+            target.flush()
+            source.seek(old_span)
+            shutil.copyfileobj(source, target.buffer, _SPLICE_CHUNK_SIZE)
+            target.buffer.flush()
+            append(target)
+    except BaseException:
+        staging.unlink(missing_ok=True)
+        raise
+    staging.replace(output_path)
+
+
+def _is_timed_out(runner: CommandRunner | None) -> bool:
+    return isinstance(runner, CancellableRunner) and runner.timed_out
+
+
+def _timed_out_export(
+    result: ExportResult, runner: CommandRunner | None, budget: float | None
+) -> ExportResult:
+    """Mark `result` failed with a clear detail when its export was killed."""
+    if not _is_timed_out(runner):
+        return result
+    if budget is not None and budget <= 0:
+        detail = "PDF export skipped: the deadline had already passed"
+    else:
+        detail = f"PDF export exceeded its {budget:.3g}s budget and was killed"
+    return replace(result, succeeded=False, output_path=None, detail=detail)
+
+
+def failure_payload(
     message: str,
     *,
     details: Mapping[str, object] | None = None,
 ) -> dict[str, object]:
+    """Build an ERROR_SCHEMA failure result."""
     payload: dict[str, object] = {
         "status": "failure",
         "message": message,
@@ -328,6 +1390,32 @@ def _coerce_bool(value: object, *, default: bool = False) -> bool:
     return default
 
 
+def _render_csv_table(
+    builder: XClsMakeMarkdownX,
+    block_map: Mapping[str, object],
+) -> None:
+    columns_obj = block_map.get("columns")
+    columns: list[str | int] | None = None
+    if isinstance(columns_obj, Sequence) and not isinstance(columns_obj, str):
+        columns = [
+            item if isinstance(item, int) else str(item)
+            for item in cast("Sequence[object]", columns_obj)
+        ]
+    limit_obj = block_map.get("limit")
+    delimiter_obj = block_map.get("delimiter")
+    headers_obj = block_map.get("headers")
+    builder.add_csv_table(
+        _stringify(block_map.get("path")),
+        delimiter=delimiter_obj if isinstance(delimiter_obj, str) else None,
+        columns=columns,
+        limit=_coerce_int(limit_obj) if limit_obj is not None else None,
+        header=_coerce_bool(block_map.get("header"), default=True),
+        headers=(
+            _coerce_str_sequence(headers_obj) if headers_obj is not None else None
+        ),
+    )
+
+
 def _render_blocks(
     builder: XClsMakeMarkdownX,
     blocks: Sequence[object],
@@ -365,13 +1453,15 @@ def _render_blocks(
                 ordered=_coerce_bool(block_map.get("ordered"), default=False),
             )
         elif kind == "raw":
-            builder.elements.append(f"{_stringify(block_map.get('text'))}\n")
+            builder.add_raw(_stringify(block_map.get("text")))
+        elif kind == "csv_table":
+            _render_csv_table(builder, block_map)
         else:
             continue
     return {"blocks": processed, "headers": headers}
 
 
-def _resolve_wkhtmltopdf_path(candidate: object) -> str | None:
+def _existing_file(candidate: object) -> str | None:
     if isinstance(candidate, str) and candidate:
         path = Path(candidate)
         if path.is_file():
@@ -379,12 +1469,26 @@ def _resolve_wkhtmltopdf_path(candidate: object) -> str | None:
     return None
 
 
+def resolve_wkhtmltopdf_path(candidate: object = None) -> str | None:
+    """Return the wkhtmltopdf binary an export would use, or None.
+
+    An existing `candidate` wins; otherwise the `X_WKHTMLTOPDF_PATH`
+    environment variable and then the default install location are tried.
+    """
+    return (
+        _existing_file(candidate)
+        or _existing_file(BaseMake.get_env(XClsMakeMarkdownX.WKHTMLTOPDF_ENV_VAR))
+        or _existing_file(XClsMakeMarkdownX.DEFAULT_WKHTMLTOPDF_PATH)
+    )
+
+
 def _validate_input_schema(payload: Mapping[str, object]) -> dict[str, object] | None:
     try:
-        validate_payload(payload, INPUT_SCHEMA)
+        # jsonschema only treats dict as "object"; CLI payloads are read-only proxies.
+        validate_payload(dict(payload), INPUT_SCHEMA)
     except ValidationErrorType as exc:
         error = exc
-        return _failure_payload(
+        return failure_payload(
             "input payload failed validation",
             details={
                 "error": error.message,
@@ -409,26 +1513,145 @@ def _resolve_output_markdown(
     output_markdown_obj = parameters.get("output_markdown")
     if isinstance(output_markdown_obj, str) and output_markdown_obj:
         return Path(output_markdown_obj)
-    return _failure_payload(
+    return failure_payload(
         "output_markdown is required",
         details={"field": "output_markdown"},
     )
 
 
+def _asset_options(
+    parameters: Mapping[str, object],
+    output_path: Path,
+) -> dict[str, object]:
+    if not _coerce_bool(parameters.get("stage_images"), default=False):
+        return {}
+    options: dict[str, object] = {
+        "asset_dir": output_path.parent / f"{output_path.stem}_assets",
+    }
+    workers = _coerce_int(parameters.get("asset_workers"), default=0)
+    if workers > 0:
+        options["asset_workers"] = workers
+    max_dimension = _coerce_int(parameters.get("image_max_dimension"), default=0)
+    if max_dimension > 0:
+        options["image_max_dimension"] = max_dimension
+    return options
+
+
+def _lint_options(parameters: Mapping[str, object]) -> Mapping[str, object] | None:
+    lint_obj = parameters.get("lint")
+    if isinstance(lint_obj, Mapping):
+        typed_lint = cast("Mapping[str, object]", lint_obj)
+        if _coerce_bool(typed_lint.get("enabled"), default=True):
+            return typed_lint
+    return None
+
+
+def _lint_failure(builder: XClsMakeMarkdownX, fail_on: str) -> dict[str, object]:
+    linter = builder.linter
+    return failure_payload(
+        f"lint findings at or above {fail_on!r} severity",
+        details={"lint": linter.to_metadata() if linter else {}},
+    )
+
+
+def _positive_seconds(value: object) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        return None
+    return float(value)
+
+
+def export_budget(parameters: Mapping[str, object]) -> float | None:
+    """Return the seconds one PDF export of a payload may take, or None."""
+    budgets = [
+        budget
+        for budget in (
+            _positive_seconds(parameters.get("export_timeout_seconds")),
+            _positive_seconds(parameters.get("deadline_seconds")),
+        )
+        if budget is not None
+    ]
+    return min(budgets) if budgets else None
+
+
+def _deadline_passed(deadline: float | None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _deadline_failure(phase: str, budget: float | None) -> dict[str, object]:
+    return failure_payload(
+        "deadline exceeded",
+        details={"phase": phase, "budget_seconds": budget},
+    )
+
+
+def _run_deadline(
+    parameters: Mapping[str, object], deadline_seconds: float | None
+) -> tuple[float | None, float | None]:
+    """Return (budget seconds, monotonic deadline) from the payload and caller."""
+    budgets = [
+        budget
+        for budget in (
+            _positive_seconds(parameters.get("deadline_seconds")),
+            _positive_seconds(deadline_seconds),
+        )
+        if budget is not None
+    ]
+    if not budgets:
+        return None, None
+    budget = min(budgets)
+    return budget, time.monotonic() + budget
+
+
 def _configure_builder(
     parameters: Mapping[str, object],
     *,
+    output_path: Path,
     ctx: object | None = None,
+    runner: CommandRunner | None = None,
+    deadline: float | None = None,
 ) -> tuple[XClsMakeMarkdownX, list[str]]:
     export_pdf = bool(parameters.get("export_pdf", False))
     wkhtmltopdf_candidate = parameters.get("wkhtmltopdf_path") if export_pdf else None
-    wkhtmltopdf_path = _resolve_wkhtmltopdf_path(wkhtmltopdf_candidate)
+    wkhtmltopdf_path = _existing_file(wkhtmltopdf_candidate)
     messages: list[str] = []
     if export_pdf and wkhtmltopdf_candidate and wkhtmltopdf_path is None:
         messages.append(
             f"wkhtmltopdf not found at {wkhtmltopdf_candidate}; skipped PDF export"
         )
-    builder = XClsMakeMarkdownX(wkhtmltopdf_path=wkhtmltopdf_path, ctx=ctx)
+    asset_options = _asset_options(parameters, output_path)
+    memory_budget = _coerce_int(parameters.get("memory_budget_bytes"), default=0)
+    lint_options = _lint_options(parameters)
+    html_workers = _coerce_int(parameters.get("html_workers"), default=0)
+    export_timeout = _positive_seconds(parameters.get("export_timeout_seconds"))
+    builder = XClsMakeMarkdownX(
+        # "" rather than None: without export_pdf, never fall back to the env.
+        wkhtmltopdf_path=wkhtmltopdf_path if export_pdf else "",
+        ctx=ctx,
+        runner=runner,
+        asset_dir=cast("Path | None", asset_options.get("asset_dir")),
+        asset_workers=cast("int | None", asset_options.get("asset_workers")),
+        image_max_dimension=cast(
+            "int | None", asset_options.get("image_max_dimension")
+        ),
+        memory_budget=memory_budget if memory_budget > 0 else None,
+        linter=(
+            MarkdownLinter(
+                max_line_length=_coerce_int(
+                    lint_options.get("max_line_length"),
+                    default=DEFAULT_MAX_LINE_LENGTH,
+                )
+            )
+            if lint_options is not None
+            else None
+        ),
+        html_workers=html_workers if html_workers > 0 else None,
+        export_timeout=export_timeout,
+        deadline=deadline,
+        # Append mode resumes from the index, so every write keeps one.
+        section_index=bool(
+            parameters.get("section_index", False) or parameters.get("append", False)
+        ),
+    )
     return builder, messages
 
 
@@ -453,8 +1676,45 @@ def _include_toc(document: Mapping[str, object]) -> bool:
     return bool(document.get("include_toc", False))
 
 
+def _compression_option(parameters: Mapping[str, object]) -> str | None:
+    compression_obj = parameters.get("compression")
+    return compression_obj if isinstance(compression_obj, str) else None
+
+
+def _write_document(
+    builder: XClsMakeMarkdownX,
+    output_path: Path,
+    compression: str | None = None,
+) -> int:
+    """Write the document and return its word count.
+
+    A builder that spilled to disk and has no PDF to render is written and
+    counted in a streaming fashion so the memory budget still holds.
+    """
+    try:
+        if builder.has_resumed():
+            builder.append_markdown(output_path)
+            append_info = builder.get_last_append_info() or {}
+            if builder.wkhtmltopdf_path:
+                builder.export_written_pdf(output_path)
+            return _count_words(
+                output_path, start=cast("int", append_info["appended_offset"])
+            )
+        if builder.has_spilled() and not builder.wkhtmltopdf_path:
+            builder.write_markdown(
+                str(output_path), compression=compression, count_words=True
+            )
+            return builder.get_last_word_count() or 0
+        markdown_text = builder.generate(
+            output_file=str(output_path), compression=compression
+        )
+        return len(markdown_text.split())
+    finally:
+        builder.close()
+
+
 def _markdown_generation_failure(exc: Exception) -> dict[str, object]:
-    return _failure_payload(
+    return failure_payload(
         "markdown generation failed",
         details={
             "type": type(exc).__name__,
@@ -471,7 +1731,17 @@ def _build_artifact(
         "path": str(output_path),
         "bytes": output_path.stat().st_size,
     }
+    uncompressed_bytes, compression = builder.get_last_write_info()
+    if compression is not None:
+        artifact["compression"] = compression
+        if uncompressed_bytes is not None:
+            artifact["uncompressed_bytes"] = uncompressed_bytes
     messages: list[str] = []
+    index_path = builder.get_last_index_path()
+    if index_path is not None:
+        artifact["section_index"] = str(index_path)
+    elif builder.section_index:
+        messages.append("section index skipped: byte offsets need uncompressed output")
     export_result = builder.get_last_export_result()
     if export_result is not None:
         artifact["pdf"] = export_result.to_metadata()
@@ -481,16 +1751,21 @@ def _build_artifact(
 
 
 def _build_summary(
-    markdown_text: str,
+    word_count: int,
     block_summary: Mapping[str, int],
-    parameters: Mapping[str, object],
+    metadata_obj: object,
+    builder: XClsMakeMarkdownX,
 ) -> dict[str, object]:
     summary: dict[str, object] = {
         "blocks": int(block_summary.get("blocks", 0)),
         "headers": int(block_summary.get("headers", 0)),
-        "words": len(markdown_text.split()),
+        "words": word_count,
     }
-    metadata_obj = parameters.get("metadata")
+    asset_report = builder.get_last_asset_report()
+    if asset_report is not None:
+        summary["assets"] = asset_report.to_metadata()
+    if builder.linter is not None:
+        summary["lint"] = builder.linter.to_metadata()
     if isinstance(metadata_obj, Mapping):
         typed_metadata = cast("Mapping[str, object]", metadata_obj)
         summary["metadata"] = dict(typed_metadata)
@@ -519,7 +1794,7 @@ def _validate_output_schema(result: Mapping[str, object]) -> dict[str, object] |
         validate_payload(result, OUTPUT_SCHEMA)
     except ValidationErrorType as exc:
         error = exc
-        return _failure_payload(
+        return failure_payload(
             "generated output failed schema validation",
             details={
                 "error": error.message,
@@ -530,14 +1805,76 @@ def _validate_output_schema(result: Mapping[str, object]) -> dict[str, object] |
     return None
 
 
-def main_json(
+def _document_class(parameters: Mapping[str, object]) -> str:
+    metadata_obj = parameters.get("metadata")
+    if isinstance(metadata_obj, Mapping):
+        typed_metadata = cast("Mapping[str, object]", metadata_obj)
+        class_obj = typed_metadata.get("document_class")
+        if isinstance(class_obj, str) and class_obj:
+            return class_obj
+    return DEFAULT_DOCUMENT_CLASS
+
+
+def _record_run_history(
+    history_path: str | Path,
+    payload: Mapping[str, object],
+    result: Mapping[str, object],
+    timer: _PhaseTimer,
+) -> None:
+    timings = {**timer.timings, "total": timer.elapsed()}
+    record = RunRecord.from_result(
+        result,
+        document_class=_document_class(_extract_parameters(payload)),
+        timings=timings,
+    )
+    try:
+        RunHistoryStore(history_path).record(record)
+    except (OSError, sqlite3.Error) as exc:
+        _LOGGER.warning("run history not recorded at %s: %s", history_path, exc)
+
+
+def _emit_run_events(
+    payload: Mapping[str, object],
+    result: Mapping[str, object],
+    timer: _PhaseTimer,
+) -> None:
+    """Log one `phase` event per timed phase and a closing `run` event."""
+    sink = active_sink()
+    if sink is None:
+        return
+    output = _extract_parameters(payload).get("output_markdown")
+    document = output if isinstance(output, str) else None
+    for phase, seconds in timer.timings.items():
+        sink.emit("phase", "debug", document=document, phase=phase, duration=seconds)
+    markdown = result.get("markdown")
+    size = (
+        cast("Mapping[str, object]", markdown).get("bytes")
+        if isinstance(markdown, Mapping)
+        else None
+    )
+    succeeded = result.get("status") == "success"
+    sink.emit(
+        "run",
+        "info" if succeeded else "error",
+        document=document,
+        status=result.get("status"),
+        duration=timer.elapsed(),
+        bytes=size,
+        **({} if succeeded else {"message": result.get("message")}),
+    )
+
+
+def _render_payload(
     payload: Mapping[str, object],
     *,
-    ctx: object | None = None,
+    ctx: object | None,
+    runner: CommandRunner | None,
+    timer: _PhaseTimer,
+    deadline_seconds: float | None = None,
 ) -> dict[str, object]:
-    """Render markdown using the JSON contract."""
-
-    schema_failure = _validate_input_schema(payload)
+    started = time.monotonic()
+    with timer.phase("validate"):
+        schema_failure = _validate_input_schema(payload)
     if schema_failure:
         return schema_failure
 
@@ -547,37 +1884,193 @@ def main_json(
         return resolved_output
     output_path = resolved_output
 
-    builder, messages = _configure_builder(parameters, ctx=ctx)
+    budget, deadline = _run_deadline(parameters, deadline_seconds)
+    if deadline is not None:
+        # The budget covers the whole call, validation included.
+        deadline -= time.monotonic() - started
+        if _deadline_passed(deadline):
+            return _deadline_failure("validate", budget)
+    builder, messages = _configure_builder(
+        parameters, output_path=output_path, ctx=ctx, runner=runner, deadline=deadline
+    )
+    if parameters.get("append") and output_path.exists():
+        try:
+            builder.resume(output_path)
+        except (OSError, ValueError, KeyError) as exc:
+            return failure_payload(
+                "append mode needs the document's section index",
+                details={"path": str(output_path), "error": str(exc)},
+            )
+
+    try:
+        with timer.phase("render"):
+            document = _extract_document(parameters)
+            blocks = _extract_blocks(document)
+            block_summary = _render_blocks(builder, blocks)
+            if _include_toc(document):
+                builder.add_toc()
+    except (OSError, ValueError, csv.Error) as exc:
+        builder.close()
+        return _markdown_generation_failure(exc)
+    if _deadline_passed(deadline):
+        builder.close()
+        return _deadline_failure("render", budget)
+
+    fail_on = (_lint_options(parameters) or _EMPTY_MAPPING).get("fail_on")
+    return _complete_render(
+        builder,
+        output_path,
+        block_summary,
+        timer=timer,
+        messages=messages,
+        compression=_compression_option(parameters),
+        fail_on=fail_on if isinstance(fail_on, str) else None,
+        metadata=parameters.get("metadata"),
+        deadline=(budget, deadline) if deadline is not None else None,
+    )
 
-    document = _extract_document(parameters)
-    blocks = _extract_blocks(document)
-    block_summary = _render_blocks(builder, blocks)
-    if _include_toc(document):
-        builder.add_toc()
+
+def _complete_render(
+    builder: XClsMakeMarkdownX,
+    output_path: Path,
+    block_summary: Mapping[str, int],
+    *,
+    timer: _PhaseTimer,
+    messages: list[str],
+    compression: str | None,
+    fail_on: str | None,
+    metadata: object,
+    deadline: tuple[float | None, float] | None = None,
+    validate_output: bool = True,
+) -> dict[str, object]:
+    """Lint-gate, write and export a rendered builder, then build the result."""
+    if (
+        fail_on is not None
+        and builder.linter is not None
+        and builder.linter.exceeds(fail_on)
+    ):
+        builder.close()
+        return _lint_failure(builder, fail_on)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     try:
-        markdown_text = builder.generate(output_file=str(output_path))
+        with timer.phase("write"):
+            word_count = _write_document(builder, output_path, compression)
     except Exception as exc:  # noqa: BLE001 - convert to JSON failure payload
         return _markdown_generation_failure(exc)
+    export_seconds = builder.get_last_export_seconds()
+    if export_seconds is not None:
+        # generate() exports inside the write phase; report the two apart.
+        timer.record("write", -export_seconds)
+        timer.record("export", export_seconds)
+    elif deadline is not None and _deadline_passed(deadline[1]):
+        # An export reports its own overrun; writing alone should not overrun.
+        return _deadline_failure("write", deadline[0])
 
     artifact, export_messages = _build_artifact(output_path, builder)
     if export_messages:
         messages.extend(export_messages)
 
-    summary = _build_summary(markdown_text, block_summary, parameters)
+    summary = _build_summary(word_count, block_summary, metadata, builder)
+    append_info = builder.get_last_append_info()
+    if append_info is not None:
+        summary["append"] = dict(append_info)
+    summary["timings"] = dict(timer.timings)
+    if deadline is not None:
+        budget, deadline_at = deadline
+        summary["deadline"] = {
+            "budget_seconds": budget,
+            "remaining_seconds": round(max(0.0, deadline_at - time.monotonic()), 6),
+        }
     result = _compose_success_result(artifact, summary, messages)
 
-    output_failure = _validate_output_schema(result)
+    output_failure = _validate_output_schema(result) if validate_output else None
     if output_failure:
         return output_failure
     return result
 
 
-def _load_json_payload(file_path: str | None) -> Mapping[str, object]:
-    def _load_from_stream(stream: IO[str]) -> Mapping[str, object]:
-        payload_obj: object = json.load(stream)
+def render_document(
+    document: Document,
+    output_markdown: str | Path,
+    *,
+    builder: XClsMakeMarkdownX | None = None,
+    compression: str | None = None,
+    fail_on: str | None = None,
+) -> dict[str, object]:
+    """Render a typed `Document` for trusted in-process callers.
+
+    Blocks were validated when they were constructed, so this skips schema
+    validation, payload copies and per-field coercion. PDF export, lint,
+    staging and budgets are configured on `builder`. The result has the same
+    shape as a `main_json` result.
+    """
+    timer = _PhaseTimer()
+    target = builder if builder is not None else XClsMakeMarkdownX(wkhtmltopdf_path="")
+    headers = 0
+    try:
+        with timer.phase("render"):
+            for block in document.blocks:
+                block.apply(target)
+                headers += block.kind == "header"
+            if document.include_toc:
+                target.add_toc()
+    except (OSError, ValueError, csv.Error) as exc:
+        target.close()
+        return _markdown_generation_failure(exc)
+    return _complete_render(
+        target,
+        Path(output_markdown),
+        {"blocks": len(document.blocks), "headers": headers},
+        timer=timer,
+        messages=[],
+        compression=compression,
+        fail_on=fail_on,
+        metadata=document.metadata,
+        validate_output=False,
+    )
+
+
+def main_json(
+    payload: Mapping[str, object],
+    *,
+    ctx: object | None = None,
+    run_history: str | Path | None = None,
+    runner: CommandRunner | None = None,
+    deadline_seconds: float | None = None,
+) -> dict[str, object]:
+    """Render markdown using the JSON contract.
+
+    When `run_history` (or the X_MARKDOWN_RUN_HISTORY environment variable)
+    names a database, the run's sizes and phase timings are appended to it.
+    `runner` replaces the subprocess runner used for the PDF export.
+    `deadline_seconds` (or the `deadline_seconds` parameter, whichever is
+    tighter) bounds the call. Running out after validation, rendering or
+    writing fails the call with a "deadline exceeded" payload naming the
+    phase; the PDF export gets whatever budget is left and is killed when it
+    overruns, while the markdown artifact is still returned.
+    """
+
+    timer = _PhaseTimer()
+    result = _render_payload(
+        payload,
+        ctx=ctx,
+        runner=runner,
+        timer=timer,
+        deadline_seconds=deadline_seconds,
+    )
+    history_path = run_history or BaseMake.get_env(RUN_HISTORY_ENV_VAR)
+    if history_path:
+        _record_run_history(history_path, payload, result, timer)
+    _emit_run_events(payload, result, timer)
+    return result
+
+
+def load_json_payload(file_path: str | None) -> Mapping[str, object]:
+    """Read a payload mapping from `file_path`, or from stdin when None."""
+
+    def _check_payload(payload_obj: object) -> Mapping[str, object]:
         if not isinstance(payload_obj, Mapping):
             message = "JSON payload must be a mapping"
             raise TypeError(message)
@@ -585,17 +2078,271 @@ def _load_json_payload(file_path: str | None) -> Mapping[str, object]:
         return MappingProxyType(dict(typed_payload))
 
     if file_path:
-        with Path(file_path).open("r", encoding="utf-8") as handle:
-            return _load_from_stream(handle)
-    return _load_from_stream(_sys.stdin)
+        return _check_payload(loads(Path(file_path).read_bytes()))
+    return _check_payload(read_stream(_sys.stdin))
+
+
+@dataclass(frozen=True)
+class _ProfileOptions:
+    cpu: bool = False
+    memory: bool = False
+    top: int = 25
+
+    @property
+    def enabled(self) -> bool:
+        return self.cpu or self.memory
+
+
+_PROFILE_LOCK = threading.Lock()
+
+
+def _profile_base(payload: Mapping[str, object]) -> Path:
+    """Return the path prefix for profiling artifacts, next to the output."""
+    output = _resolve_output_markdown(_extract_parameters(payload))
+    if isinstance(output, dict):
+        return Path("x_make_markdown_x")
+    return output.parent / output.stem
+
+
+def _write_tracemalloc_report(
+    snapshot: tracemalloc.Snapshot,
+    peak: int,
+    destination: Path,
+    top: int,
+) -> None:
+    stats = snapshot.statistics("lineno")
+    lines = [
+        f"peak traced memory: {peak} bytes",
+        f"top {min(top, len(stats))} allocation sites by size:",
+        *(str(stat) for stat in stats[:top]),
+    ]
+    destination.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _run_profiled(
+    payload: Mapping[str, object],
+    options: _ProfileOptions,
+    render: Callable[[], dict[str, object]],
+) -> dict[str, object]:
+    """Run `render` under cProfile/tracemalloc and note the artifact paths.
+
+    Both profilers are process-wide, so concurrent profiled renders (watch
+    mode runs one per changed payload) take turns.
+    """
+    if not options.enabled:
+        return render()
+    base = _profile_base(payload)
+    profiler = cProfile.Profile() if options.cpu else None
+    snapshot: tracemalloc.Snapshot | None = None
+    peak = 0
+    with _PROFILE_LOCK:
+        if options.memory:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = render()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if options.memory:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+    notes: list[str] = []
+    base.parent.mkdir(parents=True, exist_ok=True)
+    if profiler is not None:
+        stats_path = base.with_name(f"{base.name}.prof")
+        profiler.dump_stats(str(stats_path))
+        notes.append(f"cProfile stats written to {stats_path}")
+    if snapshot is not None:
+        report_path = base.with_name(f"{base.name}.tracemalloc.txt")
+        _write_tracemalloc_report(snapshot, peak, report_path, options.top)
+        notes.append(f"tracemalloc report written to {report_path}")
+    existing = result.get("messages")
+    result["messages"] = [
+        *(cast("list[str]", existing) if isinstance(existing, list) else []),
+        *notes,
+    ]
+    return result
+
+
+def _run_watch(
+    paths: Sequence[Path],
+    *,
+    debounce: float,
+    poll_interval: float,
+    run_history: str | None,
+    profile: _ProfileOptions,
+) -> None:
+    from x_make_markdown_x.watch import PayloadWatcher, write_json_line
+
+    def _render(
+        payload: Mapping[str, object], runner: CommandRunner
+    ) -> dict[str, object]:
+        return _run_profiled(
+            payload,
+            profile,
+            lambda: main_json(payload, run_history=run_history, runner=runner),
+        )
+
+    def _write(text: str) -> None:
+        _sys.stdout.write(text)
+        _sys.stdout.flush()
+
+    watcher = PayloadWatcher(
+        paths,
+        on_result=write_json_line(_write),
+        render=_render,
+        debounce=debounce,
+        poll_interval=poll_interval,
+    )
+    # stdout carries the JSON result lines, so progress goes to the logger.
+    _LOGGER.info("[markdown] watching %d path(s); Ctrl+C to stop", len(paths))
+    with suppress(KeyboardInterrupt):
+        watcher.run()
+
+
+def _run_batch(
+    paths: Sequence[Path],
+    *,
+    shard_index: int,
+    shard_count: int,
+    run_history: str | None,
+    compact: bool,
+    coalesce_pdf: Path | None,
+    split_pdf: bool,
+    profile: _ProfileOptions,
+    parser: argparse.ArgumentParser,
+) -> None:
+    from x_make_markdown_x.batch import ShardSpec, run_batch
+
+    try:
+        shard = ShardSpec(shard_index, shard_count)
+    except ValueError as exc:
+        parser.error(str(exc))
+    report = run_batch(
+        paths,
+        shard=shard,
+        render=lambda payload: _run_profiled(
+            payload, profile, lambda: main_json(payload, run_history=run_history)
+        ),
+        coalesce_pdf=coalesce_pdf,
+        split_pdf=split_pdf,
+    )
+    write_stream(_sys.stdout, dumps_bytes(report, compact=compact) + b"\n")
+
+
+@contextmanager
+def _event_log(target: str | None, level: str) -> Iterator[None]:
+    """Route `_info` and run events to a buffered sink for the CLI run."""
+    if target is None:
+        yield
+        return
+    sink = open_sink(target, level=level)
+    previous = configure_events(sink)
+    try:
+        yield
+    finally:
+        configure_events(previous)
+        sink.close()
 
 
 def _run_json_cli(args: Sequence[str]) -> None:
+    from x_make_markdown_x.watch import DEFAULT_DEBOUNCE_SECONDS, DEFAULT_POLL_SECONDS
+
     parser = argparse.ArgumentParser(description="x_make_markdown_x JSON runner")
     parser.add_argument(
         "--json", action="store_true", help="Read JSON payload from stdin"
     )
     parser.add_argument("--json-file", type=str, help="Path to JSON payload file")
+    parser.add_argument(
+        "--run-history",
+        type=str,
+        help=f"Append run metrics to this SQLite file (or set {RUN_HISTORY_ENV_VAR})",
+    )
+    parser.add_argument(
+        "--watch",
+        nargs="+",
+        metavar="PATH",
+        help="Re-render payload files (or directories of *.json) when they change",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        help="Seconds a payload must stay unchanged before --watch re-renders it",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_SECONDS,
+        help="Seconds between --watch scans",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write cProfile stats (<output stem>.prof) next to output_markdown",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Write a tracemalloc report (<output stem>.tracemalloc.txt)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        help="Allocation sites listed by --profile-memory",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        help="Render payload files, directories of *.json, or .jsonl manifests",
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="With --batch, render only this shard (0-based)",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=1,
+        help="With --batch, the number of shards output_markdown is hashed into",
+    )
+    parser.add_argument(
+        "--coalesce-pdf",
+        metavar="PATH",
+        help="With --batch, render every requested PDF in one wkhtmltopdf run "
+        "into this combined PDF, with a bookmark per document",
+    )
+    parser.add_argument(
+        "--split-pdf",
+        action="store_true",
+        help="With --coalesce-pdf, also write each document's pages to its own "
+        "PDF (needs pypdf)",
+    )
+    parser.add_argument(
+        "--event-log",
+        metavar="PATH",
+        help="Write buffered JSON-lines events to PATH ('-' for stderr) "
+        "instead of printing verbose messages",
+    )
+    parser.add_argument(
+        "--event-level",
+        choices=("debug", "info", "warning", "error"),
+        default="info",
+        help="Lowest event level written to --event-log",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write results as compact single-line JSON instead of indented JSON",
+    )
     parsed = parser.parse_args(args)
     parsed_map = cast("dict[str, object]", vars(parsed))
     json_flag = bool(parsed_map.get("json", False))
@@ -604,13 +2351,60 @@ def _run_json_cli(args: Sequence[str]) -> None:
         json_file_obj if isinstance(json_file_obj, str) and json_file_obj else None
     )
 
-    if not (json_flag or json_file):
+    watch_paths = cast("list[str] | None", parsed_map.get("watch"))
+    batch_paths = cast("list[str] | None", parsed_map.get("batch"))
+
+    if not (json_flag or json_file or watch_paths or batch_paths):
         parser.error("JSON input required. Use --json for stdin or --json-file <path>.")
 
-    payload = _load_json_payload(json_file)
-    result = main_json(payload)
-    _sys.stdout.write(json.dumps(result, indent=2))
-    _sys.stdout.write("\n")
+    history_obj = parsed_map.get("run_history")
+    run_history = history_obj if isinstance(history_obj, str) and history_obj else None
+
+    profile = _ProfileOptions(
+        cpu=bool(parsed_map.get("profile", False)),
+        memory=bool(parsed_map.get("profile_memory", False)),
+        top=cast("int", parsed_map["profile_top"]),
+    )
+
+    event_log_obj = parsed_map.get("event_log")
+    event_log = (
+        event_log_obj if isinstance(event_log_obj, str) and event_log_obj else None
+    )
+    with _event_log(event_log, str(parsed_map["event_level"])):
+        if watch_paths:
+            _run_watch(
+                [Path(path) for path in watch_paths],
+                debounce=cast("float", parsed_map["debounce"]),
+                poll_interval=cast("float", parsed_map["poll_interval"]),
+                run_history=run_history,
+                profile=profile,
+            )
+            return
+
+        compact = bool(parsed_map.get("compact", False))
+        if batch_paths:
+            _run_batch(
+                [Path(path) for path in batch_paths],
+                shard_index=cast("int", parsed_map["shard_index"]),
+                shard_count=cast("int", parsed_map["shard_count"]),
+                run_history=run_history,
+                compact=compact,
+                coalesce_pdf=(
+                    Path(cast("str", parsed_map["coalesce_pdf"]))
+                    if parsed_map.get("coalesce_pdf")
+                    else None
+                ),
+                split_pdf=bool(parsed_map.get("split_pdf", False)),
+                profile=profile,
+                parser=parser,
+            )
+            return
+
+        payload = load_json_payload(json_file)
+        result = _run_profiled(
+            payload, profile, lambda: main_json(payload, run_history=run_history)
+        )
+        write_stream(_sys.stdout, dumps_bytes(result, compact=compact) + b"\n")
 
 
 def _demo_markdown() -> None:
@@ -689,4 +2483,18 @@ if __name__ == "__main__":
 x_cls_make_markdown_x = XClsMakeMarkdownX
 
 
-__all__ = ["BaseMake", "XClsMakeMarkdownX", "main_json", "x_cls_make_markdown_x"]
+__all__ = [
+    "BaseMake",
+    "ColumnFormat",
+    "MarkdownSection",
+    "XClsMakeMarkdownX",
+    "export_budget",
+    "failure_payload",
+    "load_json_payload",
+    "main_json",
+    "markdown_stem",
+    "open_markdown",
+    "render_document",
+    "resolve_wkhtmltopdf_path",
+    "x_cls_make_markdown_x",
+]